@@ -1,42 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.crud import driver as crud_driver
-from app.schemas.driver import Driver, DriverCreate, DriverUpdate # Updated import
-from app.core.database import get_db
+from app.crud.bulk import BATCH_ERRORS
+from app.schemas.batch import BatchResult
+from app.schemas.driver import Driver, DriverBatch, DriverCreate, DriverUpdate # Updated import
+from app.core.config import settings
+from app.core.database import after_commit, get_async_db, get_async_read_db
+from app.core.pagination import PageParams, paginate
+from app.services.incremental import incremental_planner
+from app.services.write_coalescer import write_coalescer
 
 router = APIRouter()
 
 @router.post("/drivers", response_model=Driver, status_code=status.HTTP_201_CREATED)
-def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
-    db_driver = crud_driver.get_driver(db, driver_id=driver.driver_id)
+async def create_driver(driver: DriverCreate, db: AsyncSession = Depends(get_async_db)):
+    db_driver = await crud_driver.get_driver_async(db, driver_id=driver.driver_id)
     if db_driver:
         raise HTTPException(status_code=400, detail="Driver with this ID already registered")
-    return crud_driver.create_driver(db=db, driver=driver)
+    db_driver = await crud_driver.create_driver_async(db=db, driver=driver)
+    after_commit(db, incremental_planner.invalidate)
+    return db_driver
 
 @router.get("/drivers", response_model=List[Driver])
-def read_drivers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    drivers = crud_driver.get_drivers(db, skip=skip, limit=limit)
-    return drivers
+async def read_drivers(request: Request, response: Response, skip: int = 0, page: PageParams = Depends(),
+                       db: AsyncSession = Depends(get_async_read_db)):
+    drivers = await crud_driver.get_drivers_async(db, skip=skip, limit=page.fetch_limit, after=page.after)
+    return paginate(drivers, page, request, response)
+
+@router.patch("/drivers", response_model=BatchResult)
+async def batch_update_drivers(batch: DriverBatch, db: AsyncSession = Depends(get_async_db)):
+    items = await db.run_sync(
+        crud_driver.batch_update_drivers,
+        [item.model_dump(exclude_unset=True) for item in batch.updates],
+        batch.deletes,
+    )
+    failed = [item["status"] for item in items if item["status"] in BATCH_ERRORS]
+    if failed:
+        # Raising rolls the unit of work back
+        raise HTTPException(
+            status_code=404 if "not_found" in failed else 400,
+            detail={"message": "Batch not applied", "items": items},
+        )
+    after_commit(db, incremental_planner.invalidate) # Once for the whole batch
+    return {
+        "updated": len(batch.updates),
+        "deleted": len(batch.deletes),
+        "items": items,
+    }
 
 @router.get("/drivers/{driver_id}", response_model=Driver)
-def read_driver(driver_id: str, db: Session = Depends(get_db)):
-    db_driver = crud_driver.get_driver(db, driver_id=driver_id)
+async def read_driver(driver_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    db_driver = await crud_driver.get_driver_async(db, driver_id=driver_id)
     if db_driver is None:
         raise HTTPException(status_code=404, detail="Driver not found")
     return db_driver
 
 @router.put("/drivers/{driver_id}", response_model=Driver)
-def update_driver(driver_id: str, driver: DriverUpdate, db: Session = Depends(get_db)):
-    db_driver = crud_driver.update_driver(db, driver_id, driver.model_dump(exclude_unset=True))
+async def update_driver(driver_id: str, driver: DriverUpdate, db: AsyncSession = Depends(get_async_db)):
+    driver_data = driver.model_dump(exclude_unset=True)
+    if settings.write_coalescing:
+        # Already committed, in a group commit shared with concurrent writes
+        db_driver = await write_coalescer.apply(crud_driver.update_driver, driver_id, driver_data)
+    else:
+        db_driver = await crud_driver.update_driver_async(db, driver_id, driver_data)
     if db_driver is None:
         raise HTTPException(status_code=404, detail="Driver not found")
+    after_commit(db, incremental_planner.invalidate)
     return db_driver
 
 @router.delete("/drivers/{driver_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_driver(driver_id: str, db: Session = Depends(get_db)):
-    success = crud_driver.delete_driver(db, driver_id)
+async def delete_driver(driver_id: str, db: AsyncSession = Depends(get_async_db)):
+    success = await crud_driver.delete_driver_async(db, driver_id)
     if not success:
         raise HTTPException(status_code=404, detail="Driver not found")
+    after_commit(db, incremental_planner.invalidate)
     return {"message": "Driver deleted successfully"}
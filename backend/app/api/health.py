@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.readiness import readiness
+
+router = APIRouter()
+
+@router.get("/healthz")
+def healthz():
+    # Liveness: the process is up and serving, whether or not the initial data has loaded
+    return {"status": "ok"}
+
+@router.get("/readyz")
+def readyz():
+    # Readiness: 200 once the initial data load has finished, 503 while it runs or after it failed
+    return JSONResponse(readiness.as_dict(), status_code=200 if readiness.ready else 503)
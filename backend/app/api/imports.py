@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, File, HTTPException, UploadFile, status
+from typing import Optional
+
+from app.core.config import settings
+from app.schemas.job import JobStatus
+from app.services.jobs import job_manager
+
+router = APIRouter()
+
+COPY_BUFFER_BYTES = 1024 * 1024
+
+def _resolve_import_path(path: str) -> str:
+    # Only files inside the import directory can be imported by path
+    from app.services.data_loader import DATA_DIR
+    import_dir = os.path.realpath(settings.import_dir or DATA_DIR)
+    file_path = os.path.realpath(os.path.join(import_dir, path))
+    if os.path.commonpath([import_dir, file_path]) != import_dir:
+        raise HTTPException(status_code=400, detail="Path must be inside the import directory.")
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return file_path
+
+@router.post("/imports/orders", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+def import_orders(file: Optional[UploadFile] = File(None), path: Optional[str] = None):
+    # Either upload the CSV or name a file in the import directory; progress is reported on /jobs/{id}
+    if (file is None) == (path is None):
+        raise HTTPException(status_code=400, detail="Provide either an uploaded file or a path.")
+    # Imported here so that starting the app does not pull in pandas
+    from app.services.data_loader import run_import_orders_job
+    if path is not None:
+        return job_manager.submit("import_orders", run_import_orders_job, _resolve_import_path(path))
+
+    # The upload is only readable during this request, so spool it to disk for the job in fixed-size blocks
+    with tempfile.NamedTemporaryFile(prefix="orders-import-", suffix=".csv", delete=False) as spooled:
+        shutil.copyfileobj(file.file, spooled, COPY_BUFFER_BYTES)
+    return job_manager.submit("import_orders", run_import_orders_job, spooled.name, True)
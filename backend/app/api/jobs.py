@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import List
+
+from app.schemas.job import JobStatus
+from app.schemas.optimization import SimulationInput
+from app.services.jobs import job_manager
+from app.services.optimizer import run_assign_orders_job
+
+router = APIRouter()
+
+@router.post("/jobs/assign_orders", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+def submit_assign_orders_job(simulation_input: SimulationInput):
+    return job_manager.submit("assign_orders", run_assign_orders_job, simulation_input)
+
+@router.get("/jobs", response_model=List[JobStatus])
+def read_jobs():
+    return job_manager.list()
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def read_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -2,21 +2,97 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 
+from datetime import datetime
+
+from app.services.fleet_store import fleet_store
 from app.services.optimizer import Optimizer
-from app.core.database import get_db
+from app.services.sweep import expand_grid, grid_size, pareto_front, run_sweep
+from app.core.config import settings
+from app.core.database import SessionLocal, get_read_db
+from app.core.offload import run_cpu_bound
+from app.crud import simulation_run as crud_simulation_run
 from app.schemas.assignment import Assignment
-from app.schemas.optimization import SimulationInput, OptimizedScheduleResponse # Updated import
+from app.schemas.optimization import SimulationInput, OptimizedScheduleResponse, SweepRequest, SweepResponse # Updated import
+from app.schemas.simulation_run import SimulationRunCreate
 
 router = APIRouter()
 
+def _assign_orders(simulation_input: SimulationInput):
+    db = SessionLocal()
+    try:
+        return Optimizer(db).assign_orders(simulation_input)
+    finally:
+        db.close()
+
 @router.post("/assign_orders")
-def assign_orders(simulation_input: SimulationInput, db: Session = Depends(get_db)):
-    optimizer = Optimizer(db)
-    result = optimizer.assign_orders(simulation_input)
-    return result
+async def assign_orders(simulation_input: SimulationInput):
+    # The solver is CPU-bound: it runs on an optimizer thread with its own session
+    return await run_cpu_bound(_assign_orders, simulation_input)
 
 @router.get("/optimized_schedule", response_model=OptimizedScheduleResponse) # Updated response_model
-def get_optimized_schedule(db: Session = Depends(get_db)):
+def get_optimized_schedule(db: Session = Depends(get_read_db)):
     optimizer = Optimizer(db)
     schedule = optimizer.get_optimized_schedule()
     return schedule
+
+@router.post("/simulations/sweep", response_model=SweepResponse)
+async def sweep_simulations(sweep_request: SweepRequest):
+    # Sized before the grid is expanded, so an oversized grid is never built
+    count = len(sweep_request.variants) + (grid_size(sweep_request.grid) if sweep_request.grid is not None else 0)
+    if not count:
+        raise HTTPException(status_code=400, detail="Provide at least one variant or a grid.")
+    if count > settings.sweep_max_variants:
+        raise HTTPException(status_code=400, detail=f"A sweep is limited to {settings.sweep_max_variants} variants.")
+    variants = list(sweep_request.variants)
+    if sweep_request.grid is not None:
+        variants += expand_grid(sweep_request.grid)
+    return await run_cpu_bound(_sweep, sweep_request, variants)
+
+def _sweep(sweep_request: SweepRequest, variants: List[SimulationInput]):
+    db = SessionLocal()
+    try:
+        response = _run_sweep(db, sweep_request, variants)
+        db.commit() # Recorded runs, if any
+        return response
+    finally:
+        db.close()
+
+def _run_sweep(db: Session, sweep_request: SweepRequest, variants: List[SimulationInput]):
+    # Read-only snapshot: the live assignments are not touched. Workers map the stored columnar
+    # snapshot by path when there is one, instead of unpickling a copy each.
+    max_workers = min(sweep_request.max_workers or settings.sweep_max_workers, settings.sweep_max_workers)
+    fleet = fleet_store.current(db) if max_workers > 1 else None
+    snapshot = fleet.path if fleet is not None else Optimizer(db).load_snapshot()
+    outcomes = run_sweep(snapshot, variants, max_workers=max_workers)
+
+    front = pareto_front([(kpis["total_profit"], kpis["efficiency_score"]) for _, kpis in outcomes])
+    run_ids = [None] * len(variants)
+    if sweep_request.record_runs:
+        timestamp = datetime.now()
+        run_ids = crud_simulation_run.create_simulation_runs(db, [
+            SimulationRunCreate(
+                timestamp=timestamp,
+                num_available_drivers=variant.num_available_drivers,
+                route_start_time=variant.route_start_time,
+                max_hours_per_driver_per_day=variant.max_hours_per_driver_per_day,
+                strategy=strategy,
+                **kpis
+            )
+            for variant, (strategy, kpis) in zip(variants, outcomes)
+        ])
+
+    on_front = set(front)
+    return {
+        "results": [
+            {
+                "index": i,
+                "simulation_input": variant,
+                "strategy": strategy,
+                "kpis": kpis,
+                "pareto_optimal": i in on_front,
+                "simulation_run_id": run_ids[i],
+            }
+            for i, (variant, (strategy, kpis)) in enumerate(zip(variants, outcomes))
+        ],
+        "pareto_front": front,
+    }
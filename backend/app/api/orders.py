@@ -1,42 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from app.crud import order as crud_order
 from app.schemas.order import Order, OrderCreate, OrderUpdate # Updated import
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import after_commit, get_async_db, get_async_read_db
+from app.core.offload import run_cpu_bound
+from app.core.pagination import PageParams, paginate
+from app.services.incremental import incremental_planner
+from app.services.order_ingest import MEDIA_TYPES, DuplexStreamingResponse, body_format, ingest_orders
+from app.services.write_coalescer import write_coalescer
+
+# Fields that change an order's place in the live plan
+PLAN_FIELDS = {"value", "route_id", "delivery_time"}
 
 router = APIRouter()
 
 @router.post("/orders", response_model=Order, status_code=status.HTTP_201_CREATED)
-def create_order(order: OrderCreate, db: Session = Depends(get_db)):
-    db_order = crud_order.get_order(db, order_id=order.order_id)
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_async_db)):
+    db_order = await crud_order.get_order_async(db, order_id=order.order_id)
     if db_order:
         raise HTTPException(status_code=400, detail="Order with this ID already registered")
-    return crud_order.create_order(db=db, order=order)
+    db_order = await crud_order.create_order_async(db=db, order=order)
+    after_commit(db, partial(run_cpu_bound, incremental_planner.replan_order, db_order.order_id))
+    return db_order
+
+@router.post("/orders/bulk")
+async def bulk_upsert_orders(request: Request):
+    # Streams NDJSON or CSV orders in and one NDJSON result line per order out (see app.services.order_ingest)
+    fmt = body_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be one of: {', '.join(MEDIA_TYPES)}",
+        )
+    return DuplexStreamingResponse(ingest_orders(request.stream(), fmt), media_type="application/x-ndjson")
 
 @router.get("/orders", response_model=List[Order])
-def read_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    orders = crud_order.get_orders(db, skip=skip, limit=limit)
-    return orders
+async def read_orders(request: Request, response: Response, skip: int = 0, page: PageParams = Depends(),
+                      route_id: Optional[str] = None, assigned_driver_id: Optional[str] = None,
+                      unassigned: Optional[bool] = None, delivery_from: Optional[datetime] = None,
+                      delivery_to: Optional[datetime] = None, db: AsyncSession = Depends(get_async_read_db)):
+    orders = await crud_order.get_orders_async(
+        db, skip=skip, limit=page.fetch_limit, after=page.after, route_id=route_id,
+        assigned_driver_id=assigned_driver_id, unassigned=unassigned,
+        delivery_from=delivery_from, delivery_to=delivery_to,
+    )
+    return paginate(orders, page, request, response)
 
 @router.get("/orders/{order_id}", response_model=Order)
-def read_order(order_id: str, db: Session = Depends(get_db)):
-    db_order = crud_order.get_order(db, order_id=order_id)
+async def read_order(order_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    db_order = await crud_order.get_order_async(db, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
 
 @router.put("/orders/{order_id}", response_model=Order)
-def update_order(order_id: str, order: OrderUpdate, db: Session = Depends(get_db)):
-    db_order = crud_order.update_order(db, order_id, order.model_dump(exclude_unset=True))
+async def update_order(order_id: str, order: OrderUpdate, db: AsyncSession = Depends(get_async_db)):
+    order_data = order.model_dump(exclude_unset=True)
+    if settings.write_coalescing:
+        # Already committed, in a group commit shared with concurrent writes
+        db_order = await write_coalescer.apply(crud_order.update_order, order_id, order_data)
+    else:
+        db_order = await crud_order.update_order_async(db, order_id, order_data)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    if PLAN_FIELDS & order_data.keys():
+        after_commit(db, partial(run_cpu_bound, incremental_planner.replan_order, order_id))
     return db_order
 
 @router.delete("/orders/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_order(order_id: str, db: Session = Depends(get_db)):
-    success = crud_order.delete_order(db, order_id)
+async def delete_order(order_id: str, db: AsyncSession = Depends(get_async_db)):
+    success = await crud_order.delete_order_async(db, order_id)
     if not success:
         raise HTTPException(status_code=404, detail="Order not found")
+    after_commit(db, partial(run_cpu_bound, incremental_planner.replan_order, order_id))
     return {"message": "Order deleted successfully"}
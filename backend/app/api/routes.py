@@ -1,42 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.crud import route as crud_route
-from app.schemas.route import Route, RouteCreate, RouteUpdate # Updated import
-from app.core.database import get_db
+from app.crud.bulk import BATCH_ERRORS
+from app.schemas.batch import BatchResult
+from app.schemas.route import Route, RouteBatch, RouteCreate, RouteUpdate # Updated import
+from app.core.database import after_commit, get_async_db, get_async_read_db
+from app.core.pagination import PageParams, paginate
+from app.services.incremental import incremental_planner
 
 router = APIRouter()
 
 @router.post("/routes", response_model=Route, status_code=status.HTTP_201_CREATED)
-def create_route(route: RouteCreate, db: Session = Depends(get_db)):
-    db_route = crud_route.get_route(db, route_id=route.route_id)
+async def create_route(route: RouteCreate, db: AsyncSession = Depends(get_async_db)):
+    db_route = await crud_route.get_route_async(db, route_id=route.route_id)
     if db_route:
         raise HTTPException(status_code=400, detail="Route with this ID already registered")
-    return crud_route.create_route(db=db, route=route)
+    db_route = await crud_route.create_route_async(db=db, route=route)
+    after_commit(db, incremental_planner.invalidate)
+    return db_route
 
 @router.get("/routes", response_model=List[Route])
-def read_routes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    routes = crud_route.get_routes(db, skip=skip, limit=limit)
-    return routes
+async def read_routes(request: Request, response: Response, skip: int = 0, page: PageParams = Depends(),
+                      db: AsyncSession = Depends(get_async_read_db)):
+    routes = await crud_route.get_routes_async(db, skip=skip, limit=page.fetch_limit, after=page.after)
+    return paginate(routes, page, request, response)
+
+@router.patch("/routes", response_model=BatchResult)
+async def batch_update_routes(batch: RouteBatch, db: AsyncSession = Depends(get_async_db)):
+    items = await db.run_sync(
+        crud_route.batch_update_routes,
+        [item.model_dump(exclude_unset=True) for item in batch.updates],
+        batch.deletes,
+    )
+    failed = [item["status"] for item in items if item["status"] in BATCH_ERRORS]
+    if failed:
+        # Raising rolls the unit of work back
+        raise HTTPException(
+            status_code=404 if "not_found" in failed else 400,
+            detail={"message": "Batch not applied", "items": items},
+        )
+    after_commit(db, incremental_planner.invalidate) # Once for the whole batch
+    return {
+        "updated": len(batch.updates),
+        "deleted": len(batch.deletes),
+        "items": items,
+    }
 
 @router.get("/routes/{route_id}", response_model=Route)
-def read_route(route_id: str, db: Session = Depends(get_db)):
-    db_route = crud_route.get_route(db, route_id=route_id)
+async def read_route(route_id: str, db: AsyncSession = Depends(get_async_read_db)):
+    db_route = await crud_route.get_route_async(db, route_id=route_id)
     if db_route is None:
         raise HTTPException(status_code=404, detail="Route not found")
     return db_route
 
 @router.put("/routes/{route_id}", response_model=Route)
-def update_route(route_id: str, route: RouteUpdate, db: Session = Depends(get_db)):
-    db_route = crud_route.update_route(db, route_id, route.model_dump(exclude_unset=True))
+async def update_route(route_id: str, route: RouteUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_route = await crud_route.update_route_async(db, route_id, route.model_dump(exclude_unset=True))
     if db_route is None:
         raise HTTPException(status_code=404, detail="Route not found")
+    after_commit(db, incremental_planner.invalidate)
     return db_route
 
 @router.delete("/routes/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_route(route_id: str, db: Session = Depends(get_db)):
-    success = crud_route.delete_route(db, route_id)
+async def delete_route(route_id: str, db: AsyncSession = Depends(get_async_db)):
+    success = await crud_route.delete_route_async(db, route_id)
     if not success:
         raise HTTPException(status_code=404, detail="Route not found")
+    after_commit(db, incremental_planner.invalidate)
     return {"message": "Route deleted successfully"}
@@ -1,14 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 
 from app.crud import simulation_run as crud_simulation_run
-from app.schemas.simulation_run import SimulationRun
-from app.core.database import get_db
+from app.crud import simulation_run_archive as crud_simulation_run_archive
+from app.crud import simulation_run_rollup as crud_simulation_run_rollup
+from app.schemas.optimization import KpiData
+from app.schemas.simulation_run import SimulationHistoryAggregates, SimulationRun, SimulationRunDiff, SimulationRunPlan
+from app.core.database import get_async_read_db
+from app.core.offload import run_cpu_bound
+from app.core.pagination import PageParams, paginate
+from app.services.history_aggregates import aggregate_rollups
+from app.services.plan_codec import decode_plan, diff_plans, plan_rows
 
 router = APIRouter()
 
 @router.get("/simulation_history", response_model=List[SimulationRun])
-def get_simulation_history(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    history = crud_simulation_run.get_simulation_runs(db, skip=skip, limit=limit)
-    return history
+async def get_simulation_history(request: Request, response: Response, skip: int = 0, page: PageParams = Depends(),
+                                 timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None,
+                                 db: AsyncSession = Depends(get_async_read_db)):
+    # Runs past retention are read from the archive files and merged in id order
+    filters = {"timestamp_from": timestamp_from, "timestamp_to": timestamp_to}
+    archived = await crud_simulation_run_archive.get_archived_runs_async(db, skip + page.fetch_limit, after=page.after, **filters)
+    if not archived:
+        history = await crud_simulation_run.get_simulation_runs_async(db, skip=skip, limit=page.fetch_limit, after=page.after, **filters)
+    else:
+        live = await crud_simulation_run.get_simulation_runs_async(db, limit=skip + page.fetch_limit, after=page.after, **filters)
+        history = sorted(live + archived, key=lambda run: run.id)[skip:skip + page.fetch_limit]
+    return paginate(history, page, request, response)
+
+@router.get("/simulation_history/aggregates", response_model=SimulationHistoryAggregates)
+async def get_simulation_history_aggregates(
+    timestamp_from: Optional[datetime] = None,
+    timestamp_to: Optional[datetime] = None,
+    bucket: Literal["hour", "day", "week"] = "day",
+    group_by: List[Literal["num_available_drivers", "route_start_time", "max_hours_per_driver_per_day", "strategy"]] = Query([]),
+    percentiles: List[float] = Query([50.0, 90.0, 99.0]),
+    top_k: int = Query(10, ge=0, le=100),
+    top_by: Literal["total_profit", "efficiency_score"] = "total_profit",
+    max_points: int = Query(500, ge=3, description="Points per series after LTTB downsampling"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # Served from the rollups, so the time range is applied per hour, or per day for days past retention;
+    # top_runs reads the runs themselves, including archived ones
+    if any(not 0 <= percentile <= 100 for percentile in percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    rollups = await crud_simulation_run_rollup.get_rollups_async(db, timestamp_from=timestamp_from, timestamp_to=timestamp_to)
+    top_runs = []
+    if top_k:
+        filters = {"timestamp_from": timestamp_from, "timestamp_to": timestamp_to}
+        top_runs = await crud_simulation_run.get_top_simulation_runs_async(db, top_by, top_k, **filters)
+        archived = await crud_simulation_run_archive.get_top_archived_runs_async(db, top_by, top_k, **filters)
+        top_runs = sorted([*top_runs, *archived], key=lambda run: (-getattr(run, top_by), run.id))[:top_k]
+    groups = await run_cpu_bound(aggregate_rollups, rollups, bucket, list(dict.fromkeys(group_by)), percentiles, max_points)
+    return {"bucket": bucket, "groups": groups, "top_runs": top_runs}
+
+async def _stored_run(db: AsyncSession, simulation_run_id: int):
+    # The run and its plan, from the database or, past retention, from the archive files
+    db_run = await crud_simulation_run.get_simulation_run_async(db, simulation_run_id)
+    if db_run is not None:
+        db_plan = await crud_simulation_run.get_simulation_run_plan_async(db, simulation_run_id)
+    else:
+        archived = await crud_simulation_run_archive.get_archived_run_async(db, simulation_run_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Simulation run not found")
+        db_run, db_plan = archived
+    if db_plan is None:
+        # e.g. runs recorded by a sweep
+        raise HTTPException(status_code=404, detail=f"No plan stored for simulation run {simulation_run_id}")
+    return db_run, db_plan
+
+@router.get("/simulation_history/{simulation_run_id}/plan", response_model=SimulationRunPlan)
+async def get_simulation_run_plan(simulation_run_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    _, db_plan = await _stored_run(db, simulation_run_id)
+    return {
+        "simulation_run_id": simulation_run_id,
+        "assigned_at": db_plan.assigned_at,
+        "assignments": plan_rows(decode_plan(db_plan.data)),
+    }
+
+@router.get("/simulation_history/{base_run_id}/diff/{simulation_run_id}", response_model=SimulationRunDiff)
+async def diff_simulation_runs(base_run_id: int, simulation_run_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    # What changed from the base run's plan to this run's plan
+    base_run, base_plan = await _stored_run(db, base_run_id)
+    db_run, db_plan = await _stored_run(db, simulation_run_id)
+    return {
+        "base_run_id": base_run_id,
+        "run_id": simulation_run_id,
+        "kpi_deltas": {field: getattr(db_run, field) - getattr(base_run, field) for field in KpiData.model_fields},
+        **diff_plans(decode_plan(base_plan.data), decode_plan(db_plan.data)),
+    }
@@ -1,10 +1,36 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./sql_app.db"
+    # SQLite engine profile (ignored for other databases)
+    sqlite_journal_mode: str = "wal" # Readers are not blocked by a committing writer
+    sqlite_synchronous: str = "normal" # Durable at checkpoints; safe with WAL
+    sqlite_mmap_size: int = 268435456 # Bytes of the database file read through mmap
+    sqlite_cache_size: int = -65536 # Page cache per connection; negative means KiB
+    sqlite_busy_timeout_ms: int = 5000 # How long a connection waits for a lock before "database is locked"
+    read_pool_size: int = 4 # Read-only connections used by GET endpoints
+    write_coalescing: bool = False # PUT /orders/{id} and PUT /drivers/{id} share group commits (see app.services.write_coalescer)
+    write_coalesce_max_batch: int = 64 # Mutations per group commit
+    write_coalesce_max_delay_ms: float = 0.0 # Extra wait for more mutations; 0 takes what queued during the previous commit
     app_name: str = "Delivery Driver API"
     secret_key: str
     algorithm: str = "HS256"
+    sweep_max_workers: int = 4
+    sweep_max_variants: int = 500
+    optimization_max_concurrent_jobs: int = 2
+    optimizer_threads: int = 2 # Worker threads for optimizer work started by request handlers
+    job_history_limit: int = 200
+    force_data_reload: bool = False # Re-apply every seed CSV row on startup, ignoring the load manifest
+    import_chunk_size: int = 50000 # Rows per transaction for streaming order imports
+    order_bulk_batch_size: int = 1000 # Rows per transaction for POST /orders/bulk
+    import_dir: Optional[str] = None # Server-side directory POST /imports/orders may read from; defaults to backend/data
+    incremental_drift_threshold: float = 0.2 # Share of the plan changed incrementally before a full re-run
+    fleet_snapshot_dir: str = "./fleet_snapshot" # Memory-mapped columnar fleet snapshots; empty disables them
+    history_retention_days: int = 0 # Simulation runs older than this move to archive files (see app.services.history_retention); 0 keeps all
+    history_archive_dir: str = "./history_archive" # Compressed archives of simulation runs past retention
+    history_compaction_interval_s: float = 3600.0 # Pause between compaction passes
+    history_compaction_batch_size: int = 500 # Runs per archive file and per delete transaction
 
     model_config = SettingsConfigDict(env_file=".env")
 
@@ -1,21 +1,266 @@
-from sqlalchemy import create_engine
+import inspect
+
+from sqlalchemy import MetaData, create_engine, event, inspect as inspect_schema
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateTable
 
 from app.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Pragmas applied to every SQLite connection; journal_mode is set by the writer engine only, since it is
+# a property of the database file
+SQLITE_PRAGMAS = ("synchronous", "mmap_size", "cache_size", "busy_timeout")
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+
+
+def sqlite_pragmas(journal_mode=None, synchronous=None, mmap_size=None, cache_size=None, busy_timeout=None) -> dict:
+    # Engine profile from Settings, with per-call overrides (benchmarks compare profiles)
+    profile = {
+        "journal_mode": (journal_mode or settings.sqlite_journal_mode).lower(),
+        "synchronous": (synchronous or settings.sqlite_synchronous).lower(),
+        "mmap_size": int(settings.sqlite_mmap_size if mmap_size is None else mmap_size),
+        "cache_size": int(settings.sqlite_cache_size if cache_size is None else cache_size),
+        "busy_timeout": int(settings.sqlite_busy_timeout_ms if busy_timeout is None else busy_timeout),
+    }
+    # Values are interpolated into PRAGMA statements, so only known keywords pass
+    if profile["journal_mode"] not in JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal_mode: {profile['journal_mode']}")
+    if profile["synchronous"] not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Unknown SQLite synchronous level: {profile['synchronous']}")
+    return profile
+
+
+def is_sqlite_memory(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def async_database_url(url: str) -> str:
+    # Same database through an asyncio driver (aiosqlite for SQLite)
+    url = make_url(url)
+    if url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+def _apply_sqlite_pragmas(engine, url: str, read_only: bool, pragmas: dict):
+    profile = sqlite_pragmas(**pragmas)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only and not is_sqlite_memory(url):
+            cursor.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        for name in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name} = {profile[name]}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+def make_engine(url: str, read_only: bool = False, pool_size: int = None, **pragmas):
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        **({"pool_size": pool_size} if pool_size else {}),
+    )
+    if engine.dialect.name == "sqlite":
+        _apply_sqlite_pragmas(engine, url, read_only, pragmas)
+    return engine
+
+
+def make_async_engine(url: str, read_only: bool = False, pool_size: int = None, **pragmas):
+    # Async counterpart of make_engine with the same pragma profile; url is the synchronous URL
+    kwargs = {"pool_size": pool_size} if pool_size else {}
+    if not is_sqlite_memory(url):
+        # aiosqlite defaults to NullPool; pooling keeps connections (and their pragmas) open across requests
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(async_database_url(url), **kwargs)
+    if engine.dialect.name == "sqlite":
+        _apply_sqlite_pragmas(engine.sync_engine, url, read_only, pragmas)
+    return engine
+
+
+def effective_pragmas(engine) -> dict:
+    # What SQLite actually runs with, which can differ from the profile (e.g. in-memory databases have no WAL)
+    if engine.dialect.name != "sqlite":
+        return {}
+    with engine.connect() as connection:
+        pragmas = {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode",) + SQLITE_PRAGMAS + ("query_only",)
+        }
+    pragmas["synchronous"] = SYNCHRONOUS_LEVELS[pragmas["synchronous"]]
+    pragmas["query_only"] = bool(pragmas["query_only"])
+    return pragmas
+
+
+def pragma_mismatches(pragmas: dict, read_only: bool = False) -> dict:
+    # {name: (configured, effective)} for every effective pragma that differs from the Settings profile
+    expected = dict(sqlite_pragmas(), query_only=read_only)
+    return {
+        name: (expected[name], value)
+        for name, value in pragmas.items()
+        if name in expected and value != expected[name]
+    }
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# GET endpoints read through their own pool of query_only connections; with WAL they are not blocked by
+# a writer committing a plan. An in-memory database only exists on the writer's connections, so it is shared.
+if is_sqlite_memory(SQLALCHEMY_DATABASE_URL):
+    read_engine = engine
+else:
+    read_engine = make_engine(SQLALCHEMY_DATABASE_URL, read_only=True, pool_size=settings.read_pool_size)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async engines for the request handlers: waiting on SQLite does not hold a threadpool slot. An in-memory
+# database is private to its engine, so the async path only sees the same data for file databases.
+async_engine = make_async_engine(SQLALCHEMY_DATABASE_URL)
+if is_sqlite_memory(SQLALCHEMY_DATABASE_URL):
+    async_read_engine = async_engine
+else:
+    async_read_engine = make_async_engine(SQLALCHEMY_DATABASE_URL, read_only=True, pool_size=settings.read_pool_size)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def upgrade_schema(bind):
+    # Startup schema step: new tables, then columns and indexes that models gained after a table was created.
+    # Columns come first, since new indexes may cover them.
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
+    add_sqlite_autoincrement(bind)
+    create_missing_indexes(bind)
+
+def add_missing_columns(bind):
+    # create_all skips tables that already exist, so nullable columns added to a model later are added here.
+    # Existing rows read NULL for them; anything else needs a real migration.
+    inspector = inspect_schema(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable or column.primary_key:
+                    print(f"Warning: {table.name}.{column.name} is missing and cannot be added automatically")
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}")
+                print(f"Added column {table.name}.{column.name}")
+
+def add_sqlite_autoincrement(bind):
+    # Rebuilds SQLite tables whose model gained sqlite_autoincrement (ids never reused) after they were created:
+    # new table, copy, drop, rename, as SQLite cannot alter a primary key. Indexes are recreated by
+    # create_missing_indexes. A model's info["sequence_floor"] query gives ids used outside the table.
+    if bind.dialect.name != "sqlite":
+        return
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"]["autoincrement"]:
+                continue
+            sql = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+            ).scalar()
+            if sql is None or "AUTOINCREMENT" in sql.upper():
+                continue
+            rebuilt = table.to_metadata(MetaData(), name=f"_{table.name}_rebuild")
+            connection.execute(CreateTable(rebuilt))
+            columns = ", ".join(quote(column.name) for column in table.columns)
+            connection.exec_driver_sql(f"INSERT INTO {quote(rebuilt.name)} ({columns}) SELECT {columns} FROM {quote(table.name)}")
+            connection.exec_driver_sql(f"DROP TABLE {quote(table.name)}")
+            connection.exec_driver_sql(f"ALTER TABLE {quote(rebuilt.name)} RENAME TO {quote(table.name)}")
+            floor = table.info.get("sequence_floor")
+            if floor:
+                floor_id = connection.exec_driver_sql(floor).scalar() or 0
+                connection.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ? AND seq < ?", (table.name, floor_id))
+                connection.exec_driver_sql(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                    (table.name, floor_id, table.name),
+                )
+            print(f"Rebuilt {table.name} with never-reused ids")
+
+def create_missing_indexes(bind):
+    # create_all skips tables that already exist, so indexes added to a model later are created here. Indexes
+    # over a column the table still lacks (one add_missing_columns could not add) are reported and skipped.
+    inspector = inspect_schema(bind)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            missing = [column.name for column in index.columns if column.name not in existing]
+            if missing:
+                print(f"Warning: Skipping index {index.name}: {table.name} has no column {', '.join(missing)}")
+                continue
+            index.create(bind=bind, checkfirst=True)
+
+# get_db and get_async_db are request-scoped units of work: CRUD functions only stage (flush) changes, and
+# the session commits once after the handler returned and its response was serialized, so nothing has to be
+# refreshed. An exception, including an HTTPException, rolls the whole request back. Work that must see the
+# committed state (cache invalidation, re-planning) is registered with after_commit.
+
+def after_commit(db, callback):
+    # callback() runs after the unit of work commits; with get_async_db it may be a coroutine function
+    db.info.setdefault("after_commit", []).append(callback)
+
+def _pop_after_commit(db):
+    return db.info.pop("after_commit", [])
+
 def get_db():
     db = SessionLocal()
+    try:
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
+        db.commit()
+        for callback in _pop_after_commit(db):
+            callback()
+    finally:
+        db.close()
+
+def get_read_db():
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+        await db.commit()
+        for callback in _pop_after_commit(db):
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def dispose_async_engines():
+    # Pooled aiosqlite connections each own a worker thread that keeps the process alive until closed
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
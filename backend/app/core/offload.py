@@ -0,0 +1,15 @@
+from functools import partial
+
+import anyio
+
+from app.core.config import settings
+
+# CPU-heavy work called from async request handlers (optimizer runs, re-plans after order changes) runs on
+# worker threads, never on the event loop. It has its own limiter, so long runs cannot take every slot of
+# the threadpool that serves the remaining synchronous endpoints.
+
+optimizer_limiter = anyio.CapacityLimiter(settings.optimizer_threads)
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    return await anyio.to_thread.run_sync(partial(func, *args, **kwargs), limiter=optimizer_limiter)
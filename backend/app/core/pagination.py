@@ -0,0 +1,54 @@
+import base64
+import binascii
+from typing import List, Optional
+
+from fastapi import HTTPException, Query, Request, Response, status
+
+# Keyset pagination for list endpoints. Rows are returned in primary key order and a page continues
+# after the last id of the previous one (WHERE id > :after ORDER BY id LIMIT :limit), so a deep page
+# costs the same as the first. Bodies stay plain lists; the cursor of the next page is sent in the
+# X-Next-Cursor header and as a Link: rel="next" URL, both absent on the last page.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    # Opaque to clients; anything that did not come from encode_cursor is a 400
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, last_id = text.split(":", 1)
+        if prefix != "id":
+            raise ValueError(prefix)
+        return int(last_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class PageParams:
+    # Dependency for the cursor and limit query parameters
+    __slots__ = ("after", "limit")
+
+    def __init__(self, cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+                 limit: int = Query(100, ge=1)):
+        self.after = decode_cursor(cursor) if cursor else None
+        self.limit = limit
+
+    @property
+    def fetch_limit(self) -> int:
+        # One extra row tells whether a next page exists
+        return self.limit + 1
+
+
+def paginate(rows: List, page: PageParams, request: Request, response: Response) -> List:
+    # rows: up to page.fetch_limit rows in id order; returns the page and sets the next-page headers
+    if len(rows) <= page.limit:
+        return rows
+    rows = rows[:page.limit]
+    cursor = encode_cursor(rows[-1].id)
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    response.headers["Link"] = f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"'
+    return rows
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+
+# Startup state of the app: the process serves requests as soon as the tables exist, while the seed CSV
+# load runs in a background thread. /readyz and require_ready report whether that load has finished.
+# Cold-start milestones are recorded in seconds since the process was launched.
+
+STARTING = "starting"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+_IMPORTED_AT = time.monotonic()
+
+
+def process_uptime() -> float:
+    # Seconds since process launch (Linux /proc); elsewhere, since this module was first imported
+    try:
+        with open("/proc/self/stat") as stat_file:
+            start_ticks = int(stat_file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.monotonic() - _IMPORTED_AT
+
+
+class Readiness:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.status = STARTING
+            self.error: Optional[str] = None
+            self.timings: Dict[str, float] = {}
+            self.database: Dict[str, dict] = {} # Effective SQLite pragmas per engine, filled at startup
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    def mark(self, milestone: str) -> float:
+        # Records a cold-start milestone, e.g. "serving" or "data_ready"
+        elapsed = round(process_uptime(), 3)
+        self.timings[milestone] = elapsed
+        return elapsed
+
+    def start_loading(self, load: Callable[[], None]) -> threading.Thread:
+        with self._lock:
+            self.status = LOADING
+            self.error = None
+            self._thread = threading.Thread(target=self._run, args=(load,), name="initial-data-load", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self, load: Callable[[], None]):
+        try:
+            load()
+        except Exception as exc:
+            self.error = str(exc) or exc.__class__.__name__
+            self.status = FAILED
+            print(f"Initial data load failed: {self.error}")
+            return
+        self.status = READY
+        print(f"Initial data loaded {self.mark('data_ready'):.2f}s after process launch")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.ready
+
+    def as_dict(self) -> dict:
+        return {"status": self.status, "ready": self.ready, "error": self.error, "startup_seconds": dict(self.timings),
+                "database": dict(self.database)}
+
+
+readiness = Readiness()
+
+
+def require_ready():
+    # Dependency for endpoints that read or write the seeded data
+    if readiness.ready:
+        return
+    if readiness.status == FAILED:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"Initial data load failed: {readiness.error}")
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Initial data is still loading, retry shortly.", headers={"Retry-After": "1"})
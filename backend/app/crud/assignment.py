@@ -1,5 +1,9 @@
+from typing import List
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.orm import Session
 from app.models.assignment import Assignment
+from app.models.driver import Driver
+from app.models.order import Order
 from app.schemas.assignment import AssignmentCreate
 
 def get_assignment(db: Session, order_id: str):
@@ -11,11 +15,35 @@ def get_assignments(db: Session, skip: int = 0, limit: int = 100):
 def create_assignment(db: Session, assignment: AssignmentCreate):
     db_assignment = Assignment(**assignment.model_dump())
     db.add(db_assignment)
-    db.commit() # This commits the transaction
-    db.refresh(db_assignment)
-    print(f"DEBUG: Created and committed assignment for order {db_assignment.order_id}") # DEBUG
+    db.flush()
     return db_assignment
 
 def delete_all_assignments(db: Session):
     db.query(Assignment).delete()
-    db.commit()
+
+def bulk_replace_assignments(db: Session, assignments: List[dict]):
+    # Set-based delete + executemany insert; the caller owns the transaction and commits once
+    db.query(Assignment).delete(synchronize_session=False)
+    if assignments:
+        db.execute(insert(Assignment), assignments)
+
+def delete_assignment(db: Session, order_id: str):
+    # Single-order counterparts of bulk_replace_assignments; no commit either
+    db.execute(delete(Assignment).where(Assignment.order_id == order_id))
+
+def upsert_assignment(db: Session, assignment: dict):
+    delete_assignment(db, assignment["order_id"])
+    db.execute(insert(Assignment), [assignment])
+
+def get_current_simulation_run_id(db: Session):
+    # Run id of the plan the assignments table currently holds (None before the first run)
+    return db.execute(select(func.max(Assignment.simulation_run_id))).scalar()
+
+def get_schedule_rows(db: Session):
+    # One joined query instead of an order and a driver lookup per assignment
+    return db.execute(
+        select(Assignment.order_id, Driver.name, Assignment.estimated_delivery_time, Assignment.assigned_at)
+        .join(Order, Order.order_id == Assignment.order_id)
+        .join(Driver, Driver.driver_id == Assignment.driver_id)
+        .order_by(Assignment.id)
+    ).all()
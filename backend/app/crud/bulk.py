@@ -0,0 +1,76 @@
+from typing import Dict, List, Sequence, Set, Union
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+UPSERT_BATCH_SIZE = 5000 # Rows per executemany round trip
+DELETE_BATCH_SIZE = 500 # Keys per IN (...) list, well below SQLite's bound parameter limit
+BATCH_ERRORS = ("not_found", "duplicate") # Item statuses that stop a batch (see batch_item_statuses)
+
+def upsert_rows(db: Session, model, rows: List[dict], key: Union[str, Sequence[str]], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    # Batched INSERT ... ON CONFLICT (key) DO UPDATE; key (one column or several) needs a unique index.
+    # The caller owns the transaction and commits once.
+    if not rows:
+        return 0
+    keys = [key] if isinstance(key, str) else list(key)
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(model.__table__) # Core statement: the ORM bulk path adds per-row overhead
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: stmt.excluded[column] for column in rows[0] if column not in keys},
+    )
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, rows[start:start + batch_size])
+    return len(rows)
+
+def delete_rows(db: Session, model, key: str, values: List, *criteria, batch_size: int = DELETE_BATCH_SIZE) -> int:
+    # Batched DELETE ... WHERE key IN (...); no commit
+    column = model.__table__.c[key]
+    deleted = 0
+    for start in range(0, len(values), batch_size):
+        result = db.execute(delete(model.__table__).where(column.in_(values[start:start + batch_size]), *criteria))
+        deleted += result.rowcount
+    return deleted
+
+def existing_keys(db: Session, model, key: str, values: List, batch_size: int = DELETE_BATCH_SIZE) -> Set:
+    # Which of values exist in the key column, in IN (...) batches
+    column = model.__table__.c[key]
+    existing = set()
+    for start in range(0, len(values), batch_size):
+        existing.update(db.execute(select(column).where(column.in_(values[start:start + batch_size]))).scalars())
+    return existing
+
+def update_rows(db: Session, model, key: str, rows: List[dict]) -> int:
+    # Partial updates by key: one executemany UPDATE per distinct set of columns; no commit
+    table = model.__table__
+    groups: Dict[tuple, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(column for column in row if column != key)), []).append(row)
+    for columns, group in groups.items():
+        if not columns:
+            continue
+        stmt = (
+            update(table)
+            .where(table.c[key] == bindparam(f"b_{key}"))
+            .values({column: bindparam(f"b_{column}") for column in columns})
+        )
+        db.execute(stmt, [{f"b_{column}": value for column, value in row.items()} for row in group])
+    return len(rows)
+
+def batch_item_statuses(db: Session, model, key: str, updates: List[dict], deletes: List) -> List[dict]:
+    # Per-item status of a batch of partial updates and deletes, checked before anything is written:
+    # "updated" / "deleted" when the item applies, "not_found" or "duplicate" (id already in the batch) otherwise
+    actions = [(row[key], "updated") for row in updates] + [(value, "deleted") for value in deletes]
+    existing = existing_keys(db, model, key, [value for value, _ in actions])
+    seen = set()
+    items = []
+    for value, action in actions:
+        if value in seen:
+            status = "duplicate"
+        elif value not in existing:
+            status = "not_found"
+        else:
+            status = action
+        seen.add(value)
+        items.append({"id": value, "status": status})
+    return items
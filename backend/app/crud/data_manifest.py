@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from app.crud.bulk import delete_rows, upsert_rows
+from app.models.data_manifest import DataFile, DataRowHash
+
+# No commits here: manifest changes are committed with the data they describe
+
+def get_data_file(db: Session, name: str):
+    return db.query(DataFile).filter(DataFile.name == name).first()
+
+def save_data_file(db: Session, name: str, content_hash: str, context: str):
+    upsert_rows(db, DataFile, [{"name": name, "content_hash": content_hash, "context": context, "loaded_at": datetime.now()}], "name")
+
+def get_row_hashes(db: Session, name: str) -> Dict[str, int]:
+    return dict(db.query(DataRowHash.key, DataRowHash.row_hash).filter(DataRowHash.file_name == name))
+
+def apply_row_hashes(db: Session, name: str, changed: List[dict], removed_keys: List[str]):
+    # changed: [{"key": ..., "row_hash": ...}] for inserted or updated rows
+    upsert_rows(db, DataRowHash, [{"file_name": name, **row} for row in changed], ("file_name", "key"))
+    delete_rows(db, DataRowHash, "key", removed_keys, DataRowHash.file_name == name)
@@ -1,18 +1,30 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.driver import Driver
+from app.crud.bulk import BATCH_ERRORS, batch_item_statuses, delete_rows, update_rows, upsert_rows
+from app.crud.fleet_version import bump_fleet_version
 from app.schemas.driver import DriverCreate
 
 def get_driver(db: Session, driver_id: str):
     return db.query(Driver).filter(Driver.driver_id == driver_id).first()
 
-def get_drivers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Driver).offset(skip).limit(limit).all()
+def select_drivers(skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    # In id order; `after` is a keyset cursor (the last id already seen), which unlike skip stays cheap on deep pages
+    query = select(Driver)
+    if after is not None:
+        query = query.where(Driver.id > after)
+    return query.order_by(Driver.id).offset(skip).limit(limit)
+
+def get_drivers(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    return db.scalars(select_drivers(skip, limit, after)).all()
 
 def create_driver(db: Session, driver: DriverCreate):
     db_driver = Driver(**driver.model_dump())
     db.add(db_driver)
-    db.commit()
-    db.refresh(db_driver)
+    bump_fleet_version(db)
+    db.flush()
     return db_driver
 
 def create_or_update_driver(db: Session, driver: DriverCreate):
@@ -20,19 +32,43 @@ def create_or_update_driver(db: Session, driver: DriverCreate):
     if db_driver:
         for key, value in driver.model_dump().items():
             setattr(db_driver, key, value)
-        db.commit()
-        db.refresh(db_driver)
+        bump_fleet_version(db)
+        db.flush()
         return db_driver
     else:
         return create_driver(db, driver)
 
+def bulk_upsert_drivers(db: Session, drivers: List[dict]) -> int:
+    # Upsert by driver_id without loading rows; no commit
+    count = upsert_rows(db, Driver, drivers, "driver_id")
+    if count:
+        bump_fleet_version(db)
+    return count
+
+def bulk_delete_drivers(db: Session, driver_ids: List[str]) -> int:
+    # Delete by driver_id in batches; no commit
+    count = delete_rows(db, Driver, "driver_id", driver_ids)
+    if count:
+        bump_fleet_version(db)
+    return count
+
+def batch_update_drivers(db: Session, updates: List[dict], driver_ids_to_delete: List[str]) -> List[dict]:
+    # All-or-nothing set-based batch: nothing is written unless every item applies. No commit.
+    items = batch_item_statuses(db, Driver, "driver_id", updates, driver_ids_to_delete)
+    if any(item["status"] in BATCH_ERRORS for item in items):
+        return items
+    update_rows(db, Driver, "driver_id", updates)
+    delete_rows(db, Driver, "driver_id", driver_ids_to_delete)
+    bump_fleet_version(db)
+    return items
+
 def update_driver(db: Session, driver_id: str, driver_data: dict):
     db_driver = db.query(Driver).filter(Driver.driver_id == driver_id).first()
     if db_driver:
         for key, value in driver_data.items():
             setattr(db_driver, key, value)
-        db.commit()
-        db.refresh(db_driver)
+        bump_fleet_version(db)
+        db.flush()
         return db_driver
     return None
 
@@ -40,6 +76,25 @@ def delete_driver(db: Session, driver_id: str):
     db_driver = db.query(Driver).filter(Driver.driver_id == driver_id).first()
     if db_driver:
         db.delete(db_driver)
-        db.commit()
+        bump_fleet_version(db)
+        db.flush()
         return True
     return False
+
+# Async counterparts for the request handlers. Reads run natively on the AsyncSession; writes run the
+# functions above through run_sync, so fleet versioning stays in one place.
+
+async def get_driver_async(db: AsyncSession, driver_id: str):
+    return await db.scalar(select(Driver).where(Driver.driver_id == driver_id))
+
+async def get_drivers_async(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    return (await db.scalars(select_drivers(skip, limit, after))).all()
+
+async def create_driver_async(db: AsyncSession, driver: DriverCreate):
+    return await db.run_sync(create_driver, driver)
+
+async def update_driver_async(db: AsyncSession, driver_id: str, driver_data: dict):
+    return await db.run_sync(update_driver, driver_id, driver_data)
+
+async def delete_driver_async(db: AsyncSession, driver_id: str):
+    return await db.run_sync(delete_driver, driver_id)
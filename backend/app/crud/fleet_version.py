@@ -0,0 +1,14 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.fleet_version import FleetVersion
+
+def get_fleet_stamp(db: Session) -> Optional[str]:
+    # "<token>-<version>"; None if the row is missing
+    row = db.query(FleetVersion.token, FleetVersion.version).filter(FleetVersion.id == 1).first()
+    return f"{row.token}-{row.version}" if row is not None else None
+
+def bump_fleet_version(db: Session):
+    # No commit: bumped inside the transaction that writes drivers, orders or routes
+    db.query(FleetVersion).filter(FleetVersion.id == 1).update(
+        {FleetVersion.version: FleetVersion.version + 1}, synchronize_session=False
+    )
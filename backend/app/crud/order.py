@@ -1,18 +1,49 @@
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.models.assignment import Assignment
 from app.models.order import Order
+from app.crud.bulk import delete_rows, existing_keys, upsert_rows
+from app.crud.fleet_version import bump_fleet_version
 from app.schemas.order import OrderCreate
 
 def get_order(db: Session, order_id: str):
     return db.query(Order).filter(Order.order_id == order_id).first()
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Order).offset(skip).limit(limit).all()
+def select_orders(skip: int = 0, limit: int = 100, after: Optional[int] = None,
+                  route_id: Optional[str] = None, assigned_driver_id: Optional[str] = None,
+                  unassigned: Optional[bool] = None, delivery_from: Optional[datetime] = None,
+                  delivery_to: Optional[datetime] = None):
+    # In id order, optionally after a keyset cursor (see get_drivers). Each filter is served by an
+    # (column, id) index on orders. For route_id, assigned_driver_id and unassigned the matching rows are an
+    # equality range in cursor order, so a page stops after limit rows. A delivery_time range is not in id
+    # order, so SQLite sorts the whole filtered range before taking the page.
+    query = select(Order)
+    if route_id is not None:
+        query = query.where(Order.route_id == route_id)
+    if assigned_driver_id is not None:
+        query = query.where(Order.assigned_driver_id == assigned_driver_id)
+    if unassigned is not None:
+        query = query.where(Order.assigned_driver_id.is_(None) if unassigned else Order.assigned_driver_id.isnot(None))
+    if delivery_from is not None:
+        query = query.where(Order.delivery_time >= delivery_from)
+    if delivery_to is not None:
+        query = query.where(Order.delivery_time < delivery_to)
+    if after is not None:
+        query = query.where(Order.id > after)
+    return query.order_by(Order.id).offset(skip).limit(limit)
+
+def get_orders(db: Session, skip: int = 0, limit: int = 100, **filters):
+    # filters: see select_orders
+    return db.scalars(select_orders(skip, limit, **filters)).all()
 
 def create_order(db: Session, order: OrderCreate):
     db_order = Order(**order.model_dump())
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    bump_fleet_version(db)
+    db.flush()
     return db_order
 
 def create_or_update_order(db: Session, order: OrderCreate):
@@ -20,8 +51,8 @@ def create_or_update_order(db: Session, order: OrderCreate):
     if db_order:
         for key, value in order.model_dump().items():
             setattr(db_order, key, value)
-        db.commit()
-        db.refresh(db_order)
+        bump_fleet_version(db)
+        db.flush()
         return db_order
     else:
         return create_order(db, order)
@@ -30,17 +61,55 @@ def assign_order_to_driver(db: Session, order_id: str, driver_id: str):
     db_order = db.query(Order).filter(Order.order_id == order_id).first()
     if db_order:
         db_order.assigned_driver_id = driver_id
-        db.commit()
-        db.refresh(db_order)
+        db.flush()
     return db_order
 
+def bulk_assign_orders(db: Session, order_driver_pairs: List[Tuple[str, str]]):
+    # Unassign everything, then set assigned_driver_id with one executemany UPDATE.
+    # The caller owns the transaction and commits once.
+    db.query(Order).filter(Order.assigned_driver_id != None).update(
+        {Order.assigned_driver_id: None}, synchronize_session=False
+    )
+    if order_driver_pairs:
+        orders = Order.__table__
+        db.execute(
+            update(orders)
+            .where(orders.c.order_id == bindparam("b_order_id"))
+            .values(assigned_driver_id=bindparam("b_driver_id")),
+            [{"b_order_id": order_id, "b_driver_id": driver_id} for order_id, driver_id in order_driver_pairs],
+        )
+
+def set_assigned_driver(db: Session, order_id: str, driver_id: Optional[str]):
+    # No commit: used while applying a plan change inside the caller's transaction
+    db.query(Order).filter(Order.order_id == order_id).update(
+        {Order.assigned_driver_id: driver_id}, synchronize_session=False
+    )
+
+def get_existing_order_ids(db: Session, order_ids: List[str]) -> Set[str]:
+    return existing_keys(db, Order, "order_id", order_ids)
+
+def bulk_upsert_orders(db: Session, orders: List[dict]) -> int:
+    # Upsert by order_id without loading rows; no commit
+    count = upsert_rows(db, Order, orders, "order_id")
+    if count:
+        bump_fleet_version(db)
+    return count
+
+def bulk_delete_orders(db: Session, order_ids: List[str]) -> int:
+    # Delete by order_id in batches, together with their assignments; no commit
+    delete_rows(db, Assignment, "order_id", order_ids)
+    count = delete_rows(db, Order, "order_id", order_ids)
+    if count:
+        bump_fleet_version(db)
+    return count
+
 def update_order(db: Session, order_id: str, order_data: dict):
     db_order = db.query(Order).filter(Order.order_id == order_id).first()
     if db_order:
         for key, value in order_data.items():
             setattr(db_order, key, value)
-        db.commit()
-        db.refresh(db_order)
+        bump_fleet_version(db)
+        db.flush()
         return db_order
     return None
 
@@ -48,6 +117,24 @@ def delete_order(db: Session, order_id: str):
     db_order = db.query(Order).filter(Order.order_id == order_id).first()
     if db_order:
         db.delete(db_order)
-        db.commit()
+        bump_fleet_version(db)
+        db.flush()
         return True
     return False
+
+# Async counterparts for the request handlers (see app.crud.driver)
+
+async def get_order_async(db: AsyncSession, order_id: str):
+    return await db.scalar(select(Order).where(Order.order_id == order_id))
+
+async def get_orders_async(db: AsyncSession, skip: int = 0, limit: int = 100, **filters):
+    return (await db.scalars(select_orders(skip, limit, **filters))).all()
+
+async def create_order_async(db: AsyncSession, order: OrderCreate):
+    return await db.run_sync(create_order, order)
+
+async def update_order_async(db: AsyncSession, order_id: str, order_data: dict):
+    return await db.run_sync(update_order, order_id, order_data)
+
+async def delete_order_async(db: AsyncSession, order_id: str):
+    return await db.run_sync(delete_order, order_id)
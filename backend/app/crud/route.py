@@ -1,18 +1,33 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.route import Route
+from app.models.route_cost import RouteCost
+from app.crud.bulk import BATCH_ERRORS, batch_item_statuses, delete_rows, update_rows, upsert_rows
+from app.crud.fleet_version import bump_fleet_version
 from app.schemas.route import RouteCreate
+from app.crud import route_cost as crud_route_cost
 
 def get_route(db: Session, route_id: str):
     return db.query(Route).filter(Route.route_id == route_id).first()
 
-def get_routes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Route).offset(skip).limit(limit).all()
+def select_routes(skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    # In id order; `after` is a keyset cursor (the last id already seen), which unlike skip stays cheap on deep pages
+    query = select(Route)
+    if after is not None:
+        query = query.where(Route.id > after)
+    return query.order_by(Route.id).offset(skip).limit(limit)
+
+def get_routes(db: Session, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    return db.scalars(select_routes(skip, limit, after)).all()
 
 def create_route(db: Session, route: RouteCreate):
     db_route = Route(**route.model_dump())
     db.add(db_route)
-    db.commit()
-    db.refresh(db_route)
+    crud_route_cost.upsert_route_cost(db, db_route)
+    bump_fleet_version(db)
+    db.flush()
     return db_route
 
 def create_or_update_route(db: Session, route: RouteCreate):
@@ -20,26 +35,78 @@ def create_or_update_route(db: Session, route: RouteCreate):
     if db_route:
         for key, value in route.model_dump().items():
             setattr(db_route, key, value)
-        db.commit()
-        db.refresh(db_route)
+        crud_route_cost.upsert_route_cost(db, db_route)
+        bump_fleet_version(db)
+        db.flush()
         return db_route
     else:
         return create_route(db, route)
 
+def bulk_upsert_routes(db: Session, routes: List[dict]) -> int:
+    # Upsert by route_id without loading rows; no commit
+    count = upsert_rows(db, Route, routes, "route_id")
+    if count:
+        bump_fleet_version(db)
+    return count
+
+def bulk_delete_routes(db: Session, route_ids: List[str]) -> int:
+    # Delete by route_id in batches; no commit
+    delete_rows(db, RouteCost, "route_id", route_ids)
+    count = delete_rows(db, Route, "route_id", route_ids)
+    if count:
+        bump_fleet_version(db)
+    return count
+
+def batch_update_routes(db: Session, updates: List[dict], route_ids_to_delete: List[str]) -> List[dict]:
+    # All-or-nothing set-based batch: nothing is written unless every item applies. No commit.
+    items = batch_item_statuses(db, Route, "route_id", updates, route_ids_to_delete)
+    if any(item["status"] in BATCH_ERRORS for item in items):
+        return items
+    update_rows(db, Route, "route_id", updates)
+    crud_route_cost.refresh_route_costs(db, [row["route_id"] for row in updates])
+    delete_rows(db, RouteCost, "route_id", route_ids_to_delete)
+    delete_rows(db, Route, "route_id", route_ids_to_delete)
+    bump_fleet_version(db)
+    return items
+
 def update_route(db: Session, route_id: str, route_data: dict):
     db_route = db.query(Route).filter(Route.route_id == route_id).first()
     if db_route:
+        old_route_id = db_route.route_id
         for key, value in route_data.items():
             setattr(db_route, key, value)
-        db.commit()
-        db.refresh(db_route)
+        if db_route.route_id != old_route_id:
+            crud_route_cost.delete_route_cost(db, old_route_id)
+        crud_route_cost.upsert_route_cost(db, db_route)
+        bump_fleet_version(db)
+        db.flush()
         return db_route
     return None
 
 def delete_route(db: Session, route_id: str):
     db_route = db.query(Route).filter(Route.route_id == route_id).first()
     if db_route:
+        crud_route_cost.delete_route_cost(db, route_id)
         db.delete(db_route)
-        db.commit()
+        bump_fleet_version(db)
+        db.flush()
         return True
     return False
+
+# Async counterparts for the request handlers. Reads run natively on the AsyncSession; writes run the
+# functions above through run_sync, so fleet versioning stays in one place.
+
+async def get_route_async(db: AsyncSession, route_id: str):
+    return await db.scalar(select(Route).where(Route.route_id == route_id))
+
+async def get_routes_async(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[int] = None):
+    return (await db.scalars(select_routes(skip, limit, after))).all()
+
+async def create_route_async(db: AsyncSession, route: RouteCreate):
+    return await db.run_sync(create_route, route)
+
+async def update_route_async(db: AsyncSession, route_id: str, route_data: dict):
+    return await db.run_sync(update_route, route_id, route_data)
+
+async def delete_route_async(db: AsyncSession, route_id: str):
+    return await db.run_sync(delete_route, route_id)
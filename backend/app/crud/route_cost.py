@@ -0,0 +1,70 @@
+from typing import List
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.crud.bulk import DELETE_BATCH_SIZE, upsert_rows
+from app.models.route import Route
+from app.models.route_cost import RouteCost
+from app.services.route_costs import RouteCostRecord, compute_route_cost
+from app.services.solver import RouteRecord
+
+# These helpers do not commit: they run inside the caller's route write so both rows change together
+
+def _row(route) -> dict:
+    cost = compute_route_cost(route)
+    return {
+        "route_id": cost.route_id,
+        "traffic_level": cost.traffic_level,
+        "fuel_cost": cost.fuel_cost,
+        "eta_minutes": cost.eta_minutes,
+        "fatigued_eta_minutes": cost.fatigued_eta_minutes,
+    }
+
+def get_route_cost(db: Session, route_id: str):
+    return db.query(RouteCost).filter(RouteCost.route_id == route_id).first()
+
+def get_route_cost_records(db: Session):
+    # Plain records in route order, ready for CostMatrix. Routes written before the table existed
+    # (or behind the CRUD layer's back) have no cost row yet and are computed on the fly.
+    rows = db.query(
+        Route.route_id, Route.distance_km, Route.traffic_level, Route.base_time_minutes,
+        RouteCost.traffic_level, RouteCost.fuel_cost, RouteCost.eta_minutes, RouteCost.fatigued_eta_minutes
+    ).outerjoin(RouteCost, RouteCost.route_id == Route.route_id).order_by(Route.id)
+    records = []
+    for route_id, distance_km, traffic_level, base_time_minutes, cost_traffic_level, fuel_cost, eta_minutes, fatigued_eta_minutes in rows:
+        if fuel_cost is None:
+            records.append(compute_route_cost(RouteRecord(route_id, distance_km, traffic_level, base_time_minutes)))
+        else:
+            records.append(RouteCostRecord(route_id, cost_traffic_level, fuel_cost, eta_minutes, fatigued_eta_minutes))
+    return records
+
+def upsert_route_cost(db: Session, route: Route):
+    row = _row(route)
+    db_route_cost = get_route_cost(db, route.route_id)
+    if db_route_cost:
+        for key, value in row.items():
+            setattr(db_route_cost, key, value)
+    else:
+        db_route_cost = RouteCost(**row)
+        db.add(db_route_cost)
+    return db_route_cost
+
+def delete_route_cost(db: Session, route_id: str):
+    db.execute(delete(RouteCost).where(RouteCost.route_id == route_id))
+
+def refresh_route_costs(db: Session, route_ids: List[str]) -> int:
+    # Recompute the cost rows of the given routes, e.g. after a batch update
+    routes = []
+    for start in range(0, len(route_ids), DELETE_BATCH_SIZE):
+        routes += db.execute(
+            select(Route.route_id, Route.distance_km, Route.traffic_level, Route.base_time_minutes)
+            .where(Route.route_id.in_(route_ids[start:start + DELETE_BATCH_SIZE]))
+        ).all()
+    return upsert_rows(db, RouteCost, [_row(route) for route in routes], "route_id")
+
+def rebuild_route_costs(db: Session):
+    # Bulk rebuild from the routes table, e.g. after a data load
+    routes = db.execute(select(Route.route_id, Route.distance_km, Route.traffic_level, Route.base_time_minutes)).all()
+    db.execute(delete(RouteCost))
+    if routes:
+        db.execute(insert(RouteCost), [_row(route) for route in routes])
+    return len(routes)
@@ -1,13 +1,106 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import delete, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models.simulation_run import SimulationRun
+from app.models.simulation_run import SimulationRun, SimulationRunPlan
 from app.schemas.simulation_run import SimulationRunCreate
+from app.crud.simulation_run_rollup import record_runs
+from app.services.plan_codec import FORMAT_VERSION, encode_plan
+from app.services.solver import PlannedAssignment
 
 def create_simulation_run(db: Session, simulation_run: SimulationRunCreate):
+    # Flush only, so the run can be committed together with the plan it describes
     db_simulation_run = SimulationRun(**simulation_run.model_dump())
     db.add(db_simulation_run)
-    db.commit()
-    db.refresh(db_simulation_run)
+    db.flush()
+    record_runs(db, [db_simulation_run])
     return db_simulation_run
 
-def get_simulation_runs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(SimulationRun).offset(skip).limit(limit).all()
+def get_simulation_run(db: Session, simulation_run_id: int):
+    return db.query(SimulationRun).filter(SimulationRun.id == simulation_run_id).first()
+
+def create_simulation_run_plan(db: Session, simulation_run_id: int, assigned_at: datetime, assignments: List[PlannedAssignment]):
+    # No commit: stored in the transaction that records the run
+    db_plan = SimulationRunPlan(
+        simulation_run_id=simulation_run_id,
+        format_version=FORMAT_VERSION,
+        assigned_at=assigned_at,
+        num_assignments=len(assignments),
+        data=encode_plan(assignments),
+    )
+    db.add(db_plan)
+    return db_plan
+
+def create_simulation_runs(db: Session, simulation_runs: List[SimulationRunCreate]):
+    # Many runs in one flush; ids are read after the flush instead of refreshing each row
+    db_simulation_runs = [SimulationRun(**simulation_run.model_dump()) for simulation_run in simulation_runs]
+    db.add_all(db_simulation_runs)
+    db.flush()
+    record_runs(db, db_simulation_runs)
+    return [db_simulation_run.id for db_simulation_run in db_simulation_runs]
+
+def select_simulation_runs(skip: int = 0, limit: int = 100, after: Optional[int] = None,
+                           timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None):
+    # In id order, optionally after a keyset cursor (see get_drivers); timestamp_to is exclusive. A timestamp
+    # range is read through ix_simulation_runs_timestamp and then sorted by id.
+    query = select(SimulationRun)
+    if timestamp_from is not None:
+        query = query.where(SimulationRun.timestamp >= timestamp_from)
+    if timestamp_to is not None:
+        query = query.where(SimulationRun.timestamp < timestamp_to)
+    if after is not None:
+        query = query.where(SimulationRun.id > after)
+    return query.order_by(SimulationRun.id).offset(skip).limit(limit)
+
+def get_simulation_runs(db: Session, skip: int = 0, limit: int = 100, **filters):
+    # filters: see select_simulation_runs
+    return db.scalars(select_simulation_runs(skip, limit, **filters)).all()
+
+def select_top_simulation_runs(top_by: str, limit: int, timestamp_from: Optional[datetime] = None,
+                               timestamp_to: Optional[datetime] = None):
+    # Best runs by a KPI (indexed), ties broken by id
+    query = select(SimulationRun)
+    if timestamp_from is not None:
+        query = query.where(SimulationRun.timestamp >= timestamp_from)
+    if timestamp_to is not None:
+        query = query.where(SimulationRun.timestamp < timestamp_to)
+    return query.order_by(desc(getattr(SimulationRun, top_by)), SimulationRun.id).limit(limit)
+
+def get_runs_to_archive(db: Session, before: datetime, limit: int, keep_id: Optional[int] = None) -> List[SimulationRun]:
+    # Up to limit runs in id order, all from the oldest day with runs recorded before the cutoff; keep_id
+    # (the run the live assignments belong to) is never archived
+    query = select(func.min(SimulationRun.timestamp)).where(SimulationRun.timestamp < before)
+    if keep_id is not None:
+        query = query.where(SimulationRun.id != keep_id)
+    oldest = db.scalar(query)
+    if oldest is None:
+        return []
+    day = oldest.replace(hour=0, minute=0, second=0, microsecond=0)
+    query = select(SimulationRun).where(SimulationRun.timestamp >= day, SimulationRun.timestamp < min(day + timedelta(days=1), before))
+    if keep_id is not None:
+        query = query.where(SimulationRun.id != keep_id)
+    return db.scalars(query.order_by(SimulationRun.id).limit(limit)).all()
+
+def get_simulation_run_plans(db: Session, simulation_run_ids: List[int]) -> Dict[int, SimulationRunPlan]:
+    return {
+        db_plan.simulation_run_id: db_plan
+        for db_plan in db.scalars(select(SimulationRunPlan).where(SimulationRunPlan.simulation_run_id.in_(simulation_run_ids)))
+    }
+
+def delete_simulation_runs(db: Session, simulation_run_ids: List[int]) -> int:
+    # Runs and their plans; returns the number of runs deleted. Rollups keep counting them.
+    db.execute(delete(SimulationRunPlan).where(SimulationRunPlan.simulation_run_id.in_(simulation_run_ids)))
+    return db.execute(delete(SimulationRun).where(SimulationRun.id.in_(simulation_run_ids))).rowcount
+
+async def get_top_simulation_runs_async(db: AsyncSession, top_by: str, limit: int, **filters):
+    return (await db.scalars(select_top_simulation_runs(top_by, limit, **filters))).all()
+
+async def get_simulation_runs_async(db: AsyncSession, skip: int = 0, limit: int = 100, **filters):
+    return (await db.scalars(select_simulation_runs(skip, limit, **filters))).all()
+
+async def get_simulation_run_async(db: AsyncSession, simulation_run_id: int):
+    return await db.get(SimulationRun, simulation_run_id)
+
+async def get_simulation_run_plan_async(db: AsyncSession, simulation_run_id: int):
+    return await db.get(SimulationRunPlan, simulation_run_id)
@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import anyio
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.simulation_run import SimulationRun, SimulationRunArchive, SimulationRunPlan
+from app.services.history_archive import read_plan, read_runs
+
+# Index of the archive files holding simulation runs past retention. The history endpoints read archived
+# runs through these helpers, next to the runs still in simulation_runs. File reads run on worker threads.
+
+def day_of(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def create_simulation_run_archive(db: Session, day: datetime, path: str, runs: List[SimulationRun], plan_count: int):
+    # No commit: added in the transaction that deletes the archived runs
+    db_archive = SimulationRunArchive(
+        day=day,
+        path=path,
+        first_run_id=runs[0].id,
+        last_run_id=runs[-1].id,
+        run_count=len(runs),
+        plan_count=plan_count,
+        total_profit_max=max(run.total_profit for run in runs),
+        efficiency_score_max=max(run.efficiency_score for run in runs),
+        created_at=datetime.now(),
+    )
+    db.add(db_archive)
+    return db_archive
+
+def select_archives(timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None):
+    # Files that may hold runs in [timestamp_from, timestamp_to)
+    query = select(SimulationRunArchive)
+    if timestamp_from is not None:
+        query = query.where(SimulationRunArchive.day >= day_of(timestamp_from))
+    if timestamp_to is not None:
+        query = query.where(SimulationRunArchive.day < timestamp_to)
+    return query
+
+def _in_range(run: SimulationRun, timestamp_from: Optional[datetime], timestamp_to: Optional[datetime]) -> bool:
+    return (timestamp_from is None or run.timestamp >= timestamp_from) and (timestamp_to is None or run.timestamp < timestamp_to)
+
+def iter_archived_runs(db: Session) -> Iterator[Tuple[SimulationRun, ...]]:
+    # Every archived run, one file at a time
+    for path in db.scalars(select(SimulationRunArchive.path).order_by(SimulationRunArchive.id)).all():
+        yield read_runs(path)
+
+async def _read_runs_async(path: str) -> Tuple[SimulationRun, ...]:
+    return await anyio.to_thread.run_sync(read_runs, path)
+
+async def get_archived_runs_async(db: AsyncSession, limit: int, after: Optional[int] = None,
+                                  timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None):
+    # The first limit archived runs in id order, with the filters of select_simulation_runs. Files are read in
+    # order of their first id, and only until no later file can hold one of the first limit runs.
+    query = select_archives(timestamp_from, timestamp_to)
+    if after is not None:
+        query = query.where(SimulationRunArchive.last_run_id > after)
+    archives = (await db.scalars(query.order_by(SimulationRunArchive.first_run_id))).all()
+    runs = []
+    for archive in archives:
+        if len(runs) >= limit and archive.first_run_id > runs[limit - 1].id:
+            break
+        runs.extend(
+            run for run in await _read_runs_async(archive.path)
+            if (after is None or run.id > after) and _in_range(run, timestamp_from, timestamp_to)
+        )
+        runs.sort(key=lambda run: run.id)
+    return runs[:limit]
+
+async def get_top_archived_runs_async(db: AsyncSession, top_by: str, limit: int,
+                                      timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None):
+    # Best archived runs by a KPI, as select_top_simulation_runs; files whose best value cannot make the list are skipped
+    best_in_file = getattr(SimulationRunArchive, f"{top_by}_max")
+    archives = (await db.scalars(select_archives(timestamp_from, timestamp_to).order_by(desc(best_in_file)))).all()
+    runs = []
+    for archive in archives:
+        if len(runs) >= limit and getattr(archive, f"{top_by}_max") < getattr(runs[limit - 1], top_by):
+            break
+        runs.extend(run for run in await _read_runs_async(archive.path) if _in_range(run, timestamp_from, timestamp_to))
+        runs.sort(key=lambda run: (-getattr(run, top_by), run.id))
+        del runs[limit:]
+    return runs
+
+async def get_archived_run_async(db: AsyncSession, simulation_run_id: int) -> Optional[Tuple[SimulationRun, Optional[SimulationRunPlan]]]:
+    # The archived run and its plan (None for runs without one), or None if the run is not archived
+    paths = (await db.scalars(
+        select(SimulationRunArchive.path)
+        .where(SimulationRunArchive.first_run_id <= simulation_run_id, SimulationRunArchive.last_run_id >= simulation_run_id)
+    )).all()
+    for path in paths:
+        run = next((run for run in await _read_runs_async(path) if run.id == simulation_run_id), None)
+        if run is not None:
+            return run, await anyio.to_thread.run_sync(read_plan, path, simulation_run_id)
+    return None
@@ -0,0 +1,138 @@
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.simulation_run import ROLLUP_METRICS, ROLLUP_PARAMETERS, SimulationRun, SimulationRunRollup
+from app.crud.simulation_run_archive import day_of, iter_archived_runs
+from app.services.quantile_sketch import QuantileSketch
+
+# Hourly rollups of simulation runs per input parameters, updated in the transaction that records the
+# runs. Past the retention period they are merged into daily rows (bucket_start at midnight), which keep
+# summarising the runs after those move to archive files. None of these helpers commit.
+
+REBUILD_BATCH_SIZE = 10000
+
+def bucket_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def run_parameters(run) -> tuple:
+    return tuple(getattr(run, name) for name in ROLLUP_PARAMETERS)
+
+def group_key(parameters: tuple) -> str:
+    return json.dumps(list(parameters), separators=(",", ":"))
+
+def record_runs(db: Session, runs: Iterable):
+    # Adds the runs (SimulationRun rows, or anything with their fields) to their hour's rollups
+    groups = {}
+    for run in runs:
+        groups.setdefault((bucket_start(run.timestamp), run_parameters(run)), []).append(run)
+    for (start, parameters), group in groups.items():
+        key = group_key(parameters)
+        # The run's INSERT already holds SQLite's write lock, so no other writer can update this row meanwhile
+        rollup = db.scalar(
+            select(SimulationRunRollup)
+            .where(SimulationRunRollup.bucket_start == start, SimulationRunRollup.group_key == key)
+            .with_for_update()
+        )
+        if rollup is None:
+            rollup = SimulationRunRollup(bucket_start=start, group_key=key, run_count=0, **dict(zip(ROLLUP_PARAMETERS, parameters)))
+            db.add(rollup)
+        _add_runs(rollup, group)
+    # Later calls in the same transaction must find the rows added here (the session does not autoflush)
+    db.flush()
+
+def _add_runs(rollup: SimulationRunRollup, runs: list):
+    rollup.run_count = (rollup.run_count or 0) + len(runs)
+    for metric in ROLLUP_METRICS:
+        values = [getattr(run, metric) for run in runs]
+        total, low, high = (getattr(rollup, f"{metric}_{field}") for field in ("sum", "min", "max"))
+        setattr(rollup, f"{metric}_sum", (total or 0.0) + sum(values))
+        setattr(rollup, f"{metric}_min", min(values) if low is None else min(low, *values))
+        setattr(rollup, f"{metric}_max", max(values) if high is None else max(high, *values))
+        sketch = QuantileSketch.from_json(getattr(rollup, f"{metric}_sketch"))
+        sketch.update(values)
+        setattr(rollup, f"{metric}_sketch", sketch.to_json())
+
+def rebuild_rollups(db: Session) -> int:
+    # Recomputes every rollup from simulation_runs, in id-ordered batches, and from the archive files; returns
+    # the number of runs. Archived days come back hourly until the next compaction pass merges them again.
+    db.execute(delete(SimulationRunRollup))
+    count, after = 0, 0
+    while True:
+        runs = db.scalars(select(SimulationRun).where(SimulationRun.id > after).order_by(SimulationRun.id).limit(REBUILD_BATCH_SIZE)).all()
+        if not runs:
+            break
+        record_runs(db, runs)
+        count += len(runs)
+        after = runs[-1].id
+        db.expunge_all() # Keep the identity map to one batch
+    for runs in iter_archived_runs(db):
+        record_runs(db, runs)
+        count += len(runs)
+        db.expunge_all()
+    return count
+
+def backfill_rollups(db: Session) -> int:
+    # Runs recorded before the rollup table existed; nothing to do once it has rows
+    if db.scalar(select(SimulationRunRollup.id).limit(1)) is not None:
+        return 0
+    if db.scalar(select(SimulationRun.id).limit(1)) is None:
+        return 0
+    return rebuild_rollups(db)
+
+def get_days_to_compact(db: Session, before: datetime) -> List[datetime]:
+    # Days before the cutoff that still have hourly rows
+    starts = db.scalars(select(SimulationRunRollup.bucket_start).where(SimulationRunRollup.bucket_start < before).distinct()).all()
+    return sorted({day_of(start) for start in starts if start != day_of(start)})
+
+def compact_rollups(db: Session, day: datetime) -> int:
+    # Merges the day's hourly rows into one row per group at midnight; returns the number of rows merged away
+    rollups = db.scalars(
+        select(SimulationRunRollup)
+        .where(SimulationRunRollup.bucket_start >= day, SimulationRunRollup.bucket_start < day + timedelta(days=1))
+        .order_by(SimulationRunRollup.bucket_start, SimulationRunRollup.id)
+    ).all()
+    daily = {rollup.group_key: rollup for rollup in rollups if rollup.bucket_start == day}
+    merged = 0
+    for rollup in rollups:
+        if rollup.bucket_start == day:
+            continue
+        target = daily.get(rollup.group_key)
+        if target is None:
+            # The group's first hour of the day becomes its daily row
+            rollup.bucket_start = day
+            daily[rollup.group_key] = rollup
+            continue
+        _merge_rollup(target, rollup)
+        db.delete(rollup)
+        merged += 1
+    db.flush()
+    return merged
+
+def _merge_rollup(target: SimulationRunRollup, rollup: SimulationRunRollup):
+    target.run_count += rollup.run_count
+    for metric in ROLLUP_METRICS:
+        setattr(target, f"{metric}_sum", getattr(target, f"{metric}_sum") + getattr(rollup, f"{metric}_sum"))
+        setattr(target, f"{metric}_min", min(getattr(target, f"{metric}_min"), getattr(rollup, f"{metric}_min")))
+        setattr(target, f"{metric}_max", max(getattr(target, f"{metric}_max"), getattr(rollup, f"{metric}_max")))
+        sketch = QuantileSketch.from_json(getattr(target, f"{metric}_sketch"))
+        sketch.merge(QuantileSketch.from_json(getattr(rollup, f"{metric}_sketch")))
+        setattr(target, f"{metric}_sketch", sketch.to_json())
+
+def select_rollups(timestamp_from: Optional[datetime] = None, timestamp_to: Optional[datetime] = None):
+    # Hourly rows (daily past retention), so the range applies per hour: the hour containing timestamp_from is
+    # included, timestamp_to is exclusive
+    query = select(SimulationRunRollup)
+    if timestamp_from is not None:
+        query = query.where(SimulationRunRollup.bucket_start >= bucket_start(timestamp_from))
+    if timestamp_to is not None:
+        query = query.where(SimulationRunRollup.bucket_start < timestamp_to)
+    return query.order_by(SimulationRunRollup.bucket_start, SimulationRunRollup.id)
+
+def get_rollups(db: Session, **filters):
+    return db.scalars(select_rollups(**filters)).all()
+
+async def get_rollups_async(db: AsyncSession, **filters):
+    return (await db.scalars(select_rollups(**filters))).all()
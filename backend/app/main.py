@@ -1,12 +1,20 @@
 from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware # Added import
 
-from app.core.database import engine, Base, get_db
-from app.api import drivers, orders, routes, optimization, simulation_history, auth # New import
+from app.core.config import settings
+from app.core.database import (
+    engine, read_engine, SessionLocal, dispose_async_engines, effective_pragmas, pragma_mismatches, upgrade_schema,
+)
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.readiness import readiness, require_ready
+from app.api import drivers, orders, routes, optimization, simulation_history, auth, jobs, imports, health # New import
 from app.core.security import get_current_user # New import
+from app.crud.simulation_run_rollup import backfill_rollups
+from app.services.history_retention import history_compactor
+from app.services.write_coalescer import write_coalescer
 import app.models.user # Ensure User model is registered with Base.metadata
-from app.services.data_loader import load_all_data
+import app.models.data_manifest # Used by the data loader, which is only imported once tables exist
+import app.models.fleet_version
 
 app = FastAPI(
     title="Delivery Driver Management API",
@@ -26,23 +34,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Link"], # Let the frontend read list pagination cursors
 )
 
+def load_initial_data():
+    # Load initial data from CSVs; only files and rows changed since the last boot are applied.
+    # Imported here so that pandas is only loaded by the background thread, not by the app import.
+    from app.services.data_loader import load_all_data
+    db = SessionLocal()
+    try:
+        load_all_data(db, force=settings.force_data_reload)
+        # Simulation history recorded before the rollup table existed
+        backfilled = backfill_rollups(db)
+        if backfilled:
+            db.commit()
+            print(f"Rolled up {backfilled} existing simulation runs")
+    finally:
+        db.close()
+    # Archiving past HISTORY_RETENTION_DAYS starts once the rollups cover every run
+    history_compactor.start()
+
+def report_database_profile():
+    # Log the pragmas SQLite actually runs with; e.g. WAL is unavailable for in-memory databases
+    engines = [("writer", engine, False)]
+    if read_engine is not engine:
+        engines.append(("reader", read_engine, True))
+    for role, bind, read_only in engines:
+        pragmas = effective_pragmas(bind)
+        if not pragmas:
+            continue
+        readiness.database[role] = pragmas
+        print(f"SQLite {role}: " + ", ".join(f"{name}={value}" for name, value in pragmas.items()))
+        for name, (configured, value) in pragma_mismatches(pragmas, read_only).items():
+            print(f"Warning: SQLite {role} runs with {name}={value}, configured {configured}")
+
 @app.on_event("startup")
 def on_startup():
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    # Load initial data from CSVs
-    db = next(get_db())
-    load_all_data(db)
-    db.close()
+    # Create database tables, and columns and indexes added since the database was created
+    upgrade_schema(engine)
+    report_database_profile()
+    # Serve right away; data endpoints answer 503 until the load thread finishes (see /readyz)
+    readiness.start_loading(load_initial_data)
+    print(f"Accepting connections {readiness.mark('serving'):.2f}s after process launch")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.jobs import job_manager
+    # Background writers stop first, then queued writes are applied before the engines go away
+    job_manager.shutdown(wait=False)
+    history_compactor.stop()
+    await write_coalescer.shutdown() # Applies what is still queued
+    await dispose_async_engines()
+
+# Endpoints over the seeded data wait for the initial load
+data_dependencies = [Depends(get_current_user), Depends(require_ready)]
 
+app.include_router(health.router, tags=["Health"])
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(drivers.router, dependencies=[Depends(get_current_user)])
-app.include_router(orders.router, dependencies=[Depends(get_current_user)])
-app.include_router(routes.router, dependencies=[Depends(get_current_user)])
-app.include_router(optimization.router, dependencies=[Depends(get_current_user)])
-app.include_router(simulation_history.router, dependencies=[Depends(get_current_user)]) # New router include
+app.include_router(drivers.router, dependencies=data_dependencies)
+app.include_router(orders.router, dependencies=data_dependencies)
+app.include_router(routes.router, dependencies=data_dependencies)
+app.include_router(optimization.router, dependencies=data_dependencies)
+app.include_router(simulation_history.router, dependencies=data_dependencies) # New router include
+app.include_router(jobs.router, dependencies=data_dependencies)
+app.include_router(imports.router, dependencies=data_dependencies)
 
 @app.get("/", tags=["Root"])
 async def read_root():
@@ -9,3 +9,5 @@ class Assignment(Base):
     driver_id = Column(String, ForeignKey("drivers.driver_id"), index=True)
     estimated_delivery_time = Column(DateTime)
     assigned_at = Column(DateTime)
+    # Plan this assignment belongs to; KPIs for the plan live on that simulation run
+    simulation_run_id = Column(Integer, ForeignKey("simulation_runs.id"), index=True, nullable=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, UniqueConstraint
+from app.core.database import Base
+
+class DataFile(Base):
+    # Last loaded version of each seed CSV (see app.services.data_loader)
+    __tablename__ = "data_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    content_hash = Column(String) # sha256 of the file bytes
+    context = Column(String) # Anything else the parsed rows depend on, e.g. the date HH:MM times resolve to
+    loaded_at = Column(DateTime)
+
+class DataRowHash(Base):
+    # Content hash of every row a seed CSV produced, keyed by the entity id it was written to
+    __tablename__ = "data_row_hashes"
+    __table_args__ = (UniqueConstraint("file_name", "key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_name = Column(String, index=True)
+    key = Column(String)
+    row_hash = Column(BigInteger)
@@ -0,0 +1,16 @@
+import uuid
+from sqlalchemy import Column, Integer, String, event
+from app.core.database import Base
+
+class FleetVersion(Base):
+    # Single row stamping the current contents of drivers, orders and routes (see app.services.fleet_store).
+    # token identifies the database, version is bumped by every CRUD write to those tables.
+    __tablename__ = "fleet_versions"
+
+    id = Column(Integer, primary_key=True)
+    token = Column(String)
+    version = Column(Integer, default=0)
+
+@event.listens_for(FleetVersion.__table__, "after_create")
+def _insert_fleet_version(target, connection, **kw):
+    connection.execute(target.insert().values(id=1, token=uuid.uuid4().hex, version=0))
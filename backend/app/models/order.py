@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    # List filters (see crud.order.get_orders) page in id order, so each index ends with id
+    __table_args__ = (
+        Index("ix_orders_route_id_id", "route_id", "id"),
+        Index("ix_orders_assigned_driver_id_id", "assigned_driver_id", "id"),
+        Index("ix_orders_delivery_time_id", "delivery_time", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(String, unique=True, index=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Enum, Float, ForeignKey, Integer, String
+from app.core.database import Base
+from app.services.route_costs import TRAFFIC_LEVELS, UNKNOWN_TRAFFIC_LEVEL
+
+class RouteCost(Base):
+    # Materialized per-route costs, kept in sync by app.crud.route
+    __tablename__ = "route_costs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    route_id = Column(String, ForeignKey("routes.route_id"), unique=True, index=True)
+    traffic_level = Column(Enum(*TRAFFIC_LEVELS, UNKNOWN_TRAFFIC_LEVEL, name="traffic_level"))
+    fuel_cost = Column(Float)
+    eta_minutes = Column(Float)
+    fatigued_eta_minutes = Column(Float)
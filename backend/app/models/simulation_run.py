@@ -1,21 +1,84 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, LargeBinary, UniqueConstraint
 from app.core.database import Base
 
 class SimulationRun(Base):
     __tablename__ = "simulation_runs"
+    # Ids are never reused once runs move to the archive (see app.services.history_retention). Tables created
+    # before that are rebuilt by upgrade_schema, which starts the id sequence past every archived id.
+    __table_args__ = {
+        "sqlite_autoincrement": True,
+        "info": {"sequence_floor": "SELECT max(last_run_id) FROM simulation_run_archives"},
+    }
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, index=True)
     num_available_drivers = Column(Integer)
     route_start_time = Column(String)
     max_hours_per_driver_per_day = Column(Float)
-    total_profit = Column(Float)
-    efficiency_score = Column(Float)
+    strategy = Column(String, nullable=True)
+    total_profit = Column(Float, index=True) # Indexed for top-k queries
+    efficiency_score = Column(Float, index=True)
     total_deliveries = Column(Integer)
     on_time_deliveries = Column(Integer)
     late_deliveries = Column(Integer)
     total_fuel_cost = Column(Float)
     total_penalties = Column(Float)
     total_bonuses = Column(Float)
-    # Store assignments as JSON string for simplicity, or link to individual assignments
-    # For now, just storing KPIs and inputs as requested for history
+    # The plan itself is stored per run in simulation_run_plans; the assignments table only holds the live plan
+
+class SimulationRunPlan(Base):
+    # Full plan of a run (order -> driver, ETA, profit components) as compressed column arrays, see
+    # app.services.plan_codec. Runs recorded by sweeps only keep their KPIs and have no row here.
+    __tablename__ = "simulation_run_plans"
+
+    simulation_run_id = Column(Integer, ForeignKey("simulation_runs.id"), primary_key=True)
+    format_version = Column(Integer)
+    assigned_at = Column(DateTime)
+    num_assignments = Column(Integer)
+    data = Column(LargeBinary)
+
+class SimulationRunRollup(Base):
+    # Runs per hour and input parameters, kept up to date as runs are recorded (see app.crud.simulation_run_rollup).
+    # For each KPI in ROLLUP_METRICS: sum, min, max and a mergeable quantile sketch (app.services.quantile_sketch).
+    __tablename__ = "simulation_run_rollups"
+    __table_args__ = (UniqueConstraint("bucket_start", "group_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, index=True) # Start of the hour
+    group_key = Column(String) # The four parameters below, canonically encoded; NULLs are not unique in SQL
+    num_available_drivers = Column(Integer, nullable=True)
+    route_start_time = Column(String, nullable=True)
+    max_hours_per_driver_per_day = Column(Float, nullable=True)
+    strategy = Column(String, nullable=True)
+    run_count = Column(Integer, default=0)
+    total_profit_sum = Column(Float)
+    total_profit_min = Column(Float)
+    total_profit_max = Column(Float)
+    total_profit_sketch = Column(Text)
+    efficiency_score_sum = Column(Float)
+    efficiency_score_min = Column(Float)
+    efficiency_score_max = Column(Float)
+    efficiency_score_sketch = Column(Text)
+    total_penalties_sum = Column(Float)
+    total_penalties_min = Column(Float)
+    total_penalties_max = Column(Float)
+    total_penalties_sketch = Column(Text)
+
+class SimulationRunArchive(Base):
+    # One compressed file of archived runs (and their plans), all from the same day; see app.services.history_archive.
+    # The runs themselves are deleted from simulation_runs in the transaction that adds this row.
+    __tablename__ = "simulation_run_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(DateTime, index=True) # Midnight of the runs' day
+    path = Column(String) # Relative to HISTORY_ARCHIVE_DIR
+    first_run_id = Column(Integer, index=True)
+    last_run_id = Column(Integer, index=True)
+    run_count = Column(Integer)
+    plan_count = Column(Integer)
+    total_profit_max = Column(Float) # Best values in the file, so top-k queries can skip it
+    efficiency_score_max = Column(Float)
+    created_at = Column(DateTime)
+
+ROLLUP_METRICS = ("total_profit", "efficiency_score", "total_penalties")
+ROLLUP_PARAMETERS = ("num_available_drivers", "route_start_time", "max_hours_per_driver_per_day", "strategy")
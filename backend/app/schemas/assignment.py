@@ -1,11 +1,13 @@
 from datetime import datetime
 from pydantic import BaseModel
+from typing import Optional
 
 class AssignmentBase(BaseModel):
     order_id: str
     driver_id: str
     estimated_delivery_time: datetime
     assigned_at: datetime
+    simulation_run_id: Optional[int] = None
 
 class AssignmentCreate(AssignmentBase):
     pass
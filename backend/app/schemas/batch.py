@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+class BatchItemStatus(BaseModel):
+    id: str
+    status: str # updated, deleted, not_found or duplicate
+
+class BatchResult(BaseModel):
+    updated: int
+    deleted: int
+    items: List[BatchItemStatus]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class DriverBase(BaseModel):
     driver_id: str
@@ -15,6 +15,14 @@ class DriverUpdate(BaseModel):
     shift_hours_today: Optional[float] = None
     hours_worked_past_week: Optional[float] = None
 
+class DriverBatchUpdate(DriverUpdate):
+    driver_id: str
+
+class DriverBatch(BaseModel):
+    # PATCH /drivers: partial updates and deletes applied together, all or nothing
+    updates: List[DriverBatchUpdate] = []
+    deletes: List[str] = []
+
 class Driver(DriverBase):
     id: int
 
@@ -1,10 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Annotated, Optional, List, Dict, Any, Literal
+
+ROUTE_START_TIME_PATTERN = "^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$"
 
 class SimulationInput(BaseModel):
     num_available_drivers: Optional[int] = Field(None, ge=1, description="Number of drivers available for the simulation.")
-    route_start_time: Optional[str] = Field(None, pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$", description="Start time for routes in HH:MM format.")
+    route_start_time: Optional[str] = Field(None, pattern=ROUTE_START_TIME_PATTERN, description="Start time for routes in HH:MM format.")
     max_hours_per_driver_per_day: Optional[float] = Field(None, ge=0, description="Maximum hours a driver can work per day.")
+    strategy: Literal["greedy", "optimal", "auto"] = Field("greedy", description="Assignment strategy: earliest-deadline greedy, globally optimal (linear_sum_assignment), or auto by problem size.")
 
 class KpiData(BaseModel):
     total_profit: float
@@ -17,5 +20,32 @@ class KpiData(BaseModel):
     total_bonuses: float
 
 class OptimizedScheduleResponse(BaseModel):
+    simulation_run_id: Optional[int] = None
     schedule: List[Dict[str, Any]]
-    kpis: Optional[KpiData] = None
\ No newline at end of file
+    kpis: Optional[KpiData] = None
+
+class SweepGrid(BaseModel):
+    # Cartesian product of these values; None means "use the default" for that field. Values are constrained
+    # as in SimulationInput, so an invalid one is rejected with the request.
+    num_available_drivers: List[Optional[Annotated[int, Field(ge=1)]]] = [None]
+    route_start_time: List[Optional[Annotated[str, Field(pattern=ROUTE_START_TIME_PATTERN)]]] = [None]
+    max_hours_per_driver_per_day: List[Optional[Annotated[float, Field(ge=0)]]] = [None]
+    strategy: List[Literal["greedy", "optimal", "auto"]] = ["greedy"]
+
+class SweepRequest(BaseModel):
+    variants: List[SimulationInput] = Field(default_factory=list, description="Explicit list of scenarios to evaluate.")
+    grid: Optional[SweepGrid] = Field(None, description="Grid of scenarios, appended after the explicit variants.")
+    record_runs: bool = Field(False, description="Store every evaluated variant in simulation history.")
+    max_workers: Optional[int] = Field(None, ge=1, description="Upper bound on worker processes for this sweep.")
+
+class SweepResult(BaseModel):
+    index: int
+    simulation_input: SimulationInput
+    strategy: str
+    kpis: KpiData
+    pareto_optimal: bool
+    simulation_run_id: Optional[int] = None
+
+class SweepResponse(BaseModel):
+    results: List[SweepResult]
+    pareto_front: List[int] # Indexes into results, best profit first
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class RouteBase(BaseModel):
     route_id: str
@@ -15,6 +15,14 @@ class RouteUpdate(BaseModel):
     traffic_level: Optional[str] = None
     base_time_minutes: Optional[int] = None
 
+class RouteBatchUpdate(RouteUpdate):
+    route_id: str
+
+class RouteBatch(BaseModel):
+    # PATCH /routes: partial updates and deletes applied together, all or nothing
+    updates: List[RouteBatchUpdate] = []
+    deletes: List[str] = []
+
 class Route(RouteBase):
     id: int
 
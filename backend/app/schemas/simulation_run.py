@@ -1,12 +1,13 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 class SimulationRunBase(BaseModel):
     timestamp: datetime
     num_available_drivers: Optional[int] = None
     route_start_time: Optional[str] = None
     max_hours_per_driver_per_day: Optional[float] = None
+    strategy: Optional[str] = None
     total_profit: float
     efficiency_score: float
     total_deliveries: int
@@ -24,3 +25,59 @@ class SimulationRun(SimulationRunBase):
 
     class Config:
         from_attributes = True
+
+class PlannedAssignment(BaseModel):
+    order_id: str
+    driver_id: str
+    estimated_delivery_time: datetime
+    on_time: bool
+    bonus: float
+    penalty: float
+    fuel_cost: float
+    profit: float
+
+class SimulationRunPlan(BaseModel):
+    simulation_run_id: int
+    assigned_at: datetime
+    assignments: List[PlannedAssignment]
+
+class PlanChange(BaseModel):
+    before: PlannedAssignment
+    after: PlannedAssignment
+
+class SimulationRunDiff(BaseModel):
+    # From the base run's plan to the other run's plan
+    base_run_id: int
+    run_id: int
+    kpi_deltas: Dict[str, float] # run minus base
+    added: List[PlannedAssignment]
+    removed: List[PlannedAssignment]
+    changed: List[PlanChange]
+    unchanged: int
+
+class MetricSummary(BaseModel):
+    mean: float
+    min: float
+    max: float
+    percentiles: Dict[str, float] # e.g. {"p50": ..., "p99": ...}, within 1% of the exact value
+
+class AggregateBucket(BaseModel):
+    start: datetime
+    run_count: int
+    metrics: Dict[str, MetricSummary]
+
+class SeriesPoint(BaseModel):
+    timestamp: datetime
+    value: float
+
+class AggregateGroup(BaseModel):
+    key: Dict[str, Any] # Values of the group_by parameters
+    run_count: int
+    metrics: Dict[str, MetricSummary]
+    buckets: List[AggregateBucket]
+    series: Dict[str, List[SeriesPoint]] # Per-bucket means, downsampled for charts
+
+class SimulationHistoryAggregates(BaseModel):
+    bucket: str
+    groups: List[AggregateGroup]
+    top_runs: List[SimulationRun]
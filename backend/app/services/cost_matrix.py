@@ -0,0 +1,104 @@
+import numpy as np
+from datetime import datetime, timedelta
+
+from app.services.rules import (
+    FATIGUE_THRESHOLD_HOURS,
+    HIGH_VALUE_BONUS_PERCENTAGE,
+    HIGH_VALUE_BONUS_THRESHOLD,
+    LATE_DELIVERY_GRACE_MINUTES,
+    LATE_DELIVERY_PENALTY,
+)
+from app.services.driver_pool import DriverPool
+from app.services.route_costs import as_route_costs
+
+MICROSECOND = timedelta(microseconds=1)
+PROGRESS_EVERY = 500 # Orders between progress callbacks
+
+
+class CostMatrix:
+    # Evaluates the company rules for every (route, driver) pair once, as arrays.
+    # routes may be RouteCostRecords or anything exposing the Route attribute names; drivers anything
+    # exposing the Driver attribute names (ORM rows or plain records).
+    def __init__(self, routes, drivers):
+        self.route_ids = [route.route_id for route in routes]
+        self.route_index = {route_id: i for i, route_id in enumerate(self.route_ids)}
+        self.driver_ids = [driver.driver_id for driver in drivers]
+
+        # Per-route rules come precomputed from the route_costs table when available
+        costs = as_route_costs(routes)
+        self.fuel_cost = np.array([cost.fuel_cost for cost in costs], dtype=np.float64)
+
+        # ETA per route for the two driver classes: column 0 = rested, column 1 = fatigued.
+        # Rounded through timedelta exactly like the scalar path so workloads accumulate identically.
+        self.eta_us_by_class = np.array([
+            [timedelta(minutes=float(cost.eta_minutes)) // MICROSECOND, timedelta(minutes=float(cost.fatigued_eta_minutes)) // MICROSECOND]
+            for cost in costs
+        ], dtype=np.int64).reshape(len(costs), 2)
+        self.eta_minutes_by_class = self.eta_us_by_class / 1_000_000 / 60
+
+        self.shift_hours = np.array([driver.shift_hours_today for driver in drivers], dtype=np.float64)
+        hours_past_week = np.array([driver.hours_worked_past_week for driver in drivers], dtype=np.float64)
+        # Driver Fatigue Rule: If a driver works >8 hours in a day, their delivery speed decreases by 30%
+        self.fatigued = (self.shift_hours > FATIGUE_THRESHOLD_HOURS) | ((hours_past_week / 7) > FATIGUE_THRESHOLD_HOURS)
+        self.driver_class = self.fatigued.astype(np.intp)
+        # Static part of Optimizer._score_driver; workload is added per order
+        self.base_score = self.shift_hours * 60 + hours_past_week * 60 / 7
+
+    @property
+    def eta_minutes(self) -> np.ndarray:
+        # Full route x driver ETA matrix (minutes); built on demand since the two-class table is enough for selection
+        return self.eta_minutes_by_class[:, self.driver_class]
+
+    def route_indices(self, route_ids) -> np.ndarray:
+        # -1 marks orders whose route is unknown
+        return np.array([self.route_index.get(route_id, -1) for route_id in route_ids], dtype=np.intp)
+
+    def assign_greedy(self, route_idx: np.ndarray, max_hours_per_driver_per_day=None, progress=None) -> np.ndarray:
+        # route_idx must already be in priority order. Returns the chosen driver index per order (-1 = unassigned).
+        # Each pick is a heap lookup in DriverPool, so a run costs O(orders * log drivers) instead of O(orders * drivers).
+        # progress(done, total), if given, is called every PROGRESS_EVERY orders.
+        assigned = np.full(len(route_idx), -1, dtype=np.intp)
+        if len(self.driver_ids) == 0:
+            return assigned
+        pool = DriverPool(self, max_hours_per_driver_per_day)
+        for k, r in enumerate(route_idx):
+            if progress is not None and k % PROGRESS_EVERY == 0:
+                progress(k, len(route_idx))
+            if r < 0:
+                continue
+            best = pool.select(r)
+            if best < 0:
+                continue
+            assigned[k] = best
+            pool.add_workload(best, self.eta_minutes_by_class[r, self.driver_class[best]])
+        return assigned
+
+    def evaluate(self, route_idx: np.ndarray, driver_idx: np.ndarray, order_values: np.ndarray,
+                 order_deadlines: np.ndarray, assigned_at: datetime) -> dict:
+        # KPI components for assigned orders (all arrays aligned, driver_idx >= 0)
+        return self.evaluate_for_class(route_idx, self.driver_class[driver_idx], order_values, order_deadlines, assigned_at)
+
+    def evaluate_for_class(self, route_idx: np.ndarray, driver_class: np.ndarray, order_values: np.ndarray,
+                           order_deadlines: np.ndarray, assigned_at: datetime) -> dict:
+        # Same as evaluate, but by fatigue class (0 = rested, 1 = fatigued) instead of by driver
+        eta_us = self.eta_us_by_class[route_idx, driver_class]
+        estimated = np.datetime64(assigned_at, "us") + eta_us.astype("timedelta64[us]")
+        deadlines = order_deadlines.astype("datetime64[us]")
+
+        on_time = estimated <= deadlines # Delivered on or before requested time
+        penalty = np.where(
+            estimated > deadlines + np.timedelta64(LATE_DELIVERY_GRACE_MINUTES, "m"), float(LATE_DELIVERY_PENALTY), 0.0
+        )
+        bonus = np.where(
+            (order_values > HIGH_VALUE_BONUS_THRESHOLD) & on_time, order_values * HIGH_VALUE_BONUS_PERCENTAGE, 0.0
+        )
+        fuel_cost = self.fuel_cost[route_idx]
+        profit = order_values + bonus - penalty - fuel_cost
+        return {
+            "estimated_delivery_time": estimated,
+            "on_time": on_time,
+            "penalty": penalty,
+            "bonus": bonus,
+            "fuel_cost": fuel_cost,
+            "profit": profit,
+        }
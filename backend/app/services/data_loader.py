@@ -1,72 +1,327 @@
+import hashlib
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import Dict, List, Optional
 import os # New import
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import data_manifest as crud_data_manifest
 from app.crud import driver as crud_driver
 from app.crud import order as crud_order
 from app.crud import route as crud_route
-from app.schemas.driver import DriverCreate
-from app.schemas.order import OrderCreate
-from app.schemas.route import RouteCreate
+from app.crud import route_cost as crud_route_cost
+from app.services.fleet_store import fleet_store
+from app.services.incremental import incremental_planner
 
 # Define the base directory for data files relative to this script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "..", "..", "data")
 
-def load_drivers_from_csv(db: Session, file_path: str):
-    df = pd.read_csv(file_path, sep=',') # Read as comma-separated
-    df.columns = df.columns.str.strip() # Strip whitespace from column names
-    print(f"DEBUG: Columns detected in drivers.csv: {df.columns.tolist()}") # DEBUG PRINT
-    for index, row in df.iterrows(): # Use index for generating driver_id
-        # Parse past_week_hours from pipe-separated string to sum
-        past_week_hours_list = [float(h) for h in str(row['past_week_hours']).split('|')]
-        total_hours_past_week = sum(past_week_hours_list)
-
-        driver_data = DriverCreate(
-            driver_id=str(index + 1), # Generate unique driver_id as 1, 2, 3...
-            name=row['name'],
-            shift_hours_today=row['shift_hours'],
-            hours_worked_past_week=total_hours_past_week
-        )
-        crud_driver.create_or_update_driver(db, driver_data)
-
-def load_orders_from_csv(db: Session, file_path: str):
-    df = pd.read_csv(file_path)
-    df.columns = df.columns.str.strip() # Strip whitespace from column names
-    for _, row in df.iterrows():
-        # Combine today's date with the time from CSV
-        delivery_time_str = str(row['delivery_time'])
-        # Handle cases where delivery_time might be just time (HH:MM) or full datetime
-        if len(delivery_time_str) <= 5: # Assuming HH:MM format
-            today = datetime.now().date()
-            delivery_datetime = datetime.strptime(f"{today} {delivery_time_str}", '%Y-%m-%d %H:%M')
-        else:
-            delivery_datetime = datetime.strptime(delivery_time_str, '%Y-%m-%d %H:%M:%S')
-
-        order_data = OrderCreate(
-            order_id=str(row['order_id']),
-            value=row['value_rs'], # Use value_rs from CSV
-            route_id=str(row['route_id']),
-            delivery_time=delivery_datetime
-        )
-        created_order = crud_order.create_or_update_order(db, order_data)
-        print(f"DEBUG: Loaded order {created_order.order_id}, assigned_driver_id: {created_order.assigned_driver_id}") # DEBUG
-
-def load_routes_from_csv(db: Session, file_path: str):
-    df = pd.read_csv(file_path)
+# CSV columns each file must provide
+DRIVER_COLUMNS = ("name", "shift_hours", "past_week_hours")
+ORDER_COLUMNS = ("order_id", "value_rs", "route_id", "delivery_time")
+ROUTE_COLUMNS = ("route_id", "distance_km", "traffic_level", "base_time_min")
+
+MAX_REPORTED_ERRORS = 20 # Per file, in the startup log
+MAX_KEPT_ERRORS = 1000 # Per file, in LoadReport.errors
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+class LoadReport:
+    # Outcome of loading one CSV file. errors holds one entry per problem found in a rejected row:
+    # {"row": 1-based data row number, "column": offending column, "message": ...}
+    __slots__ = ("file", "unchanged", "rows_read", "rows_written", "rows_rejected", "rows_deleted", "errors")
+
+    def __init__(self, file: str):
+        self.file = file
+        self.unchanged = False # Skipped: same content as the last load
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.rows_deleted = 0
+        self.errors: List[dict] = []
+
+    def add(self, rows_read: int, rows_written: int, errors: List[dict]) -> "LoadReport":
+        self.rows_read += rows_read
+        self.rows_written += rows_written
+        self.rows_rejected += len({error["row"] for error in errors})
+        # Only the first MAX_KEPT_ERRORS are kept, so a bad multi-GB file cannot grow the report without bound
+        self.errors.extend(errors[:max(0, MAX_KEPT_ERRORS - len(self.errors))])
+        return self
+
+    def counts(self) -> dict:
+        return {"rows_read": self.rows_read, "rows_written": self.rows_written, "rows_rejected": self.rows_rejected}
+
+    def as_dict(self) -> dict:
+        return {"file": os.path.basename(self.file), **self.counts(), "errors": self.errors}
+
+    def print_summary(self):
+        if self.unchanged:
+            print(f"Skipped {os.path.basename(self.file)}: unchanged since the last load")
+            return
+        print(f"Loaded {os.path.basename(self.file)}: {self.rows_written} of {self.rows_read} rows, {self.rows_rejected} rejected, {self.rows_deleted} deleted")
+        for error in self.errors[:MAX_REPORTED_ERRORS]:
+            print(f"Warning: {os.path.basename(self.file)} row {error['row']} ({error['column']}): {error['message']}")
+
+
+def _check_columns(df: pd.DataFrame, file_name: str, required_columns):
     df.columns = df.columns.str.strip() # Strip whitespace from column names
-    for _, row in df.iterrows():
-        route_data = RouteCreate(
-            route_id=str(row['route_id']),
-            distance_km=row['distance_km'],
-            traffic_level=row['traffic_level'],
-            base_time_minutes=row['base_time_min'] # Use base_time_min from CSV
-        )
-        crud_route.create_or_update_route(db, route_data)
-
-def load_all_data(db: Session):
-    # Use absolute paths for CSVs
-    load_drivers_from_csv(db, os.path.join(DATA_DIR, "drivers.csv"))
-    load_orders_from_csv(db, os.path.join(DATA_DIR, "orders.csv"))
-    load_routes_from_csv(db, os.path.join(DATA_DIR, "routes.csv"))
+    missing = [column for column in required_columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"{file_name} is missing columns: {', '.join(missing)}")
+
+
+def read_csv(file_path: str, required_columns) -> pd.DataFrame:
+    # Everything is read as text; columns are parsed and validated vectorized afterwards
+    df = pd.read_csv(file_path, sep=',', dtype=str, keep_default_na=False, skipinitialspace=True)
+    _check_columns(df, os.path.basename(file_path), required_columns)
+    return df
+
+
+def read_csv_chunks(file, required_columns, chunksize: int):
+    # Same as read_csv, chunksize rows at a time. Chunks keep their position in the file as index,
+    # so row numbers in parse errors stay file-global.
+    file_name = os.path.basename(getattr(file, "name", str(file)))
+    with pd.read_csv(file, sep=',', dtype=str, keep_default_na=False, skipinitialspace=True, chunksize=chunksize) as reader:
+        for chunk in reader:
+            _check_columns(chunk, file_name, required_columns)
+            yield chunk
+
+
+def _reject(errors: List[dict], invalid: pd.Series, column: str, message: str) -> pd.Series:
+    # Records an error for every row in the invalid mask; returns the mask so callers can combine them
+    for index in invalid[invalid].index:
+        errors.append({"row": int(index) + 1, "column": column, "message": message})
+    return invalid
+
+
+def _required_text(errors: List[dict], df: pd.DataFrame, column: str) -> pd.Series:
+    return _reject(errors, df[column] == "", column, "value is required")
+
+
+def _number(errors: List[dict], df: pd.DataFrame, column: str, minimum: float = 0):
+    values = pd.to_numeric(df[column], errors="coerce")
+    invalid = _reject(errors, values.isna(), column, f"'{column}' must be a number")
+    invalid |= _reject(errors, ~invalid & (values < minimum), column, f"'{column}' must be at least {minimum}")
+    return values, invalid
+
+
+def _sorted(errors: List[dict]) -> List[dict]:
+    return sorted(errors, key=lambda error: error["row"]) # Stable: a row keeps its column order
+
+
+def _records(frame: pd.DataFrame) -> List[dict]:
+    # Plain Python values for the DB driver (to_dict would hand out pandas Timestamps and numpy scalars)
+    columns = [
+        (frame[column].to_numpy(dtype="datetime64[us]") if pd.api.types.is_datetime64_any_dtype(frame[column]) else frame[column].to_numpy()).tolist()
+        for column in frame.columns
+    ]
+    names = list(frame.columns)
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def parse_drivers(df: pd.DataFrame):
+    # Returns (frame of valid rows in Driver columns, errors)
+    errors: List[dict] = []
+    invalid = _required_text(errors, df, "name")
+    shift_hours, bad_shift_hours = _number(errors, df, "shift_hours")
+    invalid |= bad_shift_hours
+
+    # Pipe-separated daily hours, summed per driver
+    parts = df["past_week_hours"].str.split("|", expand=True)
+    present = parts.notna() & (parts.apply(lambda column: column.str.strip()) != "")
+    hours = parts.apply(pd.to_numeric, errors="coerce")
+    invalid |= _reject(errors, (present & hours.isna()).any(axis=1) | ~present.any(axis=1),
+                       "past_week_hours", "'past_week_hours' must be numbers separated by '|'")
+    total_hours_past_week = hours.sum(axis=1)
+
+    valid = ~invalid
+    frame = pd.DataFrame({
+        "driver_id": (df.index[valid] + 1).astype(str), # Generate unique driver_id as 1, 2, 3...
+        "name": df["name"][valid].to_numpy(),
+        "shift_hours_today": shift_hours[valid].to_numpy(dtype=float),
+        "hours_worked_past_week": total_hours_past_week[valid].to_numpy(dtype=float),
+    })
+    return frame, _sorted(errors)
+
+
+def parse_orders(df: pd.DataFrame, today=None):
+    errors: List[dict] = []
+    invalid = _required_text(errors, df, "order_id")
+    invalid |= _required_text(errors, df, "route_id")
+    values, bad_values = _number(errors, df, "value_rs")
+    invalid |= bad_values
+
+    # delivery_time is either HH:MM (today) or a full 'YYYY-MM-DD HH:MM:SS' timestamp
+    today = today or datetime.now().date()
+    raw = df["delivery_time"]
+    time_only = raw.str.len() <= 5
+    delivery_time = pd.to_datetime(f"{today} " + raw.where(time_only), format="%Y-%m-%d %H:%M", errors="coerce")
+    delivery_time = delivery_time.fillna(pd.to_datetime(raw.where(~time_only), format="%Y-%m-%d %H:%M:%S", errors="coerce"))
+    invalid |= _reject(errors, delivery_time.isna(), "delivery_time", "'delivery_time' must be HH:MM or YYYY-MM-DD HH:MM:SS")
+
+    valid = ~invalid
+    frame = pd.DataFrame({
+        "order_id": df["order_id"][valid].to_numpy(),
+        "value": values[valid].to_numpy(dtype=float),
+        "route_id": df["route_id"][valid].to_numpy(),
+        "delivery_time": delivery_time[valid].to_numpy(),
+    })
+    # Later rows win, as they did when rows were written one by one
+    frame = frame.drop_duplicates("order_id", keep="last")
+    return frame, _sorted(errors)
+
+
+def parse_routes(df: pd.DataFrame):
+    errors: List[dict] = []
+    invalid = _required_text(errors, df, "route_id")
+    invalid |= _required_text(errors, df, "traffic_level")
+    distance_km, bad_distance = _number(errors, df, "distance_km")
+    invalid |= bad_distance
+    base_time_minutes, bad_base_time = _number(errors, df, "base_time_min")
+    invalid |= bad_base_time
+    invalid |= _reject(errors, ~bad_base_time & (base_time_minutes % 1 != 0), "base_time_min", "'base_time_min' must be a whole number")
+
+    valid = ~invalid
+    frame = pd.DataFrame({
+        "route_id": df["route_id"][valid].to_numpy(),
+        "distance_km": distance_km[valid].to_numpy(dtype=float),
+        "traffic_level": df["traffic_level"][valid].to_numpy(),
+        "base_time_minutes": base_time_minutes[valid].to_numpy(dtype=int),
+    })
+    frame = frame.drop_duplicates("route_id", keep="last")
+    return frame, _sorted(errors)
+
+
+def file_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    # 64-bit content hash per parsed row (signed, to fit an SQL BIGINT)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def _load_file(db: Session, file_path: str, columns, parse, key: str, upsert, delete, force: bool, context: str = "") -> LoadReport:
+    # Applies one seed CSV against the manifest of what was loaded from it last time: an unchanged file
+    # is skipped without parsing, otherwise only inserted, changed and removed rows are written.
+    # force re-applies every row. Rows are only ever deleted if this file created them.
+    name = os.path.basename(file_path)
+    report = LoadReport(file_path)
+    content_hash = file_hash(file_path)
+    data_file = crud_data_manifest.get_data_file(db, name)
+    if not force and data_file is not None and (data_file.content_hash, data_file.context) == (content_hash, context):
+        report.unchanged = True
+        return report
+
+    df = read_csv(file_path, columns)
+    frame, errors = parse(df)
+    keys = frame[key].tolist()
+    hashes = row_hashes(frame).tolist()
+    previous = crud_data_manifest.get_row_hashes(db, name)
+    # Plain ints: 64-bit hashes do not survive a round trip through float64
+    changed = [force or previous.get(k) != h for k, h in zip(keys, hashes)]
+    present = set(keys)
+    removed = [k for k in previous if k not in present]
+
+    written = upsert(db, _records(frame[np.array(changed, dtype=bool)]))
+    report.rows_deleted = delete(db, removed) if removed else 0
+    crud_data_manifest.apply_row_hashes(
+        db, name, [{"key": k, "row_hash": h} for k, h, c in zip(keys, hashes, changed) if c], removed
+    )
+    crud_data_manifest.save_data_file(db, name, content_hash, context)
+    return report.add(len(df), written, errors)
+
+
+# The loaders below do not commit; load_all_data commits once.
+
+def load_drivers_from_csv(db: Session, file_path: str, force: bool = False) -> LoadReport:
+    return _load_file(db, file_path, DRIVER_COLUMNS, parse_drivers, "driver_id",
+                      crud_driver.bulk_upsert_drivers, crud_driver.bulk_delete_drivers, force)
+
+
+def load_orders_from_csv(db: Session, file_path: str, force: bool = False) -> LoadReport:
+    # HH:MM delivery times resolve against today's date, so a new day re-parses the file
+    today = datetime.now().date()
+    return _load_file(db, file_path, ORDER_COLUMNS, lambda df: parse_orders(df, today), "order_id",
+                      crud_order.bulk_upsert_orders, crud_order.bulk_delete_orders, force, context=str(today))
+
+
+def load_routes_from_csv(db: Session, file_path: str, force: bool = False) -> LoadReport:
+    report = _load_file(db, file_path, ROUTE_COLUMNS, parse_routes, "route_id",
+                        crud_route.bulk_upsert_routes, crud_route.bulk_delete_routes, force)
+    if not report.unchanged:
+        # One bulk pass also drops cost rows left behind by routes that no longer exist
+        crud_route_cost.rebuild_route_costs(db)
+    return report
+
+
+def load_all_data(db: Session, force: bool = False) -> Dict[str, LoadReport]:
+    # Use absolute paths for CSVs. All three files are applied in a single transaction.
+    try:
+        reports = {
+            "drivers": load_drivers_from_csv(db, os.path.join(DATA_DIR, "drivers.csv"), force),
+            "orders": load_orders_from_csv(db, os.path.join(DATA_DIR, "orders.csv"), force),
+            "routes": load_routes_from_csv(db, os.path.join(DATA_DIR, "routes.csv"), force),
+        }
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for report in reports.values():
+        report.print_summary()
+    if any(not report.unchanged for report in reports.values()):
+        incremental_planner.invalidate()
+    # Store the columnar snapshot of what was just loaded (a no-op when it already matches)
+    fleet_store.current(db)
+    return reports
+
+
+def stream_orders_from_csv(db: Session, file_path: str, chunksize: Optional[int] = None, progress=None) -> LoadReport:
+    # Bounded-memory import for order files of any size: one chunk is parsed, upserted and committed
+    # at a time. Chunks committed before a failure or cancellation stay applied; re-running the import
+    # is safe since every write is an upsert. progress(report, bytes_read, total_bytes) runs after each
+    # chunk and may raise to stop the import.
+    chunksize = chunksize or settings.import_chunk_size
+    report = LoadReport(file_path)
+    total_bytes = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        for chunk in read_csv_chunks(f, ORDER_COLUMNS, chunksize):
+            frame, errors = parse_orders(chunk)
+            try:
+                written = crud_order.bulk_upsert_orders(db, _records(frame))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            report.add(len(chunk), written, errors)
+            if progress is not None:
+                progress(report, f.tell(), total_bytes)
+    return report
+
+
+def run_import_orders_job(job, file_path: str, remove_file: bool = False):
+    # Job entry point (see app.services.jobs); rows_read / rows_written / rows_rejected go to job.detail
+    def progress(report: LoadReport, bytes_read: int, total_bytes: int):
+        job.update_detail(**report.counts())
+        job.report_progress(bytes_read, total_bytes)
+
+    db = SessionLocal()
+    try:
+        report = stream_orders_from_csv(db, file_path, progress=progress)
+        report.print_summary()
+        fleet_store.current(db)
+        return report.as_dict()
+    finally:
+        db.close()
+        # Even a partial import changes the order book under the live plan
+        incremental_planner.invalidate()
+        if remove_file:
+            os.remove(file_path)
@@ -0,0 +1,30 @@
+import numpy as np
+
+# Downsampling for chart series: Largest-Triangle-Three-Buckets keeps the first and last point and, from
+# each of threshold - 2 equal buckets in between, the point forming the largest triangle with the point
+# kept before it and the mean of the next bucket. Peaks and dips survive, unlike with plain averaging.
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Indices of the kept points, ascending; all of them when there are no more than threshold
+    n = len(x)
+    if n <= threshold or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if end >= next_end: # The last bucket is followed by the final point only
+            next_mean_x, next_mean_y = x[n - 1], y[n - 1]
+        else:
+            next_mean_x, next_mean_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs((x[a] - next_mean_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_mean_y - y[a]))
+        a = start + int(np.argmax(areas))
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
@@ -0,0 +1,161 @@
+import heapq
+import numpy as np
+
+# Keys closer than this are re-checked with the exact linear-scan arithmetic
+SCORE_TIE_TOLERANCE = 1e-9
+_EMPTY = (float("inf"), -1)
+
+
+class _ClassPool:
+    # Drivers of one fatigue class. The ETA of a route is the same for every driver of the class,
+    # so drivers are bucketed by the longest route ETA they can still absorb ("level"): one heap per
+    # level, ordered by score without the ETA, and a segment tree over the level heads.
+    # An order whose route sits at level q is served by the best head among levels q..end.
+    def __init__(self, etas: list, versions: list):
+        self.etas = etas # Sorted distinct route ETAs (minutes) for this class
+        self.versions = versions
+        self.size = 1
+        while self.size < max(1, len(etas)):
+            self.size *= 2
+        self.heaps = [[] for _ in range(len(etas))]
+        self.tree = [_EMPTY] * (2 * self.size)
+
+    def push(self, level: int, key: float, d: int):
+        heapq.heappush(self.heaps[level], (key, d, self.versions[d]))
+        self.refresh(level)
+
+    def refresh(self, level: int):
+        # Drop stale heads, then propagate the new head up the tree
+        heap = self.heaps[level]
+        while heap and heap[0][2] != self.versions[heap[0][1]]:
+            heapq.heappop(heap)
+        i = level + self.size
+        self.tree[i] = heap[0][:2] if heap else _EMPTY
+        i //= 2
+        while i:
+            self.tree[i] = min(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def best_head(self, lo: int):
+        # Smallest (key, driver) among levels lo..end
+        best = _EMPTY
+        lo += self.size
+        hi = len(self.etas) + self.size
+        while lo < hi:
+            if lo & 1:
+                best = min(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = min(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def levels_at_most(self, lo: int, threshold: float, node: int = 1, node_lo: int = 0, node_hi: int = None):
+        # Levels >= lo whose head key is <= threshold
+        if node_hi is None:
+            node_hi = self.size
+        if node_hi <= lo or self.tree[node][0] > threshold:
+            return []
+        if node >= self.size:
+            return [node - self.size]
+        mid = (node_lo + node_hi) // 2
+        return (self.levels_at_most(lo, threshold, 2 * node, node_lo, mid)
+                + self.levels_at_most(lo, threshold, 2 * node + 1, mid, node_hi))
+
+    def entries_at_most(self, level: int, threshold: float):
+        # Current (key, driver) entries of one level with key <= threshold; the heap is left intact
+        heap = self.heaps[level]
+        if len(heap) == 1 or heap[1][0] > threshold and (len(heap) < 3 or heap[2][0] > threshold):
+            return [heap[0][1]] # Common case: only the (current) head qualifies
+        popped, found = [], []
+        while heap and heap[0][0] <= threshold:
+            entry = heapq.heappop(heap)
+            if entry[2] == self.versions[entry[1]]:
+                popped.append(entry)
+                found.append(entry[1])
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        self.refresh(level)
+        return found
+
+
+class DriverPool:
+    # Indexed priority queue over drivers implementing the greedy choice of Optimizer.assign_orders:
+    # the feasible driver with the lowest Optimizer._score_driver, ties going to the earlier driver.
+    # Selection and workload updates cost O(log drivers + log routes).
+    # Entries are invalidated lazily: a workload change bumps the driver's version and pushes a fresh entry.
+    def __init__(self, matrix, max_hours_per_driver_per_day=None, workload=None):
+        self.matrix = matrix
+        self.max_hours = max_hours_per_driver_per_day
+        num_drivers = len(matrix.driver_ids)
+        # Plain lists: the pool is driven one order at a time, where numpy scalar access is the bottleneck
+        self.workload = [0.0] * num_drivers if workload is None else [float(w) for w in workload]
+        self._base_score = matrix.base_score.tolist()
+        self._shift_hours = matrix.shift_hours.tolist()
+        self._driver_class = matrix.driver_class.tolist()
+        self._eta_by_class = matrix.eta_minutes_by_class.tolist()
+        self._versions = [0] * num_drivers
+        self._level = [-1] * num_drivers
+
+        self._classes = []
+        self._route_level = []
+        for c in (0, 1):
+            etas = np.unique(matrix.eta_minutes_by_class[:, c])
+            self._classes.append(_ClassPool(etas.tolist(), self._versions))
+            self._route_level.append(np.searchsorted(etas, matrix.eta_minutes_by_class[:, c]).tolist())
+        for d in range(num_drivers):
+            self._place(d)
+
+    def _fits(self, d: int, eta_minutes: float) -> bool:
+        # Max hours per driver per day constraint, written exactly like the linear scan
+        if self.max_hours is None:
+            return True
+        return not (self._shift_hours[d] + (self.workload[d] + eta_minutes) / 60) > self.max_hours
+
+    def _place(self, d: int):
+        pool = self._classes[self._driver_class[d]]
+        # Highest level whose ETA still fits (the check is monotone in the ETA)
+        lo, hi = 0, len(pool.etas)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._fits(d, pool.etas[mid]):
+                lo = mid + 1
+            else:
+                hi = mid
+        self._level[d] = lo - 1
+        if lo > 0: # Otherwise the driver cannot take any route until their workload goes down
+            pool.push(lo - 1, self._base_score[d] + self.workload[d], d)
+
+    def _score(self, d: int, eta_minutes: float) -> float:
+        # Same arithmetic as the linear scan: base score + potential workload
+        return self._base_score[d] + (self.workload[d] + eta_minutes)
+
+    def select(self, route_index: int) -> int:
+        # Best feasible driver for an order on this route, -1 if nobody can take it
+        best = None
+        for c, pool in enumerate(self._classes):
+            if not len(pool.etas):
+                continue
+            level = self._route_level[c][route_index]
+            head_key, _ = pool.best_head(level)
+            if head_key == float("inf"):
+                continue
+            # Near-equal keys can still order differently once the ETA is added, so settle those exactly
+            eta_minutes = self._eta_by_class[route_index][c]
+            threshold = head_key + SCORE_TIE_TOLERANCE * max(1.0, abs(head_key))
+            for lvl in pool.levels_at_most(level, threshold):
+                for d in pool.entries_at_most(lvl, threshold):
+                    candidate = (self._score(d, eta_minutes), d)
+                    if best is None or candidate < best:
+                        best = candidate
+        return -1 if best is None else best[1]
+
+    def add_workload(self, d: int, minutes: float):
+        self.workload[d] = self.workload[d] + minutes
+        self._versions[d] += 1
+        old_level = self._level[d]
+        if old_level >= 0:
+            self._classes[self._driver_class[d]].refresh(old_level)
+        self._place(d)
@@ -0,0 +1,218 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import fleet_version as crud_fleet_version
+from app.crud import route_cost as crud_route_cost
+from app.models.driver import Driver
+from app.models.order import Order
+from app.services.route_costs import TRAFFIC_LEVELS, UNKNOWN_TRAFFIC_LEVEL, RouteCostRecord
+from app.services.solver import DriverRecord, FleetSnapshot, OrderRecord
+
+# Columnar on-disk copy of the optimizer's view of drivers, orders and routes: one .npy file per column,
+# opened with memory mapping so a process (or sweep worker) maps the pages instead of re-querying the ORM.
+# String ids are fixed-width arrays; order routes are codes into the route id dictionary. Each snapshot is
+# stored under the fleet stamp of the database it was read from, so any CRUD write makes it stale.
+
+FORMAT_VERSION = 1
+# Superseded snapshots are deleted once unused for this long: a sweep may have just handed one's path to
+# worker processes that are still starting up. Opening a snapshot counts as a use.
+PRUNE_AFTER_SECONDS = 600
+TRAFFIC_CODES = TRAFFIC_LEVELS + (UNKNOWN_TRAFFIC_LEVEL,)
+COLUMNS = (
+    "driver_ids", "driver_names", "driver_shift_hours_today", "driver_hours_worked_past_week",
+    "route_ids", "route_traffic_levels", "route_fuel_cost", "route_eta_minutes", "route_fatigued_eta_minutes",
+    "order_ids", "order_route_codes", "order_values", "order_delivery_times",
+)
+
+
+def query_fleet_snapshot(db: Session) -> FleetSnapshot:
+    # Plain column tuples, no ORM identity map: the solver only needs these fields
+    drivers = [DriverRecord(*row) for row in db.query(
+        Driver.driver_id, Driver.name, Driver.shift_hours_today, Driver.hours_worked_past_week
+    ).order_by(Driver.id)]
+    orders = [OrderRecord(*row) for row in db.query(
+        Order.order_id, Order.value, Order.route_id, Order.delivery_time
+    ).order_by(Order.id)]
+    # Routes come from the materialized route_costs table, so no per-route rule work is left for the solver
+    routes = crud_route_cost.get_route_cost_records(db)
+    return FleetSnapshot(drivers, orders, routes)
+
+
+def _string_column(values) -> np.ndarray:
+    # Fixed-width unicode, so the column stays mappable (object arrays are pickled)
+    return np.array(values, dtype=str) if values else np.empty(0, dtype="<U1")
+
+
+def snapshot_columns(snapshot: FleetSnapshot) -> Dict[str, np.ndarray]:
+    routes = snapshot.routes
+    route_ids = [route.route_id for route in routes]
+    # Orders may reference unknown routes: those ids are appended after the known ones
+    route_codes = {route_id: i for i, route_id in enumerate(route_ids)}
+    for order in snapshot.orders:
+        route_codes.setdefault(order.route_id, len(route_codes))
+    return {
+        "driver_ids": _string_column([driver.driver_id for driver in snapshot.drivers]),
+        "driver_names": _string_column([driver.name or "" for driver in snapshot.drivers]),
+        "driver_shift_hours_today": np.array([driver.shift_hours_today for driver in snapshot.drivers], dtype=np.float64),
+        "driver_hours_worked_past_week": np.array([driver.hours_worked_past_week for driver in snapshot.drivers], dtype=np.float64),
+        "route_ids": _string_column(list(route_codes)),
+        "route_traffic_levels": np.array([TRAFFIC_CODES.index(route.traffic_level) for route in routes], dtype=np.int8),
+        "route_fuel_cost": np.array([route.fuel_cost for route in routes], dtype=np.float64),
+        "route_eta_minutes": np.array([route.eta_minutes for route in routes], dtype=np.float64),
+        "route_fatigued_eta_minutes": np.array([route.fatigued_eta_minutes for route in routes], dtype=np.float64),
+        "order_ids": _string_column([order.order_id for order in snapshot.orders]),
+        "order_route_codes": np.array([route_codes[order.route_id] for order in snapshot.orders], dtype=np.int64),
+        "order_values": np.array([order.value for order in snapshot.orders], dtype=np.float64),
+        "order_delivery_times": np.array([order.delivery_time for order in snapshot.orders], dtype="datetime64[us]"),
+    }
+
+
+class ColumnarFleet:
+    # One stored snapshot: read-only, memory-mapped column arrays
+    __slots__ = ("stamp", "path", "num_routes", "columns")
+
+    def __init__(self, stamp: str, path: str, num_routes: int, columns: Dict[str, np.ndarray]):
+        self.stamp = stamp
+        self.path = path
+        self.num_routes = num_routes
+        self.columns = columns
+
+    @classmethod
+    def open(cls, path: str) -> "ColumnarFleet":
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported fleet snapshot format {meta['format']}")
+        columns = {}
+        for name in COLUMNS:
+            column_path = os.path.join(path, f"{name}.npy")
+            # Empty columns cannot be mapped; they are read instead
+            columns[name] = np.load(column_path, mmap_mode="r" if meta["sizes"][name] else None)
+        return cls(meta["stamp"], path, meta["num_routes"], columns)
+
+    def to_snapshot(self) -> FleetSnapshot:
+        # The solver takes record lists, so this copies every mapped column into Python objects. What the
+        # mapping saves is the ORM query and, for sweep workers, pickling the snapshot to every process.
+        columns = self.columns
+        drivers = [
+            DriverRecord(*row) for row in zip(
+                columns["driver_ids"].tolist(), columns["driver_names"].tolist(),
+                columns["driver_shift_hours_today"].tolist(), columns["driver_hours_worked_past_week"].tolist(),
+            )
+        ]
+        route_ids = columns["route_ids"].tolist()
+        routes = [
+            RouteCostRecord(route_id, TRAFFIC_CODES[code], fuel_cost, eta_minutes, fatigued_eta_minutes)
+            for route_id, code, fuel_cost, eta_minutes, fatigued_eta_minutes in zip(
+                route_ids[:self.num_routes], columns["route_traffic_levels"].tolist(), columns["route_fuel_cost"].tolist(),
+                columns["route_eta_minutes"].tolist(), columns["route_fatigued_eta_minutes"].tolist(),
+            )
+        ]
+        orders = [
+            OrderRecord(order_id, value, route_ids[code], delivery_time)
+            for order_id, code, value, delivery_time in zip(
+                columns["order_ids"].tolist(), columns["order_route_codes"].tolist(),
+                columns["order_values"].tolist(), columns["order_delivery_times"].tolist(),
+            )
+        ]
+        return FleetSnapshot(drivers, orders, routes)
+
+
+class FleetStore:
+    def __init__(self, base_dir: Optional[str]):
+        self.base_dir = base_dir # Falsy disables the store
+
+    def path(self, stamp: str) -> str:
+        return os.path.join(self.base_dir, f"fleet-{stamp}")
+
+    def open(self, stamp: str) -> Optional[ColumnarFleet]:
+        path = self.path(stamp)
+        if not os.path.isdir(path):
+            return None
+        try:
+            os.utime(path) # Last use, see _prune
+            return ColumnarFleet.open(path)
+        except (OSError, ValueError, KeyError):
+            print(f"Warning: Ignoring unreadable fleet snapshot {path}")
+            return None
+
+    def write(self, stamp: str, snapshot: FleetSnapshot) -> ColumnarFleet:
+        # Written to a temporary directory and renamed into place, so readers never see a partial snapshot
+        os.makedirs(self.base_dir, exist_ok=True)
+        columns = snapshot_columns(snapshot)
+        tmp_path = tempfile.mkdtemp(prefix=".fleet-", dir=self.base_dir)
+        try:
+            for name, column in columns.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), column)
+            meta = {
+                "format": FORMAT_VERSION,
+                "stamp": stamp,
+                "num_routes": len(snapshot.routes),
+                "sizes": {name: int(column.size) for name, column in columns.items()},
+            }
+            with open(os.path.join(tmp_path, "meta.json"), "w") as meta_file:
+                json.dump(meta, meta_file)
+            os.rename(tmp_path, self.path(stamp))
+        except OSError:
+            # Another writer stored the same stamp first; theirs is identical
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(self.path(stamp)):
+                raise
+        self._prune(stamp)
+        return ColumnarFleet.open(self.path(stamp))
+
+    def _prune(self, keep_stamp: str):
+        keep = os.path.basename(self.path(keep_stamp))
+        unused_since = time.time() - PRUNE_AFTER_SECONDS
+        for name in os.listdir(self.base_dir):
+            path = os.path.join(self.base_dir, name)
+            if not name.startswith("fleet-") or name == keep:
+                continue
+            try:
+                if os.path.getmtime(path) > unused_since:
+                    continue
+            except OSError:
+                continue
+            # Already mapped files stay readable after unlinking on POSIX
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _current(self, db: Session) -> Tuple[Optional[ColumnarFleet], Optional[FleetSnapshot]]:
+        # (stored snapshot, snapshot queried to write it); the stored one is None when the store is disabled,
+        # cannot be written, or the tables changed while they were being read
+        if not self.base_dir:
+            return None, None
+        stamp = crud_fleet_version.get_fleet_stamp(db)
+        if stamp is None:
+            return None, None
+        fleet = self.open(stamp)
+        if fleet is not None:
+            return fleet, None
+        snapshot = query_fleet_snapshot(db)
+        if crud_fleet_version.get_fleet_stamp(db) != stamp:
+            return None, snapshot
+        try:
+            return self.write(stamp, snapshot), snapshot
+        except OSError as exc:
+            print(f"Warning: Could not write fleet snapshot: {exc}")
+            return None, snapshot
+
+    def current(self, db: Session) -> Optional[ColumnarFleet]:
+        # The snapshot matching the database's current fleet stamp, written from the tables if missing
+        return self._current(db)[0]
+
+    def load_snapshot(self, db: Session) -> FleetSnapshot:
+        fleet, snapshot = self._current(db)
+        if snapshot is not None:
+            return snapshot
+        return fleet.to_snapshot() if fleet is not None else query_fleet_snapshot(db)
+
+
+fleet_store = FleetStore(settings.fleet_snapshot_dir)
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.models.simulation_run import ROLLUP_METRICS, SimulationRunRollup
+from app.services.downsample import lttb
+from app.services.quantile_sketch import QuantileSketch
+
+# Answers GET /simulation_history/aggregates from the hourly rollups: rows are merged into coarser time
+# buckets and into the requested parameter groups, so the cost depends on the number of rollup rows in
+# the range, not on the number of runs. Percentiles come from the merged sketches (within 1%).
+
+BUCKETS = ("hour", "day", "week")
+
+
+def bucket_of(start: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return start
+    day = start.replace(hour=0)
+    return day if bucket == "day" else day - timedelta(days=day.weekday()) # Weeks start on Monday
+
+
+def percentile_label(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+class _Accumulator:
+    # Merged rollup rows: counts, sums, extremes and sketches per metric
+    __slots__ = ("run_count", "sums", "mins", "maxs", "sketches")
+
+    def __init__(self):
+        self.run_count = 0
+        self.sums = dict.fromkeys(ROLLUP_METRICS, 0.0)
+        self.mins = dict.fromkeys(ROLLUP_METRICS, float("inf"))
+        self.maxs = dict.fromkeys(ROLLUP_METRICS, float("-inf"))
+        self.sketches = {metric: QuantileSketch() for metric in ROLLUP_METRICS}
+
+    def add(self, rollup: SimulationRunRollup, sketches: Dict[str, QuantileSketch]):
+        self.run_count += rollup.run_count
+        for metric in ROLLUP_METRICS:
+            self.sums[metric] += getattr(rollup, f"{metric}_sum")
+            self.mins[metric] = min(self.mins[metric], getattr(rollup, f"{metric}_min"))
+            self.maxs[metric] = max(self.maxs[metric], getattr(rollup, f"{metric}_max"))
+            self.sketches[metric].merge(sketches[metric])
+
+    def mean(self, metric: str) -> float:
+        return self.sums[metric] / self.run_count
+
+    def summary(self, percentiles: Sequence[float]) -> dict:
+        # Sketch answers are clamped to the exact extremes, which the rollups also keep
+        return {
+            metric: {
+                "mean": self.mean(metric),
+                "min": self.mins[metric],
+                "max": self.maxs[metric],
+                "percentiles": {
+                    percentile_label(percentile): min(max(self.sketches[metric].quantile(percentile / 100), self.mins[metric]), self.maxs[metric])
+                    for percentile in percentiles
+                },
+            }
+            for metric in ROLLUP_METRICS
+        }
+
+
+def aggregate_rollups(rollups: List[SimulationRunRollup], bucket: str, group_by: Sequence[str],
+                      percentiles: Sequence[float], max_points: int) -> List[dict]:
+    # One entry per combination of the group_by parameters (a single group without them), largest first.
+    # series holds each metric's per-bucket mean, downsampled with LTTB to at most max_points.
+    groups = {}
+    for rollup in rollups:
+        sketches = {metric: QuantileSketch.from_json(getattr(rollup, f"{metric}_sketch")) for metric in ROLLUP_METRICS}
+        key = tuple(getattr(rollup, name) for name in group_by)
+        overall, buckets = groups.setdefault(key, (_Accumulator(), {}))
+        overall.add(rollup, sketches)
+        buckets.setdefault(bucket_of(rollup.bucket_start, bucket), _Accumulator()).add(rollup, sketches)
+
+    result = []
+    for key, (overall, buckets) in groups.items():
+        starts = sorted(buckets)
+        x = np.array([start.timestamp() for start in starts], dtype=np.float64)
+        series = {}
+        for metric in ROLLUP_METRICS:
+            y = np.array([buckets[start].mean(metric) for start in starts], dtype=np.float64)
+            series[metric] = [{"timestamp": starts[i], "value": float(y[i])} for i in lttb(x, y, max_points)]
+        result.append({
+            "key": dict(zip(group_by, key)),
+            "run_count": overall.run_count,
+            "metrics": overall.summary(percentiles),
+            "buckets": [
+                {"start": start, "run_count": buckets[start].run_count, "metrics": buckets[start].summary(percentiles)}
+                for start in starts
+            ],
+            "series": series,
+        })
+    result.sort(key=lambda group: -group["run_count"])
+    return result
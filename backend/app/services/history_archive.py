@@ -0,0 +1,85 @@
+import json
+import os
+import uuid
+import zipfile
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.simulation_run import SimulationRun, SimulationRunPlan
+
+# Archive files for simulation runs past the retention period (see app.services.history_retention). Each
+# file is a zip of one day's runs: runs.json (deflated) holds the run rows and their plans' metadata, and
+# plans/<run id>.npz the plan blobs as stored (already compressed, see app.services.plan_codec). Files are
+# written once, under a unique name, and never modified; the simulation_run_archives table indexes them.
+
+FORMAT_VERSION = 1
+RUN_FIELDS = tuple(column.name for column in SimulationRun.__table__.columns)
+RUNS_MEMBER = "runs.json"
+
+
+def archive_path(path: str) -> str:
+    return os.path.join(settings.history_archive_dir, path)
+
+
+def _plan_member(run_id: int) -> str:
+    return f"plans/{run_id}.npz"
+
+
+def write_archive(day: datetime, runs: List[SimulationRun], plans: Dict[int, SimulationRunPlan]) -> str:
+    # Returns the new file's path relative to HISTORY_ARCHIVE_DIR. The file is complete and synced before it
+    # gets its final name, so a crash leaves at most an unreferenced file behind, never a partial one.
+    path = f"{day:%Y/%m}/simulation_runs-{day:%Y-%m-%d}-{runs[0].id}-{uuid.uuid4().hex[:8]}.zip"
+    full_path = archive_path(path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    rows = []
+    for run in runs:
+        row = {name: getattr(run, name) for name in RUN_FIELDS}
+        row["timestamp"] = run.timestamp.isoformat()
+        plan = plans.get(run.id)
+        row["plan"] = None if plan is None else {
+            "format_version": plan.format_version,
+            "assigned_at": plan.assigned_at.isoformat() if plan.assigned_at else None,
+            "num_assignments": plan.num_assignments,
+        }
+        rows.append(row)
+    tmp_path = full_path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(RUNS_MEMBER, json.dumps({"format_version": FORMAT_VERSION, "runs": rows}, separators=(",", ":")))
+        for run_id, plan in plans.items():
+            archive.writestr(_plan_member(run_id), plan.data, compress_type=zipfile.ZIP_STORED)
+    with open(tmp_path, "rb") as written:
+        os.fsync(written.fileno())
+    os.replace(tmp_path, full_path)
+    return path
+
+
+@lru_cache(maxsize=64)
+def read_runs(path: str) -> Tuple[SimulationRun, ...]:
+    # The file's runs in id order, as detached SimulationRun objects; cached, as files never change
+    with zipfile.ZipFile(archive_path(path)) as archive:
+        rows = json.loads(archive.read(RUNS_MEMBER))["runs"]
+    runs = []
+    for row in rows:
+        fields = {name: row[name] for name in RUN_FIELDS}
+        fields["timestamp"] = datetime.fromisoformat(row["timestamp"])
+        runs.append(SimulationRun(**fields))
+    return tuple(runs)
+
+
+def read_plan(path: str, run_id: int) -> Optional[SimulationRunPlan]:
+    # A detached SimulationRunPlan, or None if the run has no stored plan (e.g. a sweep run)
+    with zipfile.ZipFile(archive_path(path)) as archive:
+        rows = json.loads(archive.read(RUNS_MEMBER))["runs"]
+        meta = next((row["plan"] for row in rows if row["id"] == run_id), None)
+        if meta is None:
+            return None
+        data = archive.read(_plan_member(run_id))
+    return SimulationRunPlan(
+        simulation_run_id=run_id,
+        format_version=meta["format_version"],
+        assigned_at=datetime.fromisoformat(meta["assigned_at"]) if meta["assigned_at"] else None,
+        num_assignments=meta["num_assignments"],
+        data=data,
+    )
@@ -0,0 +1,138 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import assignment as crud_assignment
+from app.crud import simulation_run as crud_simulation_run
+from app.crud import simulation_run_archive as crud_simulation_run_archive
+from app.crud import simulation_run_rollup as crud_simulation_run_rollup
+from app.services.history_archive import archive_path, write_archive
+
+# Retention for simulation history (HISTORY_RETENTION_DAYS > 0). A background thread periodically moves runs
+# recorded before the cutoff (midnight, retention_days ago) out of simulation_runs: batch by batch, each
+# day's runs and plans are written to an archive file first, and then deleted in a short transaction that
+# also indexes the file. Writers therefore only ever wait for one small delete, never for the file I/O.
+# The hourly rollups of those days are merged into daily rows, one short transaction per day. History
+# endpoints read archived runs from the files, and aggregates keep coming from the rollups.
+# SQLite reuses the freed pages for new rows; the file itself only shrinks with a manual VACUUM.
+
+
+class HistoryCompactor:
+    def __init__(self, session_factory: Callable[..., Session] = SessionLocal, retention_days: int = 0,
+                 batch_size: int = 500, interval_s: float = 3600.0):
+        self.session_factory = session_factory
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        # Whole days only, so a day's runs are archived together and its rollups merged once
+        now = now or datetime.now()
+        return (now - timedelta(days=self.retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def start(self) -> Optional[threading.Thread]:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-compaction", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        # Returns after the current batch, not the whole pass
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.run_once()
+                if result["archived_runs"] or result["merged_rollups"]:
+                    print(f"History compaction: archived {result['archived_runs']} runs into {result['archives']} files, "
+                          f"merged {result['merged_rollups']} hourly rollups")
+            except Exception as exc:
+                print(f"History compaction failed: {exc}")
+            self._stop.wait(self.interval_s)
+
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        before = self.cutoff(now)
+        archived_runs = archives = merged_rollups = 0
+        while not self._stop.is_set():
+            count = self._archive_batch(before)
+            if not count:
+                break
+            archived_runs += count
+            archives += 1
+        for day in self._days_to_compact(before):
+            if self._stop.is_set():
+                break
+            merged_rollups += self._compact_day(day)
+        return {"archived_runs": archived_runs, "archives": archives, "merged_rollups": merged_rollups}
+
+    def _archive_batch(self, before: datetime) -> int:
+        # One archive file; returns the number of runs moved into it
+        db = self.session_factory()
+        path = None
+        try:
+            keep_id = crud_assignment.get_current_simulation_run_id(db)
+            runs = crud_simulation_run.get_runs_to_archive(db, before, self.batch_size, keep_id)
+            if not runs:
+                return 0
+            ids = [run.id for run in runs]
+            plans = crud_simulation_run.get_simulation_run_plans(db, ids)
+            day = crud_simulation_run_archive.day_of(runs[0].timestamp)
+            path = write_archive(day, runs, plans)
+            # Ends the read transaction, as a SQLite reader cannot become the writer once another commit happened;
+            # the loaded runs are detached first so they keep their values
+            db.expunge_all()
+            db.rollback()
+            if crud_simulation_run.delete_simulation_runs(db, ids) != len(ids):
+                raise RuntimeError("Runs were archived concurrently by another process")
+            crud_simulation_run_archive.create_simulation_run_archive(db, day, path, runs, len(plans))
+            db.commit()
+            return len(ids)
+        except Exception:
+            db.rollback()
+            if path is not None:
+                os.remove(archive_path(path)) # Not indexed, so nothing reads it
+            raise
+        finally:
+            db.close()
+
+    def _days_to_compact(self, before: datetime):
+        db = self.session_factory()
+        try:
+            return crud_simulation_run_rollup.get_days_to_compact(db, before)
+        finally:
+            db.close()
+
+    def _compact_day(self, day: datetime) -> int:
+        db = self.session_factory()
+        try:
+            merged = crud_simulation_run_rollup.compact_rollups(db, day)
+            db.commit()
+            return merged
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+history_compactor = HistoryCompactor(
+    retention_days=settings.history_retention_days,
+    batch_size=settings.history_compaction_batch_size,
+    interval_s=settings.history_compaction_interval_s,
+)
@@ -0,0 +1,237 @@
+import itertools
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import assignment as crud_assignment
+from app.crud import order as crud_order
+from app.schemas.optimization import SimulationInput
+from app.services.cost_matrix import CostMatrix
+from app.services.driver_pool import DriverPool
+from app.services.schedule_cache import schedule_cache
+from app.services.solver import FleetSnapshot, Plan
+
+# Keeps the last full plan live between assign_orders runs. Each order change is applied against the
+# current driver workloads (one DriverPool lookup, O(log drivers)) and the running KPI totals, and only
+# that order's assignment row is written. Once the incremental changes since the last full run exceed
+# settings.incremental_drift_threshold of the plan size, or routes / drivers changed underneath the plan,
+# the next change triggers a full run instead.
+# invalidate() takes no lock, since it runs on the event loop while an order change may hold the planner
+# lock for a whole re-plan. It bumps an invalidation counter, and a plan built from a snapshot read before
+# the latest invalidation counts as stale. Order changes bump a counter of their own before they wait for
+# the lock: a full run that solved a snapshot read before one of them may have persisted over its
+# incremental assignment, so reset() marks that plan stale.
+
+KPI_TOTALS = ("total_profit", "total_fuel_cost", "total_penalties", "total_bonuses")
+
+
+class _PlannedOrder:
+    __slots__ = ("driver_index", "eta_minutes", "on_time", "profit", "fuel_cost", "penalty", "bonus")
+
+    def __init__(self, driver_index: int, eta_minutes: float, on_time: bool, profit: float,
+                 fuel_cost: float, penalty: float, bonus: float):
+        self.driver_index = driver_index
+        self.eta_minutes = eta_minutes
+        self.on_time = on_time
+        self.profit = profit
+        self.fuel_cost = fuel_cost
+        self.penalty = penalty
+        self.bonus = bonus
+
+
+class IncrementalPlanner:
+    def __init__(self, drift_threshold: float):
+        self.drift_threshold = drift_threshold
+        self._lock = threading.RLock()
+        self._invalidations = itertools.count(1)
+        self.invalidated = 0 # Number of the latest invalidate() call
+        self._order_changes = itertools.count(1)
+        self.order_changes = 0 # Number of the latest order_changed() call
+        self.clear()
+
+    def clear(self):
+        # Forget the live plan; order changes are ignored until the next full run
+        with self._lock:
+            self.simulation_input: Optional[SimulationInput] = None
+            self.simulation_run_id: Optional[int] = None
+            self.assigned_at: Optional[datetime] = None
+            self.matrix: Optional[CostMatrix] = None
+            self.pool: Optional[DriverPool] = None
+            self.orders: Dict[str, _PlannedOrder] = {}
+            self.totals = dict.fromkeys(KPI_TOTALS, 0.0)
+            self.on_time_deliveries = 0
+            self.plan_size = 0
+            self.changes = 0
+            self.stale = False
+            self.plan_invalidated = self.invalidated # invalidated as of the live plan's snapshot
+
+    @property
+    def active(self) -> bool:
+        return self.matrix is not None
+
+    def reset(self, snapshot: FleetSnapshot, simulation_input: SimulationInput, plan: Plan, simulation_run_id: Optional[int] = None,
+              invalidated: Optional[int] = None, order_changes: Optional[int] = None):
+        # Called after every full run with the snapshot it solved and the plan it persisted; invalidated and
+        # order_changes are the values of self.invalidated and self.order_changes read before the snapshot was loaded
+        with self._lock:
+            self.clear()
+            if invalidated is not None:
+                self.plan_invalidated = invalidated
+            # An order changed after the snapshot: the plan lacks it, re-plan fully on the next order change
+            self.stale = order_changes is not None and order_changes != self.order_changes
+            drivers = snapshot.drivers
+            if simulation_input.num_available_drivers is not None:
+                drivers = drivers[:simulation_input.num_available_drivers]
+            self.simulation_input = simulation_input
+            self.simulation_run_id = simulation_run_id
+            self.assigned_at = plan.assigned_at
+            self.matrix = CostMatrix(snapshot.routes, drivers)
+
+            route_of = {order.order_id: order.route_id for order in snapshot.orders}
+            driver_index = {driver_id: d for d, driver_id in enumerate(self.matrix.driver_ids)}
+            workload = np.zeros(len(drivers), dtype=np.float64)
+            for planned in plan.assignments:
+                d = driver_index[planned.driver_id]
+                eta_minutes = self._eta_minutes(self.matrix.route_index[route_of[planned.order_id]], d)
+                workload[d] += eta_minutes
+                self._track(planned.order_id, _PlannedOrder(
+                    d, eta_minutes, planned.on_time, planned.profit, planned.fuel_cost, planned.penalty, planned.bonus
+                ))
+            # Start from the plan's own totals rather than re-summing them in a different order
+            self.totals = {key: plan.kpis[key] for key in KPI_TOTALS}
+            self.on_time_deliveries = plan.kpis["on_time_deliveries"]
+            self.pool = DriverPool(self.matrix, simulation_input.max_hours_per_driver_per_day, workload=workload)
+            self.plan_size = len(plan.assignments)
+
+    def invalidate(self):
+        # Routes or drivers changed: the cached costs no longer hold, re-plan fully on the next order change.
+        # Lock-free; next() on an itertools.count is atomic under the GIL.
+        self.invalidated = next(self._invalidations)
+        schedule_cache.invalidate() # Driver names are part of the schedule
+
+    def kpis(self, simulation_run_id: Optional[int] = None) -> Optional[dict]:
+        # Running KPI totals of the live plan; None without one, or if it is not the given run's plan
+        with self._lock:
+            if not self.active or (simulation_run_id is not None and simulation_run_id != self.simulation_run_id):
+                return None
+            total_deliveries = len(self.orders)
+            return {
+                "total_profit": self.totals["total_profit"],
+                "efficiency_score": (self.on_time_deliveries / total_deliveries) * 100 if total_deliveries > 0 else 0.0,
+                "total_deliveries": total_deliveries,
+                "on_time_deliveries": self.on_time_deliveries,
+                "late_deliveries": total_deliveries - self.on_time_deliveries,
+                "total_fuel_cost": self.totals["total_fuel_cost"],
+                "total_penalties": self.totals["total_penalties"],
+                "total_bonuses": self.totals["total_bonuses"],
+            }
+
+    def order_changed(self, db: Session, order_id: str) -> Optional[str]:
+        # Re-plans one created, updated or deleted order. Returns "incremental", "full" or None (no live plan).
+        # Counted before taking the lock, so a full run already past its snapshot sees this change (see reset).
+        self.order_changes = next(self._order_changes)
+        with self._lock:
+            try:
+                return self._apply(db, order_id)
+            finally:
+                # Even without a live plan, the order's row in the schedule may have changed
+                schedule_cache.invalidate()
+
+    def replan_order(self, order_id: str) -> Optional[str]:
+        # order_changed with its own session, for async handlers that offload it to a worker thread
+        db = SessionLocal()
+        try:
+            return self.order_changed(db, order_id)
+        finally:
+            db.close()
+
+    def _apply(self, db: Session, order_id: str) -> Optional[str]:
+        if not self.active:
+            return None
+        stale = self.stale or self.invalidated != self.plan_invalidated
+        if stale or self.changes >= max(1, int(self.drift_threshold * self.plan_size)):
+            return self._full_run(db)
+
+        try:
+            self._remove(db, order_id)
+            order = crud_order.get_order(db, order_id)
+            if order is not None:
+                self._insert(db, order)
+            db.commit()
+        except Exception:
+            # Memory and DB may disagree now; the next change re-plans from the DB
+            db.rollback()
+            self.stale = True
+            raise
+        self.changes += 1
+        return "incremental"
+
+    def _full_run(self, db: Session) -> str:
+        from app.services.optimizer import Optimizer
+        # assign_orders resets this planner with the fresh plan
+        Optimizer(db).assign_orders(self.simulation_input)
+        return "full"
+
+    def _eta_minutes(self, route_index: int, d: int) -> float:
+        return self.matrix.eta_minutes_by_class[route_index, self.matrix.driver_class[d]]
+
+    def _track(self, order_id: str, planned: _PlannedOrder):
+        self.orders[order_id] = planned
+        self._add_totals(planned, 1)
+
+    def _untrack(self, order_id: str) -> Optional[_PlannedOrder]:
+        planned = self.orders.pop(order_id, None)
+        if planned is not None:
+            self._add_totals(planned, -1)
+        return planned
+
+    def _add_totals(self, planned: _PlannedOrder, sign: int):
+        self.totals["total_profit"] += sign * planned.profit
+        self.totals["total_fuel_cost"] += sign * planned.fuel_cost
+        self.totals["total_penalties"] += sign * planned.penalty
+        self.totals["total_bonuses"] += sign * planned.bonus
+        self.on_time_deliveries += sign * int(planned.on_time)
+
+    def _remove(self, db: Session, order_id: str):
+        planned = self._untrack(order_id)
+        if planned is None:
+            return
+        self.pool.add_workload(planned.driver_index, -planned.eta_minutes)
+        crud_assignment.delete_assignment(db, order_id)
+        crud_order.set_assigned_driver(db, order_id, None)
+
+    def _insert(self, db: Session, order):
+        r = self.matrix.route_index.get(order.route_id, -1)
+        if r < 0:
+            print(f"Warning: Route {order.route_id} not found for order {order.order_id}")
+            return
+        d = self.pool.select(r)
+        if d < 0:
+            return
+        eta_minutes = self._eta_minutes(r, d)
+        self.pool.add_workload(d, eta_minutes)
+        components = self.matrix.evaluate(
+            np.array([r]), np.array([d]), np.array([order.value], dtype=np.float64),
+            np.array([order.delivery_time], dtype="datetime64[us]"), self.assigned_at,
+        )
+        self._track(order.order_id, _PlannedOrder(
+            d, eta_minutes, bool(components["on_time"][0]), float(components["profit"][0]),
+            float(components["fuel_cost"][0]), float(components["penalty"][0]), float(components["bonus"][0]),
+        ))
+        driver_id = self.matrix.driver_ids[d]
+        crud_assignment.upsert_assignment(db, {
+            "order_id": order.order_id,
+            "driver_id": driver_id,
+            "estimated_delivery_time": components["estimated_delivery_time"][0].tolist(),
+            "assigned_at": self.assigned_at,
+            "simulation_run_id": self.simulation_run_id,
+        })
+        crud_order.set_assigned_driver(db, order.order_id, driver_id)
+
+
+incremental_planner = IncrementalPlanner(settings.incremental_drift_threshold)
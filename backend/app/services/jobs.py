@@ -0,0 +1,125 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+# Background job subsystem: a bounded thread pool plus an in-memory registry of job states.
+# Job functions receive the Job as first argument and report progress / honour cancellation
+# through it. Only the most recent settings.job_history_limit finished jobs are kept.
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0.0 # Percent
+        self.detail: Dict[str, Any] = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel_requested = threading.Event()
+        self._future = None
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_requested.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, done: int, total: int):
+        # Matches the solver's progress(done, total) callback; 100% is only reported once the job has finished
+        if total:
+            self.progress = min(99.0, round(done * 100.0 / total, 1))
+        self.check_cancelled()
+
+    def update_detail(self, **detail):
+        self.detail.update(detail)
+        self.check_cancelled()
+
+
+class JobManager:
+    def __init__(self, max_workers: int, history_limit: int = 200):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self.history_limit = history_limit
+
+    def submit(self, kind: str, fn: Callable, *args, **kwargs) -> Job:
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable, args, kwargs):
+        if job.cancel_requested:
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = datetime.now()
+        try:
+            job.result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as exc:
+            job.error = getattr(exc, "detail", None) or str(exc) or exc.__class__.__name__
+            self._finish(job, FAILED)
+        else:
+            job.progress = 100.0
+            self._finish(job, SUCCEEDED)
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished_at = datetime.now()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self):
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        job._cancel_requested.set()
+        # A job still waiting for a worker never starts; a running one stops at its next progress report
+        if job._future is not None and job._future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def shutdown(self, wait: bool = True):
+        for job in self.list():
+            if job.status not in FINISHED_STATES:
+                job._cancel_requested.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+job_manager = JobManager(settings.optimization_max_concurrent_jobs, settings.job_history_limit)
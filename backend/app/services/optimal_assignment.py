@@ -0,0 +1,105 @@
+import math
+import numpy as np
+from datetime import datetime
+
+from app.services.driver_pool import DriverPool
+
+# Cost (₹) charged per projected minute of driver workload. Small enough that order profit
+# (bonus, penalty) dominates, large enough to spread work when profits tie.
+WORKLOAD_COST_PER_MINUTE = 0.01
+# "auto" uses the optimal strategy while the orders x driver-slots cost matrix stays below this size
+AUTO_OPTIMAL_MAX_CELLS = 1_000_000
+# Hard limit for an explicit "optimal": the dense float64 cost matrix and its temporaries take a few
+# hundred MB at this size. Larger problems are solved greedily, and the plan records "greedy".
+OPTIMAL_MAX_CELLS = 10_000_000
+
+
+def driver_slots(matrix, num_orders: int, max_hours_per_driver_per_day=None):
+    # Expands every driver into the number of orders they could plausibly take.
+    # Returns (slot -> driver index, slot -> rank within that driver).
+    num_drivers = len(matrix.driver_ids)
+    per_driver = min(num_orders, 2 * math.ceil(num_orders / num_drivers))
+    capacity = np.full(num_drivers, per_driver, dtype=np.int64)
+    if max_hours_per_driver_per_day is not None and len(matrix.route_ids):
+        shortest_eta = matrix.eta_minutes_by_class.min(axis=0)[matrix.driver_class]
+        slack_minutes = (max_hours_per_driver_per_day - matrix.shift_hours) * 60
+        fits = np.floor(np.maximum(slack_minutes, 0) / np.maximum(shortest_eta, 1e-9))
+        capacity = np.minimum(capacity, fits.astype(np.int64))
+    slot_driver = np.repeat(np.arange(num_drivers), capacity)
+    slot_rank = np.arange(len(slot_driver)) - np.repeat(np.cumsum(capacity) - capacity, capacity)
+    return slot_driver, slot_rank
+
+
+def choose_strategy(strategy: str, matrix, num_orders: int, max_hours_per_driver_per_day=None) -> str:
+    if strategy == "greedy":
+        return strategy
+    if not num_orders or not len(matrix.driver_ids):
+        return "greedy" if strategy == "auto" else strategy
+    slot_driver, _ = driver_slots(matrix, num_orders, max_hours_per_driver_per_day)
+    cells = num_orders * len(slot_driver)
+    if strategy == "auto":
+        return "optimal" if cells <= AUTO_OPTIMAL_MAX_CELLS else "greedy"
+    if cells > OPTIMAL_MAX_CELLS:
+        print(f"Warning: optimal strategy needs a {num_orders} x {len(slot_driver)} cost matrix; using greedy")
+        return "greedy"
+    return strategy
+
+
+def assign_optimal(matrix, route_idx: np.ndarray, order_values: np.ndarray, order_deadlines: np.ndarray,
+                   assigned_at: datetime, max_hours_per_driver_per_day=None, progress=None) -> np.ndarray:
+    # Order -> driver-slot assignment minimising (-profit + workload cost) with linear_sum_assignment.
+    # route_idx must be in priority order; returns the chosen driver index per order (-1 = unassigned).
+    # progress(done, total) is reported per phase: the solve itself is one indivisible step.
+    from scipy.optimize import linear_sum_assignment
+
+    if progress is not None:
+        progress(0, len(route_idx))
+
+    assigned = np.full(len(route_idx), -1, dtype=np.intp)
+    valid = np.flatnonzero(route_idx >= 0)
+    if not len(valid) or not len(matrix.driver_ids):
+        return assigned
+
+    slot_driver, slot_rank = driver_slots(matrix, len(valid), max_hours_per_driver_per_day)
+    if len(slot_driver):
+        valid_routes = route_idx[valid]
+        # Profit of every order for a rested (column 0) and a fatigued (column 1) driver
+        profit = np.stack([
+            matrix.evaluate_for_class(
+                valid_routes, np.full(len(valid), c, dtype=np.intp),
+                order_values[valid], order_deadlines[valid], assigned_at,
+            )["profit"]
+            for c in (0, 1)
+        ], axis=1)
+        slot_class = matrix.driver_class[slot_driver]
+        mean_eta = matrix.eta_minutes_by_class[valid_routes].mean(axis=0)
+        projected_minutes = matrix.base_score[slot_driver] + (slot_rank + 0.5) * mean_eta[slot_class]
+        cost = -profit[:, slot_class] + WORKLOAD_COST_PER_MINUTE * projected_minutes[np.newaxis, :]
+        rows, cols = linear_sum_assignment(cost)
+        assigned[valid[rows]] = slot_driver[cols]
+    if progress is not None:
+        progress(len(route_idx) * 9 // 10, len(route_idx))
+
+    # Slots only approximate capacity: replay in priority order, drop whatever breaks the
+    # max-hours rule, then place the leftovers greedily on the remaining capacity.
+    max_hours = max_hours_per_driver_per_day
+    workload = np.zeros(len(matrix.driver_ids), dtype=np.float64)
+    for k in valid:
+        d = assigned[k]
+        if d < 0:
+            continue
+        eta_minutes = matrix.eta_minutes_by_class[route_idx[k], matrix.driver_class[d]]
+        if max_hours is not None and (matrix.shift_hours[d] + (workload[d] + eta_minutes) / 60) > max_hours:
+            assigned[k] = -1
+        else:
+            workload[d] += eta_minutes
+
+    pool = DriverPool(matrix, max_hours_per_driver_per_day, workload=workload)
+    for k in valid:
+        if assigned[k] >= 0:
+            continue
+        best = pool.select(route_idx[k])
+        if best >= 0:
+            assigned[k] = best
+            pool.add_workload(best, matrix.eta_minutes_by_class[route_idx[k], matrix.driver_class[best]])
+    return assigned
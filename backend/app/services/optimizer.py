@@ -1,40 +1,43 @@
 from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
 from app.models.driver import Driver
 from app.models.order import Order
 from app.models.route import Route
 from app.crud import assignment as crud_assignment
 from app.crud import order as crud_order
-from app.crud import route as crud_route
-from app.crud import driver as crud_driver
 from app.crud import simulation_run as crud_simulation_run
-from app.schemas.assignment import AssignmentCreate
 from app.schemas.simulation_run import SimulationRunCreate
-from app.schemas.optimization import SimulationInput
+from app.schemas.optimization import KpiData, SimulationInput
+from app.services.fleet_store import fleet_store
+from app.services.solver import FleetSnapshot, Plan, solve
+from app.services.incremental import incremental_planner
+from app.services.schedule_cache import schedule_cache
+from app.services.rules import (
+    AVG_SPEED_KMH,
+    BASE_FUEL_COST_PER_KM,
+    DEFAULT_TRAFFIC_FACTOR,
+    FATIGUE_SPEED_DECREASE_FACTOR,
+    FATIGUE_THRESHOLD_HOURS,
+    HIGH_TRAFFIC_FUEL_SURCHARGE_PER_KM,
+    HIGH_VALUE_BONUS_PERCENTAGE,
+    HIGH_VALUE_BONUS_THRESHOLD,
+    LATE_DELIVERY_GRACE_MINUTES,
+    LATE_DELIVERY_PENALTY,
+    TRAFFIC_FACTORS,
+)
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 
-# Company Rule Constants
-LATE_DELIVERY_PENALTY = 50  # ₹50
-FATIGUE_SPEED_DECREASE_FACTOR = 0.30 # 30% decrease
-HIGH_VALUE_BONUS_THRESHOLD = 1000 # ₹1000
-HIGH_VALUE_BONUS_PERCENTAGE = 0.10 # 10%
-BASE_FUEL_COST_PER_KM = 5 # ₹5/km
-HIGH_TRAFFIC_FUEL_SURCHARGE_PER_KM = 2 # ₹2/km
-
 class Optimizer:
     def __init__(self, db: Session):
         self.db = db
-        self.avg_speed_kmh = 30  # Default average speed in km/h
-        self.traffic_factors = {
-            "low": 0.1,   # 10% increase in base time
-            "medium": 0.3, # 30% increase
-            "high": 0.6   # 60% increase
-        }
+        self.avg_speed_kmh = AVG_SPEED_KMH
+        self.traffic_factors = dict(TRAFFIC_FACTORS)
         self._last_kpis = None # Store last calculated KPIs
 
     def _calculate_estimated_delivery_time(self, route: Route, driver: Driver) -> timedelta:
         # estimated_delivery_time = base_time_minutes + traffic_factor + (distance_km / avg_speed)*60
-        traffic_multiplier = 1 + self.traffic_factors.get(route.traffic_level.lower(), 0.2) # Default 20% if not found
+        traffic_multiplier = 1 + self.traffic_factors.get(route.traffic_level.lower(), DEFAULT_TRAFFIC_FACTOR)
         travel_time_hours = route.distance_km / self.avg_speed_kmh
         travel_time_minutes = travel_time_hours * 60
         
@@ -42,7 +45,7 @@ class Optimizer:
 
         # Driver Fatigue Rule: If a driver works >8 hours in a day, their delivery speed decreases by 30%
         # Simplified: Check current shift_hours_today or average past_week_hours
-        if driver.shift_hours_today > 8 or (driver.hours_worked_past_week / 7) > 8:
+        if driver.shift_hours_today > FATIGUE_THRESHOLD_HOURS or (driver.hours_worked_past_week / 7) > FATIGUE_THRESHOLD_HOURS:
             estimated_minutes *= (1 + FATIGUE_SPEED_DECREASE_FACTOR)
 
         return timedelta(minutes=estimated_minutes)
@@ -53,7 +56,7 @@ class Optimizer:
         # and estimated_delivery_time is what we calculated.
         # The rule states "base route time + 10 minutes", which is a bit ambiguous with our estimated_delivery_time.
         # I will interpret this as: if our estimated delivery time is more than 10 minutes past the customer's requested delivery time.
-        if estimated_delivery_time > order_delivery_time + timedelta(minutes=10):
+        if estimated_delivery_time > order_delivery_time + timedelta(minutes=LATE_DELIVERY_GRACE_MINUTES):
             return LATE_DELIVERY_PENALTY
         return 0.0
 
@@ -93,165 +96,105 @@ class Optimizer:
         )
         return score
 
-    def assign_orders(self, simulation_input: SimulationInput):
+    def load_snapshot(self) -> FleetSnapshot:
+        # Mapped from the columnar snapshot of the current fleet version; queried (and stored) when it is stale
+        return fleet_store.load_snapshot(self.db)
+
+    def persist_plan(self, plan: Plan, simulation_run: SimulationRunCreate) -> int:
+        # Swap the whole plan and record its simulation run, with a copy of the plan for history, in a single
+        # transaction, so readers see either the old plan or the new one, always next to the KPIs that describe it
+        try:
+            simulation_run_id = crud_simulation_run.create_simulation_run(self.db, simulation_run).id
+            crud_simulation_run.create_simulation_run_plan(self.db, simulation_run_id, plan.assigned_at, plan.assignments)
+            crud_assignment.bulk_replace_assignments(self.db, [
+                {
+                    "order_id": planned.order_id,
+                    "driver_id": planned.driver_id,
+                    "estimated_delivery_time": planned.estimated_delivery_time,
+                    "assigned_at": plan.assigned_at,
+                    "simulation_run_id": simulation_run_id,
+                }
+                for planned in plan.assignments
+            ])
+            crud_order.bulk_assign_orders(self.db, [(planned.order_id, planned.driver_id) for planned in plan.assignments])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        schedule_cache.invalidate()
+        return simulation_run_id
+
+    def assign_orders(self, simulation_input: SimulationInput, progress=None):
         # Input validation
         if simulation_input.num_available_drivers is not None and simulation_input.num_available_drivers <= 0:
             raise HTTPException(status_code=400, detail="Number of available drivers must be positive.")
         if simulation_input.max_hours_per_driver_per_day is not None and simulation_input.max_hours_per_driver_per_day < 0:
             raise HTTPException(status_code=400, detail="Max hours per driver per day cannot be negative.")
 
-        # Clear previous assignments
-        crud_assignment.delete_all_assignments(self.db)
-
-        # Unassign all orders
-        all_orders = self.db.query(Order).all()
-        for order in all_orders:
-            order.assigned_driver_id = None
-        self.db.commit()
-
-        drivers = self.db.query(Driver).all()
-        # Filter drivers based on num_available_drivers input
-        if simulation_input.num_available_drivers is not None:
-            drivers = drivers[:simulation_input.num_available_drivers]
-
-        orders = self.db.query(Order).filter(Order.assigned_driver_id == None).all()
-        print(f"DEBUG: Number of unassigned orders fetched: {len(orders)}") # DEBUG
-        routes = {r.route_id: r for r in self.db.query(Route).all()}
-
-        # Initialize KPI accumulators
-        total_profit = 0.0
-        total_deliveries = 0
-        on_time_deliveries = 0
-        total_fuel_cost = 0.0
-        total_penalties = 0.0
-        total_bonuses = 0.0
-
-        # Initialize driver workloads
-        driver_workloads = {driver.driver_id: 0.0 for driver in drivers}
-        driver_assigned_orders = {driver.driver_id: [] for driver in drivers}
-
-        # Sort orders by delivery time (earliest first) to prioritize
-        orders.sort(key=lambda o: o.delivery_time)
-
-        for order in orders:
-            best_driver = None
-            min_score = float('inf')
-
-            route = routes.get(order.route_id)
-            if not route:
-                print(f"Warning: Route {order.route_id} not found for order {order.order_id}")
-                continue
-
-            # Pass driver to calculate_estimated_delivery_time for fatigue rule
-            for driver in drivers:
-                estimated_travel_time = self._calculate_estimated_delivery_time(route, driver)
-                current_workload = driver_workloads[driver.driver_id]
-                
-                # Calculate potential new workload if this order is assigned
-                potential_workload = current_workload + estimated_travel_time.total_seconds() / 60 # Convert timedelta to minutes
-
-                # Max hours per driver per day constraint
-                if simulation_input.max_hours_per_driver_per_day is not None and \
-                   (driver.shift_hours_today + (potential_workload / 60)) > simulation_input.max_hours_per_driver_per_day:
-                    continue # Skip this driver if they exceed max hours
+        # Drivers, routes or orders changing from here on make this plan stale (see IncrementalPlanner.reset)
+        invalidated = incremental_planner.invalidated
+        order_changes = incremental_planner.order_changes
+        snapshot = self.load_snapshot()
+        plan = solve(snapshot, simulation_input, progress=progress)
 
-                score = self._score_driver(driver, potential_workload)
-
-                if score < min_score:
-                    min_score = score
-                    best_driver = driver
-            
-            if best_driver:
-                print(f"DEBUG: Assigning order {order.order_id} to driver {best_driver.driver_id}") # DEBUG
-                # Assign order to the best driver
-                crud_order.assign_order_to_driver(self.db, order.order_id, best_driver.driver_id)
-                
-                # Record assignment
-                assigned_at = datetime.now()
-                # Use route_start_time if provided
-                if simulation_input.route_start_time:
-                    try:
-                        start_time_obj = datetime.strptime(simulation_input.route_start_time, '%H:%M').time()
-                        assigned_at = datetime.combine(assigned_at.date(), start_time_obj)
-                    except ValueError:
-                        print(f"Warning: Invalid route_start_time format: {simulation_input.route_start_time}")
-
-                # Recalculate estimated_delivery_time with the chosen best_driver
-                final_estimated_travel_time = self._calculate_estimated_delivery_time(route, best_driver)
-                estimated_delivery_time_for_order = assigned_at + final_estimated_travel_time
-
-                assignment_data = AssignmentCreate(
-                    order_id=order.order_id,
-                    driver_id=best_driver.driver_id,
-                    estimated_delivery_time=estimated_delivery_time_for_order,
-                    assigned_at=assigned_at
-                )
-                crud_assignment.create_assignment(self.db, assignment_data)
-
-                # Update driver's workload
-                driver_workloads[best_driver.driver_id] += final_estimated_travel_time.total_seconds() / 60
-                driver_assigned_orders[best_driver.driver_id].append(order.order_id)
-
-                # Calculate KPIs for this order
-                is_on_time = estimated_delivery_time_for_order <= order.delivery_time
-                print(f"DEBUG: Order {order.order_id} - Requested: {order.delivery_time} (Type: {type(order.delivery_time)}), Estimated: {estimated_delivery_time_for_order} (Type: {type(estimated_delivery_time_for_order)}), Is On Time: {is_on_time}") # DEBUG
-                penalty = self._calculate_late_delivery_penalty(estimated_delivery_time_for_order, order.delivery_time)
-                bonus = self._calculate_high_value_bonus(order.value, is_on_time)
-                fuel_cost = self._calculate_fuel_cost(route)
-                order_profit = self._calculate_order_profit(order, route, estimated_delivery_time_for_order)
-
-                total_profit += order_profit
-                total_deliveries += 1
-                if is_on_time:
-                    on_time_deliveries += 1
-                total_fuel_cost += fuel_cost
-                total_penalties += penalty
-                total_bonuses += bonus
-
-        efficiency_score = (on_time_deliveries / total_deliveries) * 100 if total_deliveries > 0 else 0.0
-
-        kpis_data = {
-            "total_profit": total_profit,
-            "efficiency_score": efficiency_score,
-            "total_deliveries": total_deliveries,
-            "on_time_deliveries": on_time_deliveries,
-            "late_deliveries": total_deliveries - on_time_deliveries,
-            "total_fuel_cost": total_fuel_cost,
-            "total_penalties": total_penalties,
-            "total_bonuses": total_bonuses
-        }
+        kpis_data = plan.kpis
         self._last_kpis = kpis_data # Store the last calculated KPIs
 
-        # Save simulation run history
+        # Save simulation run history together with the plan
         simulation_run_data = SimulationRunCreate(
             timestamp=datetime.now(),
             num_available_drivers=simulation_input.num_available_drivers,
             route_start_time=simulation_input.route_start_time,
             max_hours_per_driver_per_day=simulation_input.max_hours_per_driver_per_day,
+            strategy=plan.strategy,
             **kpis_data
         )
-        crud_simulation_run.create_simulation_run(self.db, simulation_run_data)
-
-        print(f"DEBUG: Total assignments created in assign_orders: {len(crud_assignment.get_assignments(self.db))}") # DEBUG
+        simulation_run_id = self.persist_plan(plan, simulation_run_data)
+        # Order changes from now on are applied to this plan incrementally
+        incremental_planner.reset(snapshot, simulation_input, plan, simulation_run_id, invalidated, order_changes)
         return {
             "message": "Orders assigned successfully",
-            "assignments": driver_assigned_orders,
+            "strategy": plan.strategy,
+            "simulation_run_id": simulation_run_id,
+            "assignments": plan.driver_assigned_orders,
             "kpis": kpis_data
         }
 
     def get_optimized_schedule(self):
-        assignments = self.db.query(crud_assignment.Assignment).all()
-        print(f"DEBUG: Number of assignments fetched in get_optimized_schedule: {len(assignments)}") # DEBUG
-        schedule = []
-        for assignment in assignments:
-            order = crud_order.get_order(self.db, assignment.order_id)
-            driver = crud_driver.get_driver(self.db, assignment.driver_id)
-            if order and driver:
-                schedule.append({
-                    "order_id": order.order_id,
-                    "driver_name": driver.name,
-                    "estimated_delivery_time": assignment.estimated_delivery_time.isoformat(),
-                    "assigned_at": assignment.assigned_at.isoformat()
-                })
-        
-        return {"schedule": schedule, "kpis": self._last_kpis}
\ No newline at end of file
+        # Read before anything else: an invalidation from here on keeps this response out of the cache
+        generation = schedule_cache.generation
+        simulation_run_id = crud_assignment.get_current_simulation_run_id(self.db)
+        bind = self.db.get_bind()
+        cached = schedule_cache.get(bind, simulation_run_id)
+        if cached is not None:
+            return cached
+
+        schedule = [
+            {
+                "order_id": order_id,
+                "driver_name": driver_name,
+                "estimated_delivery_time": estimated_delivery_time.isoformat(),
+                "assigned_at": assigned_at.isoformat()
+            }
+            for order_id, driver_name, estimated_delivery_time, assigned_at in crud_assignment.get_schedule_rows(self.db)
+        ]
+
+        # The live plan's running totals include incremental order changes since the full run;
+        # otherwise the KPIs recorded with the plan's simulation run
+        kpis = incremental_planner.kpis(simulation_run_id)
+        if kpis is None and simulation_run_id is not None:
+            simulation_run = crud_simulation_run.get_simulation_run(self.db, simulation_run_id)
+            if simulation_run is not None:
+                kpis = {field: getattr(simulation_run, field) for field in KpiData.model_fields}
+
+        response = {"simulation_run_id": simulation_run_id, "schedule": schedule, "kpis": kpis}
+        schedule_cache.put(bind, simulation_run_id, response, generation)
+        return response
+
+def run_assign_orders_job(job, simulation_input: SimulationInput):
+    # Job entry point (see app.services.jobs): the job owns its session and reports progress through the order list
+    db = SessionLocal()
+    try:
+        return Optimizer(db).assign_orders(simulation_input, progress=job.report_progress)
+    finally:
+        db.close()
@@ -0,0 +1,204 @@
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import order as crud_order
+from app.schemas.order import OrderCreate
+from app.services.incremental import incremental_planner
+
+# Streaming order ingestion for POST /orders/bulk. The request body is read chunk by chunk, split into
+# records, validated against OrderCreate and upserted settings.order_bulk_batch_size rows per transaction.
+# Every record gets one NDJSON result line, {"row", "order_id", "status"} with status created, updated or
+# rejected (plus a "message"), followed by a final {"summary": ...} line. Only one batch is held in memory.
+
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "text/csv": CSV,
+    "application/csv": CSV,
+}
+ORDER_FIELDS = tuple(OrderCreate.model_fields)
+MAX_RECORD_BYTES = 64 * 1024 # Longer records are rejected without being buffered
+
+
+def body_format(content_type: Optional[str]) -> Optional[str]:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return MEDIA_TYPES.get(media_type)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    # Complete lines without their line break; None stands for a line over MAX_RECORD_BYTES
+    pending = b""
+    oversized = False
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield None if oversized else line.rstrip(b"\r")
+            oversized = False
+        if len(pending) > MAX_RECORD_BYTES:
+            pending = b""
+            oversized = True
+    if pending or oversized:
+        yield None if oversized else pending.rstrip(b"\r")
+
+
+class NdjsonParser:
+    # One JSON object per line; blank lines are skipped
+    def __init__(self):
+        self.row = 0
+
+    def feed(self, line: Optional[bytes]) -> Optional[Tuple[int, Optional[dict], Optional[str]]]:
+        if line is not None and not line.strip():
+            return None
+        self.row += 1
+        if line is None:
+            return self.row, None, f"Record longer than {MAX_RECORD_BYTES} bytes"
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            return self.row, None, f"Invalid JSON: {exc}"
+        if not isinstance(record, dict):
+            return self.row, None, "Expected a JSON object"
+        return self.row, record, None
+
+
+class CsvParser:
+    # A header line naming the OrderCreate fields, then one order per record. Quoted fields may span lines.
+    def __init__(self):
+        self.row = 0
+        self.header: Optional[List[str]] = None
+        self.pending = ""
+
+    def feed(self, line: Optional[bytes]) -> Optional[Tuple[int, Optional[dict], Optional[str]]]:
+        if line is None:
+            self.pending = ""
+            return self._next_row(None, f"Record longer than {MAX_RECORD_BYTES} bytes")
+        try:
+            text = line.decode("utf-8-sig" if self.header is None else "utf-8")
+        except UnicodeDecodeError:
+            self.pending = ""
+            return self._next_row(None, "Record is not valid UTF-8")
+        text = self.pending + text
+        if text.count('"') % 2:
+            # Inside a quoted field: the record continues on the next line
+            self.pending = text + "\n"
+            if len(self.pending) > MAX_RECORD_BYTES:
+                self.pending = ""
+                return self._next_row(None, f"Record longer than {MAX_RECORD_BYTES} bytes")
+            return None
+        self.pending = ""
+        if not text.strip():
+            return None
+        values = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            missing = [field for field in ORDER_FIELDS if field not in self.header]
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+            return None
+        if len(values) != len(self.header):
+            return self._next_row(None, f"Expected {len(self.header)} fields, got {len(values)}")
+        return self._next_row(dict(zip(self.header, (value.strip() for value in values))), None)
+
+    def _next_row(self, record: Optional[dict], message: Optional[str]):
+        self.row += 1
+        return self.row, record, message
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    # The body iterator reads the request body while the response streams. StreamingResponse would also
+    # poll receive() for a disconnect and swallow those body messages; a disconnect surfaces through
+    # request.stream() instead.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def validate_order(record: dict) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        return OrderCreate(**record).model_dump(), None
+    except ValidationError as exc:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )
+
+
+def apply_order_batch(db: Session, entries: List[Tuple[int, Optional[str], Optional[dict], Optional[str]]]) -> List[dict]:
+    # entries: (row, order_id, order or None, rejection message); one transaction for the whole batch.
+    # Order ids are unique within a batch (see ingest_orders), so a single upsert statement is safe.
+    orders = [order for _, _, order, _ in entries if order is not None]
+    try:
+        existing = crud_order.get_existing_order_ids(db, [order["order_id"] for order in orders])
+        crud_order.bulk_upsert_orders(db, orders)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    results = []
+    for row, order_id, order, message in entries:
+        if order is None:
+            results.append({"row": row, "order_id": order_id, "status": "rejected", "message": message})
+        else:
+            results.append({"row": row, "order_id": order_id, "status": "updated" if order_id in existing else "created"})
+    return results
+
+
+async def ingest_orders(chunks: AsyncIterator[bytes], fmt: str, batch_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    # Yields NDJSON result lines. Batches committed before an error stay applied; the error ends the stream.
+    batch_size = batch_size or settings.order_bulk_batch_size
+    parser = NdjsonParser() if fmt == NDJSON else CsvParser()
+    totals: Dict[str, int] = {"created": 0, "updated": 0, "rejected": 0}
+    entries = []
+    batch_ids = set()
+    db = SessionLocal()
+
+    async def flush():
+        results = await run_in_threadpool(apply_order_batch, db, entries)
+        for result in results:
+            totals[result["status"]] += 1
+        entries.clear()
+        batch_ids.clear()
+        return "".join(json.dumps(result) + "\n" for result in results).encode()
+
+    try:
+        try:
+            async for line in iter_lines(chunks):
+                parsed = parser.feed(line)
+                if parsed is None:
+                    continue
+                row, record, message = parsed
+                order, order_id = None, None
+                if record is not None:
+                    order_id = record.get("order_id")
+                    order, message = validate_order(record)
+                    # The same order twice in one upsert statement is an error: close the batch first
+                    if order is not None and order["order_id"] in batch_ids:
+                        yield await flush()
+                entries.append((row, order_id, order, message))
+                if order is not None:
+                    batch_ids.add(order["order_id"])
+                if len(entries) >= batch_size:
+                    yield await flush()
+            if entries:
+                yield await flush()
+        except Exception as exc:
+            yield (json.dumps({"error": str(exc) or exc.__class__.__name__}) + "\n").encode()
+        yield (json.dumps({"summary": totals}) + "\n").encode()
+    finally:
+        db.close()
+        if totals["created"] or totals["updated"]:
+            # Many orders at once: re-plan fully on the next order change instead of one by one
+            incremental_planner.invalidate()
@@ -0,0 +1,78 @@
+import io
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.solver import PlannedAssignment
+
+# Compact encoding of a run's plan for simulation history: one array per field of PlannedAssignment,
+# stored as a compressed .npz blob. Driver ids are dictionary-encoded (a plan repeats few drivers over
+# many orders) and ETAs are datetime64. Blobs are loaded without pickle, so a stored row cannot run code.
+
+FORMAT_VERSION = 1
+FLOAT_COLUMNS = ("bonus", "penalty", "fuel_cost", "profit")
+
+
+def _string_column(values) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.empty(0, dtype="<U1")
+
+
+def encode_plan(assignments: List[PlannedAssignment]) -> bytes:
+    driver_ids, driver_codes = np.unique(_string_column([planned.driver_id for planned in assignments]), return_inverse=True)
+    columns = {
+        "order_ids": _string_column([planned.order_id for planned in assignments]),
+        "driver_ids": driver_ids,
+        "driver_codes": driver_codes.astype(np.int32),
+        "estimated_delivery_times": np.array([planned.estimated_delivery_time for planned in assignments], dtype="datetime64[us]"),
+        "on_time": np.array([planned.on_time for planned in assignments], dtype=bool),
+    }
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array([getattr(planned, name) for planned in assignments], dtype=np.float64)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **columns)
+    return buffer.getvalue()
+
+
+def decode_plan(data: bytes) -> Dict[str, np.ndarray]:
+    # Column arrays in plan order, with driver_ids expanded to one entry per assignment
+    with np.load(io.BytesIO(data), allow_pickle=False) as stored:
+        columns = {name: stored[name] for name in stored.files}
+    columns["driver_ids"] = columns["driver_ids"][columns.pop("driver_codes")]
+    return columns
+
+
+def plan_rows(columns: Dict[str, np.ndarray], index=None) -> List[dict]:
+    # PlannedAssignment-shaped dicts, for all rows or the given positions
+    if index is not None:
+        columns = {name: values[index] for name, values in columns.items()}
+    names = ("order_ids", "driver_ids", "estimated_delivery_times", "on_time") + FLOAT_COLUMNS
+    return [
+        {
+            "order_id": order_id, "driver_id": driver_id, "estimated_delivery_time": estimated_delivery_time,
+            "on_time": on_time, "bonus": bonus, "penalty": penalty, "fuel_cost": fuel_cost, "profit": profit,
+        }
+        for order_id, driver_id, estimated_delivery_time, on_time, bonus, penalty, fuel_cost, profit
+        in zip(*(columns[name].tolist() for name in names))
+    ]
+
+
+def diff_plans(base: Dict[str, np.ndarray], other: Dict[str, np.ndarray]) -> dict:
+    # Orders only planned in other (added), only in base (removed), and planned in both with a different
+    # driver, ETA or profit (changed, as before/after pairs). Rows are in order id order.
+    common, base_index, other_index = np.intersect1d(base["order_ids"], other["order_ids"], return_indices=True)
+    removed = np.flatnonzero(~np.isin(base["order_ids"], common))
+    added = np.flatnonzero(~np.isin(other["order_ids"], common))
+    changed = (
+        (base["driver_ids"][base_index] != other["driver_ids"][other_index])
+        | (base["estimated_delivery_times"][base_index] != other["estimated_delivery_times"][other_index])
+        | (base["profit"][base_index] != other["profit"][other_index])
+    )
+    return {
+        "added": plan_rows(other, added[np.argsort(other["order_ids"][added], kind="stable")]),
+        "removed": plan_rows(base, removed[np.argsort(base["order_ids"][removed], kind="stable")]),
+        "changed": [
+            {"before": before, "after": after}
+            for before, after in zip(plan_rows(base, base_index[changed]), plan_rows(other, other_index[changed]))
+        ],
+        "unchanged": int(len(common) - changed.sum()),
+    }
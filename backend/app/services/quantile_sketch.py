@@ -0,0 +1,83 @@
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+# Mergeable quantile sketch for the simulation history rollups (DDSketch-style). Values fall into
+# logarithmic bins whose width is a fixed fraction of their magnitude, so any quantile is answered within
+# RELATIVE_ACCURACY of a real value however many runs were added, and two sketches merge by adding counts.
+# Negative values (profit can be negative) use a mirrored set of bins; exact zeros are counted apart.
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+MIN_MAGNITUDE = 1e-9 # Smaller values count as zero
+
+
+class QuantileSketch:
+    __slots__ = ("positive", "negative", "zero", "count")
+
+    def __init__(self, positive: Optional[Dict[int, int]] = None, negative: Optional[Dict[int, int]] = None, zero: int = 0):
+        self.positive = positive or {}
+        self.negative = negative or {}
+        self.zero = zero
+        self.count = zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def add(self, value: float):
+        self.count += 1
+        if abs(value) < MIN_MAGNITUDE:
+            self.zero += 1
+            return
+        bins = self.positive if value > 0 else self.negative
+        index = math.ceil(math.log(abs(value)) / _LOG_GAMMA)
+        bins[index] = bins.get(index, 0) + 1
+
+    def update(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch"):
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_bins.items():
+                bins[index] = bins.get(index, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        # q in [0, 1]; None for an empty sketch
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # Ascending values: most negative first (largest negative bin index), then zero, then positives
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -_bin_value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return _bin_value(index)
+        return _bin_value(max(self.positive)) if self.positive else 0.0
+
+    def to_json(self) -> str:
+        return json.dumps({"p": self.positive, "n": self.negative, "z": self.zero}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "QuantileSketch":
+        if not text:
+            return cls()
+        data = json.loads(text)
+        # JSON object keys are strings
+        return cls(
+            {int(index): count for index, count in data["p"].items()},
+            {int(index): count for index, count in data["n"].items()},
+            data["z"],
+        )
+
+
+def _bin_value(index: int) -> float:
+    # Midpoint of bin (gamma^(index-1), gamma^index] in relative terms
+    return 2 * GAMMA ** index / (GAMMA + 1)
@@ -0,0 +1,53 @@
+from typing import List
+
+from app.services.rules import (
+    AVG_SPEED_KMH,
+    BASE_FUEL_COST_PER_KM,
+    DEFAULT_TRAFFIC_FACTOR,
+    FATIGUE_SPEED_DECREASE_FACTOR,
+    HIGH_TRAFFIC_FUEL_SURCHARGE_PER_KM,
+    TRAFFIC_FACTORS,
+)
+
+# Per-route part of the company rules. It only depends on the route row, so it is computed once
+# when a route is written (see app.crud.route_cost) instead of once per order x driver evaluation.
+
+TRAFFIC_LEVELS = ("low", "medium", "high")
+UNKNOWN_TRAFFIC_LEVEL = "unknown"
+
+
+def normalize_traffic_level(traffic_level) -> str:
+    level = str(traffic_level or "").strip().lower()
+    return level if level in TRAFFIC_LEVELS else UNKNOWN_TRAFFIC_LEVEL
+
+
+class RouteCostRecord:
+    __slots__ = ("route_id", "traffic_level", "fuel_cost", "eta_minutes", "fatigued_eta_minutes")
+
+    def __init__(self, route_id: str, traffic_level: str, fuel_cost: float, eta_minutes: float, fatigued_eta_minutes: float):
+        self.route_id = route_id
+        self.traffic_level = traffic_level
+        self.fuel_cost = fuel_cost
+        self.eta_minutes = eta_minutes
+        self.fatigued_eta_minutes = fatigued_eta_minutes
+
+
+def compute_route_cost(route) -> RouteCostRecord:
+    # Same operation order as Optimizer._calculate_estimated_delivery_time / _calculate_fuel_cost
+    traffic_level = normalize_traffic_level(route.traffic_level)
+    traffic_multiplier = 1 + TRAFFIC_FACTORS.get(traffic_level, DEFAULT_TRAFFIC_FACTOR)
+    travel_time_minutes = route.distance_km / AVG_SPEED_KMH * 60
+    eta_minutes = route.base_time_minutes * traffic_multiplier + travel_time_minutes
+
+    fuel_cost = route.distance_km * BASE_FUEL_COST_PER_KM
+    if traffic_level == "high":
+        fuel_cost += route.distance_km * HIGH_TRAFFIC_FUEL_SURCHARGE_PER_KM
+
+    # Driver Fatigue Rule: a fatigued driver's delivery speed decreases by 30%
+    fatigued_eta_minutes = eta_minutes * (1 + FATIGUE_SPEED_DECREASE_FACTOR)
+    return RouteCostRecord(route.route_id, traffic_level, fuel_cost, eta_minutes, fatigued_eta_minutes)
+
+
+def as_route_costs(routes) -> List[RouteCostRecord]:
+    # Accepts precomputed costs (from the route_costs table) or raw routes (ORM rows, RouteRecord, ...)
+    return [route if isinstance(route, RouteCostRecord) else compute_route_cost(route) for route in routes]
@@ -0,0 +1,17 @@
+# Company Rule Constants
+LATE_DELIVERY_PENALTY = 50  # ₹50
+LATE_DELIVERY_GRACE_MINUTES = 10 # Penalty applies once we are more than 10 minutes late
+FATIGUE_SPEED_DECREASE_FACTOR = 0.30 # 30% decrease
+FATIGUE_THRESHOLD_HOURS = 8 # A driver working >8 hours in a day is fatigued
+HIGH_VALUE_BONUS_THRESHOLD = 1000 # ₹1000
+HIGH_VALUE_BONUS_PERCENTAGE = 0.10 # 10%
+BASE_FUEL_COST_PER_KM = 5 # ₹5/km
+HIGH_TRAFFIC_FUEL_SURCHARGE_PER_KM = 2 # ₹2/km
+
+AVG_SPEED_KMH = 30  # Default average speed in km/h
+TRAFFIC_FACTORS = {
+    "low": 0.1,   # 10% increase in base time
+    "medium": 0.3, # 30% increase
+    "high": 0.6   # 60% increase
+}
+DEFAULT_TRAFFIC_FACTOR = 0.2 # Default 20% if not found
@@ -0,0 +1,40 @@
+import threading
+from typing import Optional
+
+# The schedule only changes when a plan (or an incremental change to it) is committed, so the
+# assembled response is kept until then. Entries are keyed by engine and simulation run id: a plan
+# committed elsewhere shows up as a new run id, one committed here also calls invalidate().
+# Every invalidate() bumps a generation counter. A response assembled while an invalidation landed is
+# not stored, since it may predate the change.
+
+
+class ScheduleCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry = None # (bind, simulation_run_id, schedule response)
+        self.generation = 0
+
+    def get(self, bind, simulation_run_id: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            if self._entry is None:
+                return None
+            cached_bind, cached_run_id, response = self._entry
+            if cached_bind is not bind or cached_run_id != simulation_run_id:
+                return None
+            return response
+
+    def put(self, bind, simulation_run_id: Optional[int], response: dict, generation: int) -> bool:
+        # generation: the value read before the response was assembled; returns whether it was stored
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entry = (bind, simulation_run_id, response)
+            return True
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+            self.generation += 1
+
+
+schedule_cache = ScheduleCache()
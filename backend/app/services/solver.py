@@ -0,0 +1,168 @@
+import numpy as np
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.schemas.optimization import SimulationInput
+from app.services.cost_matrix import CostMatrix
+from app.services.optimal_assignment import assign_optimal, choose_strategy
+
+# Pure solve core: no Session, no ORM objects. Everything here is picklable so it can run in
+# worker processes and benchmarks; Optimizer loads a snapshot from the DB and persists the Plan.
+
+
+class DriverRecord:
+    __slots__ = ("driver_id", "name", "shift_hours_today", "hours_worked_past_week")
+
+    def __init__(self, driver_id: str, name: str, shift_hours_today: float, hours_worked_past_week: float):
+        self.driver_id = driver_id
+        self.name = name
+        self.shift_hours_today = shift_hours_today
+        self.hours_worked_past_week = hours_worked_past_week
+
+
+class OrderRecord:
+    __slots__ = ("order_id", "value", "route_id", "delivery_time")
+
+    def __init__(self, order_id: str, value: float, route_id: str, delivery_time: datetime):
+        self.order_id = order_id
+        self.value = value
+        self.route_id = route_id
+        self.delivery_time = delivery_time
+
+
+class RouteRecord:
+    __slots__ = ("route_id", "distance_km", "traffic_level", "base_time_minutes")
+
+    def __init__(self, route_id: str, distance_km: float, traffic_level: str, base_time_minutes: int):
+        self.route_id = route_id
+        self.distance_km = distance_km
+        self.traffic_level = traffic_level
+        self.base_time_minutes = base_time_minutes
+
+
+class FleetSnapshot:
+    # Read-only view of drivers (in fleet order), orders and routes for one solve.
+    # routes may hold RouteRecords or precomputed RouteCostRecords (see app.services.route_costs).
+    __slots__ = ("drivers", "orders", "routes")
+
+    def __init__(self, drivers: List[DriverRecord], orders: List[OrderRecord], routes: List[RouteRecord]):
+        self.drivers = drivers
+        self.orders = orders
+        self.routes = routes
+
+
+class PlannedAssignment:
+    __slots__ = ("order_id", "driver_id", "estimated_delivery_time", "on_time", "bonus", "penalty", "fuel_cost", "profit")
+
+    def __init__(self, order_id: str, driver_id: str, estimated_delivery_time: datetime, on_time: bool,
+                 bonus: float, penalty: float, fuel_cost: float, profit: float):
+        self.order_id = order_id
+        self.driver_id = driver_id
+        self.estimated_delivery_time = estimated_delivery_time
+        self.on_time = on_time
+        self.bonus = bonus
+        self.penalty = penalty
+        self.fuel_cost = fuel_cost
+        self.profit = profit
+
+
+class Plan:
+    __slots__ = ("strategy", "assigned_at", "assignments", "driver_assigned_orders", "kpis")
+
+    def __init__(self, strategy: str, assigned_at: datetime, assignments: List[PlannedAssignment],
+                 driver_assigned_orders: Dict[str, List[str]], kpis: dict):
+        self.strategy = strategy
+        self.assigned_at = assigned_at
+        self.assignments = assignments
+        self.driver_assigned_orders = driver_assigned_orders
+        self.kpis = kpis
+
+
+def resolve_assigned_at(route_start_time: Optional[str], now: Optional[datetime] = None) -> datetime:
+    assigned_at = now or datetime.now()
+    # Use route_start_time if provided
+    if route_start_time:
+        try:
+            start_time_obj = datetime.strptime(route_start_time, '%H:%M').time()
+            assigned_at = datetime.combine(assigned_at.date(), start_time_obj)
+        except ValueError:
+            print(f"Warning: Invalid route_start_time format: {route_start_time}")
+    return assigned_at
+
+
+def compute_kpis(components: dict) -> dict:
+    total_deliveries = len(components["profit"])
+    on_time_deliveries = int(components["on_time"].sum())
+    efficiency_score = (on_time_deliveries / total_deliveries) * 100 if total_deliveries > 0 else 0.0
+    return {
+        "total_profit": float(components["profit"].sum()),
+        "efficiency_score": efficiency_score,
+        "total_deliveries": total_deliveries,
+        "on_time_deliveries": on_time_deliveries,
+        "late_deliveries": total_deliveries - on_time_deliveries,
+        "total_fuel_cost": float(components["fuel_cost"].sum()),
+        "total_penalties": float(components["penalty"].sum()),
+        "total_bonuses": float(components["bonus"].sum())
+    }
+
+
+def solve(snapshot: FleetSnapshot, simulation_input: SimulationInput, assigned_at: Optional[datetime] = None,
+          progress: Optional[Callable[[int, int], None]] = None) -> Plan:
+    # progress(done, total) is called while walking the order list; it may raise to abort the solve
+    if assigned_at is None:
+        assigned_at = resolve_assigned_at(simulation_input.route_start_time)
+
+    drivers = snapshot.drivers
+    # Filter drivers based on num_available_drivers input
+    if simulation_input.num_available_drivers is not None:
+        drivers = drivers[:simulation_input.num_available_drivers]
+
+    # Sort orders by delivery time (earliest first) to prioritize
+    orders = sorted(snapshot.orders, key=lambda o: o.delivery_time)
+
+    matrix = CostMatrix(snapshot.routes, drivers)
+    route_idx = matrix.route_indices([order.route_id for order in orders])
+    for order in (o for o, r in zip(orders, route_idx) if r < 0):
+        print(f"Warning: Route {order.route_id} not found for order {order.order_id}")
+
+    order_values = np.array([order.value for order in orders], dtype=np.float64)
+    order_deadlines = np.array([order.delivery_time for order in orders], dtype="datetime64[us]")
+    max_hours = simulation_input.max_hours_per_driver_per_day
+
+    strategy = choose_strategy(simulation_input.strategy, matrix, len(orders), max_hours)
+    if strategy == "optimal":
+        driver_idx = assign_optimal(matrix, route_idx, order_values, order_deadlines, assigned_at, max_hours, progress)
+    else:
+        driver_idx = matrix.assign_greedy(route_idx, max_hours, progress)
+    assigned_mask = driver_idx >= 0
+    assigned_orders = [order for order, ok in zip(orders, assigned_mask) if ok]
+    assigned_driver_idx = driver_idx[assigned_mask]
+
+    # Both strategies share the same KPI evaluation
+    components = matrix.evaluate(
+        route_idx[assigned_mask],
+        assigned_driver_idx,
+        order_values[assigned_mask],
+        order_deadlines[assigned_mask],
+        assigned_at,
+    )
+
+    driver_assigned_orders = {driver.driver_id: [] for driver in drivers}
+    assignments = []
+    for order, d, estimated, on_time, bonus, penalty, fuel_cost, profit in zip(
+        assigned_orders,
+        assigned_driver_idx.tolist(),
+        components["estimated_delivery_time"].tolist(),
+        components["on_time"].tolist(),
+        components["bonus"].tolist(),
+        components["penalty"].tolist(),
+        components["fuel_cost"].tolist(),
+        components["profit"].tolist(),
+    ):
+        driver_id = matrix.driver_ids[d]
+        assignments.append(PlannedAssignment(order.order_id, driver_id, estimated, on_time, bonus, penalty, fuel_cost, profit))
+        driver_assigned_orders[driver_id].append(order.order_id)
+
+    if progress is not None:
+        progress(len(orders), len(orders))
+    return Plan(strategy, assigned_at, assignments, driver_assigned_orders, compute_kpis(components))
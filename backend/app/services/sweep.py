@@ -0,0 +1,87 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from app.schemas.optimization import SimulationInput, SweepGrid
+from app.services.solver import FleetSnapshot, resolve_assigned_at, solve
+
+# What-if sweeps: many SimulationInput variants solved against one read-only FleetSnapshot.
+# Nothing here touches the database, so the live plan is never modified.
+
+_worker_snapshot: Optional[FleetSnapshot] = None
+
+
+def _load_snapshot(snapshot: Union[FleetSnapshot, str]) -> FleetSnapshot:
+    # A path names a stored columnar snapshot (see app.services.fleet_store), which is mapped here
+    if isinstance(snapshot, str):
+        from app.services.fleet_store import ColumnarFleet
+        snapshot = ColumnarFleet.open(snapshot).to_snapshot()
+    return snapshot
+
+
+def _init_worker(snapshot: Union[FleetSnapshot, str]):
+    # Runs once per worker process: the snapshot is shipped once, not once per variant
+    global _worker_snapshot
+    _worker_snapshot = _load_snapshot(snapshot)
+
+
+def _solve(snapshot: FleetSnapshot, simulation_input: SimulationInput, now: datetime) -> Tuple[str, dict]:
+    plan = solve(snapshot, simulation_input, resolve_assigned_at(simulation_input.route_start_time, now))
+    return plan.strategy, plan.kpis
+
+
+def _solve_variant(args) -> Tuple[str, dict]:
+    simulation_input, now = args
+    return _solve(_worker_snapshot, simulation_input, now)
+
+
+def grid_size(grid: SweepGrid) -> int:
+    # Number of variants expand_grid returns, without building them
+    return len(grid.num_available_drivers) * len(grid.route_start_time) * len(grid.max_hours_per_driver_per_day) * len(grid.strategy)
+
+
+def expand_grid(grid: SweepGrid) -> List[SimulationInput]:
+    return [
+        SimulationInput(
+            num_available_drivers=num_available_drivers,
+            route_start_time=route_start_time,
+            max_hours_per_driver_per_day=max_hours,
+            strategy=strategy,
+        )
+        for num_available_drivers in grid.num_available_drivers
+        for route_start_time in grid.route_start_time
+        for max_hours in grid.max_hours_per_driver_per_day
+        for strategy in grid.strategy
+    ]
+
+
+def run_sweep(snapshot: Union[FleetSnapshot, str], variants: List[SimulationInput], max_workers: int = 1,
+              now: Optional[datetime] = None) -> List[Tuple[str, dict]]:
+    # Returns (strategy used, kpis) per variant, in input order
+    now = now or datetime.now() # Every variant plans the same day
+    workers = min(max_workers, len(variants))
+    if workers <= 1:
+        # In this process, which may run several sweeps at once: the snapshot stays local to this call
+        snapshot = _load_snapshot(snapshot)
+        return [_solve(snapshot, variant, now) for variant in variants]
+    # spawn, not fork: the API process runs threads (uvicorn, job workers) that must not be forked
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(snapshot,),
+    ) as executor:
+        return list(executor.map(_solve_variant, [(variant, now) for variant in variants]))
+
+
+def pareto_front(points: List[Tuple[float, float]]) -> List[int]:
+    # Indexes of points not dominated on (profit, efficiency), both maximised; best profit first
+    order = sorted(range(len(points)), key=lambda i: (-points[i][0], -points[i][1]))
+    front = []
+    best_efficiency = float("-inf")
+    for i in order:
+        if points[i][1] > best_efficiency:
+            front.append(i)
+            best_efficiency = points[i][1]
+    return front
@@ -0,0 +1,154 @@
+import asyncio
+from typing import Callable, List, Optional
+
+import anyio
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+# Group commit for high-rate single-row writes (PUT /orders/{id}, PUT /drivers/{id}). Handlers enqueue a
+# mutation, a synchronous CRUD write function such as crud_order.update_order, and one writer task applies
+# everything queued (up to max_batch items) in a single transaction: one commit and one fsync for the whole
+# batch instead of one per request, and no lock contention between writers. Mutations arriving while a batch
+# commits form the next one; max_delay_ms additionally holds each batch open, which only pays off where an
+# fsync costs more than the added latency. Each caller's future resolves with its own result or error; if
+# the commit itself fails, every caller of the batch gets that error. The writer is a task on the event
+# loop; each batch runs on a worker thread in a single hop.
+# Enabled with WRITE_COALESCING=true; otherwise handlers commit their own unit of work.
+
+_STOP = object()
+
+
+class _Mutation:
+    __slots__ = ("func", "args", "future")
+
+    def __init__(self, func: Callable, args: tuple, future: asyncio.Future):
+        self.func = func
+        self.args = args
+        self.future = future
+
+
+class WriteCoalescer:
+    def __init__(self, session_factory: Callable[..., Session], max_batch: int = 64, max_delay_ms: float = 0.0):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0 # Committed transactions, for tests and benchmarks
+        self.mutations = 0
+
+    async def apply(self, func: Callable, *args):
+        # func(db, *args) runs on the writer's Session; returns its result once the batch has committed
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait(_Mutation(func, args, future))
+        return await future
+
+    def _ensure_started(self):
+        # One writer per event loop (tests run several loops one after another)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def shutdown(self):
+        # Mutations queued before the call are still applied
+        task, self._task = self._task, None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        self._queue.put_nowait(_STOP)
+        await task
+
+    async def _run(self):
+        while True:
+            batch, stop = await self._collect()
+            if batch:
+                await self._apply_batch(batch)
+            if stop:
+                return
+
+    async def _collect(self):
+        # Waits for the first mutation, gives concurrent requests max_delay to join it, then takes
+        # whatever is queued up to max_batch
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        if self.max_delay > 0 and self._queue.qsize() < self.max_batch - 1:
+            await asyncio.sleep(self.max_delay)
+        batch = [first]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            mutation = self._queue.get_nowait()
+            if mutation is _STOP:
+                return batch, True
+            batch.append(mutation)
+        return batch, False
+
+    async def _apply_batch(self, batch: List[_Mutation]):
+        # Callers that gave up (cancelled requests) are skipped
+        batch = [mutation for mutation in batch if not mutation.future.done()]
+        if not batch:
+            return
+        try:
+            outcomes = await anyio.to_thread.run_sync(self._commit_batch, batch)
+        except Exception as exc:
+            for mutation in batch:
+                if not mutation.future.done():
+                    mutation.future.set_exception(exc)
+            return
+        self.batches += 1
+        self.mutations += len(batch)
+        for mutation, (result, error) in zip(batch, outcomes):
+            if mutation.future.done():
+                continue
+            if error is None:
+                mutation.future.set_result(result)
+            else:
+                mutation.future.set_exception(error)
+
+    def _commit_batch(self, batch: List[_Mutation]) -> list:
+        # The whole batch in one hop to a worker thread, instead of one per statement on an AsyncSession.
+        # Results are read after the session closes, so they must not expire on commit.
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            outcomes = self._apply_mutations(db, batch)
+            db.commit()
+            return outcomes
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _apply_mutations(self, db: Session, batch: List[_Mutation]) -> list:
+        # [(result, error)] per mutation. The batch first runs without savepoints, since almost every
+        # mutation succeeds; after a failure it is rolled back and re-applied with one savepoint each.
+        try:
+            self._begin(db)
+            return [(mutation.func(db, *mutation.args), None) for mutation in batch]
+        except Exception:
+            db.rollback()
+        self._begin(db)
+        outcomes = []
+        for mutation in batch:
+            savepoint = db.begin_nested()
+            try:
+                result = mutation.func(db, *mutation.args)
+                savepoint.commit()
+                outcomes.append((result, None))
+            except Exception as exc:
+                savepoint.rollback()
+                outcomes.append((None, exc))
+        return outcomes
+
+    def _begin(self, db: Session):
+        if db.get_bind().dialect.name == "sqlite":
+            # The SQLite driver only opens a transaction at the first DML, and releasing a savepoint
+            # outside one would commit it on its own. IMMEDIATE also takes the write lock up front.
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+
+
+write_coalescer = WriteCoalescer(SessionLocal, settings.write_coalesce_max_batch, settings.write_coalesce_max_delay_ms)
@@ -0,0 +1,74 @@
+# Times greedy order assignment on a synthetic fleet.
+# Usage (from backend/): python -m benchmarks.bench_assignment --orders 50000 --drivers 5000
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.cost_matrix import CostMatrix
+
+
+def synthetic_fleet(num_orders, num_drivers, num_routes, seed=0):
+    rng = random.Random(seed)
+    drivers = [
+        SimpleNamespace(driver_id=str(i), shift_hours_today=rng.uniform(0, 10), hours_worked_past_week=rng.uniform(20, 70))
+        for i in range(num_drivers)
+    ]
+    routes = [
+        SimpleNamespace(route_id=str(i), distance_km=rng.uniform(2, 30), traffic_level=rng.choice(["Low", "Medium", "High"]),
+                        base_time_minutes=rng.randint(10, 120))
+        for i in range(num_routes)
+    ]
+    start = datetime(2025, 8, 12, 8, 0)
+    orders = sorted(
+        (SimpleNamespace(order_id=str(i), route_id=str(rng.randrange(num_routes)),
+                         delivery_time=start + timedelta(minutes=rng.randint(0, 720)))
+         for i in range(num_orders)),
+        key=lambda o: o.delivery_time,
+    )
+    return drivers, routes, orders
+
+
+def linear_scan(matrix, route_idx, max_hours):
+    # Previous O(orders * drivers) selection, kept here for comparison
+    workload = np.zeros(len(matrix.driver_ids))
+    for r in route_idx:
+        potential = workload + matrix.eta_minutes_by_class[r, matrix.driver_class]
+        score = matrix.base_score + potential
+        if max_hours is not None:
+            score[(matrix.shift_hours + potential / 60) > max_hours] = np.inf
+        best = int(np.argmin(score))
+        if score[best] != np.inf:
+            workload[best] = potential[best]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--drivers", type=int, default=5000)
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--max-hours", type=float, default=None)
+    parser.add_argument("--skip-linear", action="store_true")
+    args = parser.parse_args()
+
+    drivers, routes, orders = synthetic_fleet(args.orders, args.drivers, args.routes)
+    started = time.perf_counter()
+    matrix = CostMatrix(routes, drivers)
+    route_idx = matrix.route_indices([o.route_id for o in orders])
+    print(f"cost matrix:  {time.perf_counter() - started:.3f}s")
+
+    started = time.perf_counter()
+    assigned = matrix.assign_greedy(route_idx, args.max_hours)
+    print(f"heap greedy:  {time.perf_counter() - started:.3f}s ({int((assigned >= 0).sum())} assigned)")
+
+    if not args.skip_linear:
+        started = time.perf_counter()
+        linear_scan(matrix, route_idx, args.max_hours)
+        print(f"linear scan:  {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Concurrent GET /orders throughput: the async stack (AsyncSession, async def handler) against the
+# previous synchronous one (Session, def handler on Starlette's threadpool). Each stack is served by its
+# own uvicorn process over the same seeded SQLite file and driven by many concurrent clients.
+# Usage (from backend/): python -m benchmarks.bench_async_reads --requests 5000 --concurrency 64 128
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.api import orders
+from app.core.database import Base, get_read_db, make_engine
+from app.crud import order as crud_order
+from app.models.order import Order as OrderModel
+from app.schemas.order import Order
+import app.models.assignment, app.models.driver, app.models.route, app.models.simulation_run, app.models.user # Register all tables
+from benchmarks.bench_startup import free_port, wait_for
+
+REQUEST_TIMEOUT = 10.0
+
+# Served apps, without authentication: uvicorn imports them from this module
+async_app = FastAPI()
+async_app.include_router(orders.router)
+async_app.get("/healthz")(lambda: {"status": "ok"})
+
+sync_app = FastAPI()
+sync_app.get("/healthz")(lambda: {"status": "ok"})
+
+@sync_app.get("/orders", response_model=List[Order])
+def read_orders_sync(limit: int = 100, db: Session = Depends(get_read_db)):
+    return crud_order.get_orders(db, limit=limit)
+
+
+def seed(url, num_orders):
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2025, 8, 12, 8, 0)
+    with engine.begin() as connection:
+        connection.execute(insert(OrderModel), [
+            {"order_id": f"order{i}", "value": 100.0 + i % 500, "route_id": f"route{i % 100}",
+             "delivery_time": start + timedelta(minutes=i % 720)}
+            for i in range(num_orders)
+        ])
+    engine.dispose()
+
+
+async def load(base_url, num_requests, concurrency, limit, budget):
+    # Stops after budget seconds: a stack whose threadpool deadlocks would otherwise never finish
+    latencies, errors = [], 0
+    remaining = iter(range(num_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    stop_at = time.perf_counter() + budget
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                if time.perf_counter() > stop_at:
+                    break
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/orders", params={"limit": limit})
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    # e.g. the sync stack's connection pool timing out once every threadpool slot waits on it
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies, errors
+
+
+def measure(app_name, url, num_requests, concurrency, limit, budget):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=url, SECRET_KEY=os.environ.get("SECRET_KEY", "bench"))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"benchmarks.bench_async_reads:{app_name}", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(f"http://127.0.0.1:{port}/healthz", process, 30)
+        base_url = f"http://127.0.0.1:{port}"
+        asyncio.run(load(base_url, min(200, num_requests), concurrency, limit, budget)) # Warm up pools and caches
+        return asyncio.run(load(base_url, num_requests, concurrency, limit, budget))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill() # A deadlocked threadpool does not finish shutting down
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64, 128])
+    parser.add_argument("--limit", type=int, default=20, help="orders per response")
+    parser.add_argument("--budget", type=float, default=60.0, help="seconds per stack and concurrency level")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.orders)
+        for concurrency in args.concurrency:
+            for label, app_name in (("sync ", "sync_app"), ("async", "async_app")):
+                throughput, latencies, errors = measure(app_name, url, args.requests, concurrency, args.limit, args.budget)
+                latencies.sort()
+                print(
+                    f"{label} concurrency {concurrency:>4}: {throughput:8.1f} req/s  "
+                    f"p50 {statistics.median(latencies) * 1000 if latencies else float('nan'):7.2f}ms  "
+                    f"p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else float('nan'):7.2f}ms  "
+                    f"errors {errors}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Read latency while a large plan is committed, per SQLite journal mode. A writer thread keeps replacing
+# the assignments table (as POST /assign_orders does) while the main thread runs GET /orders-sized reads
+# through a read-only engine. With journal_mode=delete readers wait for each commit; with WAL they do not.
+# Usage (from backend/): python -m benchmarks.bench_sqlite_reads --orders 50000 --seconds 5
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, make_engine
+from app.crud import assignment as crud_assignment
+from app.crud import order as crud_order
+from app.models.driver import Driver
+from app.models.order import Order
+import app.models.assignment, app.models.route, app.models.simulation_run, app.models.user # Register all tables
+
+
+def seed(session, num_orders, num_drivers):
+    start = datetime(2025, 8, 12, 8, 0)
+    session.execute(insert(Driver), [
+        {"driver_id": f"driver{i}", "name": f"Driver {i}", "shift_hours_today": 4.0, "hours_worked_past_week": 30.0}
+        for i in range(num_drivers)
+    ])
+    session.execute(insert(Order), [
+        {"order_id": f"order{i}", "value": 100.0 + i % 500, "route_id": f"route{i % 100}",
+         "delivery_time": start + timedelta(minutes=i % 720)}
+        for i in range(num_orders)
+    ])
+    session.commit()
+
+
+def plan(num_orders, num_drivers, generation):
+    now = datetime(2025, 8, 12, 8, 0)
+    return [
+        {"order_id": f"order{i}", "driver_id": f"driver{(i + generation) % num_drivers}",
+         "estimated_delivery_time": now + timedelta(minutes=i % 720), "assigned_at": now, "simulation_run_id": None}
+        for i in range(num_orders)
+    ]
+
+
+def measure(journal_mode, num_orders, num_drivers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        writer = make_engine(url, journal_mode=journal_mode)
+        reader = make_engine(url, read_only=True, journal_mode=journal_mode)
+        Base.metadata.create_all(bind=writer)
+        WriteSession = sessionmaker(bind=writer)
+        ReadSession = sessionmaker(bind=reader)
+        with WriteSession() as session:
+            seed(session, num_orders, num_drivers)
+
+        stop = threading.Event()
+        commits = []
+
+        def write_plans():
+            generation = 0
+            while not stop.is_set():
+                generation += 1
+                rows = plan(num_orders, num_drivers, generation)
+                with WriteSession() as session:
+                    started = time.perf_counter()
+                    crud_assignment.bulk_replace_assignments(session, rows)
+                    session.commit()
+                    commits.append(time.perf_counter() - started)
+
+        thread = threading.Thread(target=write_plans)
+        thread.start()
+        latencies, errors = [], 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with ReadSession() as session:
+                    crud_order.get_orders(session, skip=0, limit=100)
+            except OperationalError:
+                errors += 1 # "database is locked" after busy_timeout
+                continue
+            latencies.append(time.perf_counter() - started)
+        stop.set()
+        thread.join()
+        writer.dispose()
+        reader.dispose()
+    return latencies, errors, commits
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--drivers", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for journal_mode in ("delete", "wal"):
+        latencies, errors, commits = measure(journal_mode, args.orders, args.drivers, args.seconds)
+        print(
+            f"journal_mode={journal_mode:<6} reads {len(latencies):>6}  "
+            f"p50 {percentile(latencies, 0.5) * 1000:7.2f}ms  p99 {percentile(latencies, 0.99) * 1000:7.2f}ms  "
+            f"max {max(latencies, default=float('nan')) * 1000:7.2f}ms  locked {errors}  "
+            f"plan commits {len(commits)} (median {statistics.median(commits) if commits else float('nan'):.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Measures cold start: process launch -> accepting connections (/healthz) -> initial data loaded (/readyz).
+# Each run starts uvicorn on a fresh SQLite file, so the seed CSVs are loaded from scratch.
+# Usage (from backend/): python -m benchmarks.bench_startup --runs 5
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+POLL_INTERVAL = 0.01
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, process, timeout):
+    # Seconds until url answers 200; 503s and refused connections are retried
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def measure(timeout):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}", SECRET_KEY=os.environ.get("SECRET_KEY", "bench"))
+        started = time.monotonic()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(f"http://127.0.0.1:{port}/healthz", process, timeout)
+            serving = time.monotonic() - started
+            wait_for(f"http://127.0.0.1:{port}/readyz", process, timeout)
+            ready = time.monotonic() - started
+        finally:
+            process.terminate()
+            process.wait()
+    return serving, ready
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    serving, ready = zip(*(measure(args.timeout) for _ in range(args.runs)))
+    print(f"accepting connections: median {statistics.median(serving):.3f}s  max {max(serving):.3f}s")
+    print(f"data ready:            median {statistics.median(ready):.3f}s  max {max(ready):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Concurrent single-row writes (PUT /orders/{id} and PUT /drivers/{id}, alternating) with one commit per
+# request against group commits through the write coalescer (WRITE_COALESCING=true). Each mode is served by
+# its own uvicorn process over a freshly seeded SQLite file.
+# Usage (from backend/): python -m benchmarks.bench_write_coalescing --requests 3000 --concurrency 16 64 --synchronous full
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import insert
+
+from app.api import drivers, orders
+from app.core.database import Base, make_engine
+from app.models.driver import Driver as DriverModel
+from app.models.order import Order as OrderModel
+import app.models.assignment, app.models.fleet_version, app.models.route, app.models.simulation_run, app.models.user # Register all tables
+from benchmarks.bench_startup import free_port, wait_for
+
+REQUEST_TIMEOUT = 30.0
+
+# Served app, without authentication: uvicorn imports it from this module
+app = FastAPI()
+app.include_router(drivers.router)
+app.include_router(orders.router)
+app.get("/healthz")(lambda: {"status": "ok"})
+
+
+def seed(url, num_drivers, num_orders):
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2025, 8, 12, 8, 0)
+    with engine.begin() as connection:
+        connection.execute(insert(DriverModel), [
+            {"driver_id": f"driver{i}", "name": f"Driver {i}", "shift_hours_today": 4.0, "hours_worked_past_week": 30.0}
+            for i in range(num_drivers)
+        ])
+        connection.execute(insert(OrderModel), [
+            {"order_id": f"order{i}", "value": 100.0 + i % 500, "route_id": f"route{i % 100}",
+             "delivery_time": start + timedelta(minutes=i % 720)}
+            for i in range(num_orders)
+        ])
+    engine.dispose()
+
+
+async def load(base_url, num_requests, concurrency, num_drivers, num_orders):
+    latencies, errors = [], 0
+    remaining = iter(range(num_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    rng = random.Random(0)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        async def worker():
+            nonlocal errors
+            for i in remaining:
+                # assigned_driver_id is not a plan field, so order updates do not trigger re-plans
+                if i % 2:
+                    request = client.put(f"/orders/order{rng.randrange(num_orders)}",
+                                         json={"assigned_driver_id": f"driver{rng.randrange(num_drivers)}"})
+                else:
+                    request = client.put(f"/drivers/driver{rng.randrange(num_drivers)}",
+                                         json={"shift_hours_today": rng.uniform(0.0, 8.0)})
+                started = time.perf_counter()
+                try:
+                    response = await request
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies, errors
+
+
+def measure(coalescing, args, concurrency):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.drivers, args.orders)
+        port = free_port()
+        env = dict(
+            os.environ, DATABASE_URL=url, SECRET_KEY=os.environ.get("SECRET_KEY", "bench"),
+            SQLITE_SYNCHRONOUS=args.synchronous, WRITE_COALESCING=str(coalescing).lower(),
+            WRITE_COALESCE_MAX_BATCH=str(args.max_batch), WRITE_COALESCE_MAX_DELAY_MS=str(args.max_delay_ms),
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.bench_write_coalescing:app", "--port", str(port), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(f"http://127.0.0.1:{port}/healthz", process, 30)
+            base_url = f"http://127.0.0.1:{port}"
+            asyncio.run(load(base_url, min(200, args.requests), concurrency, args.drivers, args.orders)) # Warm up
+            return asyncio.run(load(base_url, args.requests, concurrency, args.drivers, args.orders))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--synchronous", default="full", help="SQLite synchronous level; full fsyncs every commit")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        for label, coalescing in (("per-request", False), ("coalesced  ", True)):
+            throughput, latencies, errors = measure(coalescing, args, concurrency)
+            latencies.sort()
+            print(
+                f"{label} concurrency {concurrency:>4}: {throughput:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000 if latencies else float('nan'):7.2f}ms  "
+                f"p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else float('nan'):7.2f}ms  "
+                f"errors {errors}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+import asyncio
 import os
 from dotenv import load_dotenv
-from app.core.database import Base, engine, SessionLocal # New import
+from app.core.database import Base, engine, SessionLocal, dispose_async_engines # New import
 import pytest
 
 # Load environment variables from .env.example for testing
@@ -12,11 +13,16 @@ def setup_database():
     import app.models.driver
     import app.models.order
     import app.models.route
+    import app.models.route_cost
     import app.models.assignment
     import app.models.user
     import app.models.simulation_run
+    import app.models.data_manifest
+    import app.models.fleet_version
     Base.metadata.create_all(bind=engine)
     yield
+    # Close pooled async connections first: each holds a worker thread and a handle on the file
+    asyncio.run(dispose_async_engines())
     Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
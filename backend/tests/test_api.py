@@ -1,4 +1,5 @@
 import pytest
+import time
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -6,7 +7,7 @@ from fastapi import Depends # Import Depends
 from fastapi import FastAPI # Import FastAPI
 
 from app.main import app as main_app # Rename app to main_app to avoid conflict
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 
 # Import necessary schemas and crud operations
 from app.crud import driver as crud_driver
@@ -21,7 +22,7 @@ from app.core.security import Hasher, get_current_user
 from datetime import datetime, timedelta
 
 # Import API routers
-from app.api import auth, drivers, orders, optimization, routes, simulation_history
+from app.api import auth, drivers, orders, optimization, routes, simulation_history, jobs, imports
 
 # Create a new FastAPI app instance for testing
 test_app = FastAPI()
@@ -33,6 +34,8 @@ test_app.include_router(orders.router, prefix="/orders", dependencies=[Depends(g
 test_app.include_router(routes.router, prefix="/routes", dependencies=[Depends(get_current_user)])
 test_app.include_router(optimization.router, prefix="/optimization", dependencies=[Depends(get_current_user)])
 test_app.include_router(simulation_history.router, prefix="/simulation_history", dependencies=[Depends(get_current_user)])
+test_app.include_router(jobs.router, dependencies=[Depends(get_current_user)])
+test_app.include_router(imports.router, dependencies=[Depends(get_current_user)])
 
 
 # Use an in-memory SQLite database for testing
@@ -48,9 +51,11 @@ def client(db_session_function):
     def override_get_db():
         try:
             yield db_session_function
+            db_session_function.commit() # get_db commits the request's unit of work
         finally:
             db_session_function.close()
     test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_read_db] = override_get_db
 
     # Mock get_current_user to return a dummy user for testing authenticated routes
     def override_get_current_user():
@@ -177,4 +182,88 @@ def test_get_optimized_schedule_api(client, setup_data_for_api, test_user_and_to
     assert response.status_code == 200
     assert "schedule" in response.json()
     assert "kpis" in response.json()
-    assert len(response.json()["schedule"]) > 0
\ No newline at end of file
+    assert len(response.json()["schedule"]) > 0
+
+
+def test_simulation_sweep_api(client, setup_data_for_api, test_user_and_token):
+    _, token = test_user_and_token
+    response = client.post(
+        "/optimization/simulations/sweep",
+        json={
+            "variants": [{"num_available_drivers": 1}],
+            "grid": {"num_available_drivers": [1, 2], "max_hours_per_driver_per_day": [8.0, 12.0]},
+            "record_runs": True,
+            "max_workers": 2
+        },
+        headers={
+            "Authorization": f"Bearer {token}"
+        }
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["results"]) == 5
+    assert all(result["simulation_run_id"] is not None for result in body["results"])
+    assert body["pareto_front"]
+    assert all(body["results"][i]["pareto_optimal"] for i in body["pareto_front"])
+
+
+def test_simulation_sweep_api_rejects_invalid_grids(client, test_user_and_token):
+    _, token = test_user_and_token
+    headers = {"Authorization": f"Bearer {token}"}
+    for grid in ({"route_start_time": ["99:99"]}, {"num_available_drivers": [0]}, {"max_hours_per_driver_per_day": [-1.0]}):
+        response = client.post("/optimization/simulations/sweep", json={"grid": grid}, headers=headers)
+        assert response.status_code == 422
+    # Refused from the grid's size alone
+    grid = {"num_available_drivers": list(range(1, 1001)), "max_hours_per_driver_per_day": [float(h) for h in range(1000)]}
+    response = client.post("/optimization/simulations/sweep", json={"grid": grid}, headers=headers)
+    assert response.status_code == 400
+
+
+def wait_for_job(client, job_id, headers, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            break
+        time.sleep(0.05)
+    return job
+
+
+def test_assign_orders_job_api(client, setup_data_for_api, test_user_and_token):
+    _, token = test_user_and_token
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.post(
+        "/jobs/assign_orders",
+        json={
+            "num_available_drivers": 2,
+            "route_start_time": "09:00",
+            "max_hours_per_driver_per_day": 8.0
+        },
+        headers=headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    job = wait_for_job(client, job_id, headers)
+    assert job["status"] == "succeeded", job["error"]
+    assert job["progress"] == 100.0
+    assert "Orders assigned successfully" in job["result"]["message"]
+    assert job["result"]["kpis"]["total_deliveries"] >= 1
+
+    assert client.get("/jobs/missing", headers=headers).status_code == 404
+
+
+def test_import_orders_api(client, test_user_and_token):
+    _, token = test_user_and_token
+    headers = {"Authorization": f"Bearer {token}"}
+    csv = "order_id,value_rs,route_id,delivery_time\nIMP1,100,R1,10:00\nIMP2,abc,R1,10:00\n"
+    response = client.post("/imports/orders", files={"file": ("orders.csv", csv, "text/csv")}, headers=headers)
+    assert response.status_code == 202
+
+    job = wait_for_job(client, response.json()["id"], headers)
+    assert job["status"] == "succeeded", job["error"]
+    assert job["detail"] == {"rows_read": 2, "rows_written": 1, "rows_rejected": 1}
+    assert job["result"]["errors"][0]["row"] == 2
+
+    assert client.post("/imports/orders", headers=headers).status_code == 400
+    assert client.post("/imports/orders", params={"path": "../../etc/passwd"}, headers=headers).status_code == 400
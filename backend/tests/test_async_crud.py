@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from app.core.database import AsyncReadSessionLocal, AsyncSessionLocal
+from app.core.offload import run_cpu_bound
+from app.crud import driver as crud_driver
+from app.crud import fleet_version as crud_fleet_version
+from app.crud import order as crud_order
+from app.schemas.driver import DriverCreate
+
+def test_async_driver_crud(db_session_function):
+    stamp = crud_fleet_version.get_fleet_stamp(db_session_function)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            created = await crud_driver.create_driver_async(db, DriverCreate(
+                driver_id="ASYNC-D1", name="Async", shift_hours_today=3.0, hours_worked_past_week=30.0,
+            ))
+            updated = await crud_driver.update_driver_async(db, "ASYNC-D1", {"shift_hours_today": 5.5})
+            await db.commit()
+        async with AsyncReadSessionLocal() as db:
+            fetched = await crud_driver.get_driver_async(db, "ASYNC-D1")
+            listed = await crud_driver.get_drivers_async(db, limit=1000, after=created.id - 1)
+        async with AsyncSessionLocal() as db:
+            deleted = await crud_driver.delete_driver_async(db, "ASYNC-D1")
+            missing = await crud_driver.get_driver_async(db, "ASYNC-D1")
+            await db.commit()
+        return created, updated, fetched, listed, deleted, missing
+
+    created, updated, fetched, listed, deleted, missing = asyncio.run(scenario())
+    assert created.driver_id == "ASYNC-D1"
+    assert updated.shift_hours_today == 5.5
+    assert fetched.shift_hours_today == 5.5
+    assert listed[0].driver_id == "ASYNC-D1"
+    assert deleted is True
+    assert missing is None
+    # Writes through run_sync still bump the fleet version
+    db_session_function.expire_all()
+    assert crud_fleet_version.get_fleet_stamp(db_session_function) != stamp
+
+def test_async_and_sync_order_queries_match(db_session_function):
+    async def read():
+        async with AsyncReadSessionLocal() as db:
+            return await crud_order.get_orders_async(db, limit=50, unassigned=True)
+
+    expected = [order.order_id for order in crud_order.get_orders(db_session_function, limit=50, unassigned=True)]
+    assert [order.order_id for order in asyncio.run(read())] == expected
+
+def test_run_cpu_bound_leaves_the_event_loop():
+    async def idents():
+        return threading.get_ident(), await run_cpu_bound(threading.get_ident)
+
+    loop_thread, worker_thread = asyncio.run(idents())
+    assert loop_thread != worker_thread
@@ -7,7 +7,7 @@ from fastapi import Depends, HTTPException # Import Depends and HTTPException
 from fastapi import FastAPI # Import FastAPI
 
 from app.main import app as main_app # Rename app to main_app to avoid conflict
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 
 from app.crud.user import create_user
 from app.schemas.user import UserCreate
@@ -42,9 +42,11 @@ def client(db_session_function):
     def override_get_db():
         try:
             yield db_session_function
+            db_session_function.commit() # get_db commits the request's unit of work
         finally:
             db_session_function.close()
     test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_read_db] = override_get_db
 
     # Mock get_current_user to return a dummy user for testing authenticated routes
     def override_get_current_user():
@@ -60,9 +62,11 @@ def client_unauthenticated(db_session_function):
     def override_get_db():
         try:
             yield db_session_function
+            db_session_function.commit() # get_db commits the request's unit of work
         finally:
             db_session_function.close()
     test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_read_db] = override_get_db
 
     # Override get_current_user to simulate unauthenticated access
     def override_get_current_user_unauthenticated():
@@ -0,0 +1,60 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import drivers, routes
+from app.crud import driver as crud_driver
+from app.crud import fleet_version as crud_fleet_version
+from app.crud import route as crud_route
+from app.crud import route_cost as crud_route_cost
+from app.schemas.driver import DriverCreate
+from app.schemas.route import RouteCreate
+
+test_app = FastAPI()
+test_app.include_router(drivers.router)
+test_app.include_router(routes.router)
+
+@pytest.fixture
+def client(db_session_function):
+    db = db_session_function
+    for driver_id in ("BATCH-D1", "BATCH-D2"):
+        crud_driver.create_or_update_driver(db, DriverCreate(driver_id=driver_id, name=driver_id, shift_hours_today=2.0, hours_worked_past_week=20.0))
+    for route_id in ("BATCH-R1", "BATCH-R2"):
+        crud_route.create_or_update_route(db, RouteCreate(route_id=route_id, distance_km=10.0, traffic_level="Low", base_time_minutes=15))
+    db.commit()
+    yield TestClient(test_app)
+    crud_driver.batch_update_drivers(db, [], [d for d in ("BATCH-D1", "BATCH-D2") if crud_driver.get_driver(db, d)])
+    crud_route.batch_update_routes(db, [], [r for r in ("BATCH-R1", "BATCH-R2") if crud_route.get_route(db, r)])
+    db.commit()
+
+def test_patch_drivers(client, db_session_function):
+    stamp = crud_fleet_version.get_fleet_stamp(db_session_function)
+    response = client.patch("/drivers", json={
+        "updates": [{"driver_id": "BATCH-D1", "shift_hours_today": 7.5}],
+        "deletes": ["BATCH-D2"],
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        "updated": 1,
+        "deleted": 1,
+        "items": [{"id": "BATCH-D1", "status": "updated"}, {"id": "BATCH-D2", "status": "deleted"}],
+    }
+    db_session_function.expire_all()
+    assert crud_driver.get_driver(db_session_function, "BATCH-D1").shift_hours_today == 7.5
+    assert crud_driver.get_driver(db_session_function, "BATCH-D2") is None
+    assert crud_fleet_version.get_fleet_stamp(db_session_function) != stamp
+
+def test_patch_routes_is_all_or_nothing(client, db_session_function):
+    response = client.patch("/routes", json={
+        "updates": [{"route_id": "BATCH-R1", "traffic_level": "High"}, {"route_id": "BATCH-R9", "distance_km": 1.0}],
+        "deletes": ["BATCH-R2"],
+    })
+    assert response.status_code == 404
+    assert [item["status"] for item in response.json()["detail"]["items"]] == ["updated", "not_found", "deleted"]
+    db_session_function.expire_all()
+    assert crud_route.get_route(db_session_function, "BATCH-R1").traffic_level == "Low"
+    assert crud_route.get_route(db_session_function, "BATCH-R2") is not None
+
+    response = client.patch("/routes", json={"updates": [{"route_id": "BATCH-R1", "traffic_level": "High"}]})
+    assert response.status_code == 200
+    assert crud_route_cost.get_route_cost(db_session_function, "BATCH-R1").fuel_cost == 70.0
@@ -0,0 +1,114 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.cost_matrix import CostMatrix
+from app.services.optimizer import Optimizer
+
+
+def make_fleet(seed, num_drivers=25, num_routes=12):
+    rng = random.Random(seed)
+    drivers = [
+        SimpleNamespace(
+            driver_id=f"D{i}",
+            shift_hours_today=float(rng.randint(0, 11)),
+            hours_worked_past_week=float(rng.randint(20, 70)),
+        )
+        for i in range(num_drivers)
+    ]
+    routes = [
+        SimpleNamespace(
+            route_id=f"R{i}",
+            distance_km=float(rng.randint(2, 30)),
+            traffic_level=rng.choice(["Low", "medium", "HIGH", "unknown"]),
+            base_time_minutes=rng.randint(10, 120),
+        )
+        for i in range(num_routes)
+    ]
+    return drivers, routes
+
+
+def reference_assign(optimizer, orders, routes, drivers, max_hours):
+    # The original per-pair linear scan
+    routes_by_id = {r.route_id: r for r in routes}
+    workloads = {d.driver_id: 0.0 for d in drivers}
+    chosen = []
+    for order in orders:
+        route = routes_by_id.get(order.route_id)
+        best_driver, min_score = None, float("inf")
+        if route:
+            for driver in drivers:
+                potential = workloads[driver.driver_id] + optimizer._calculate_estimated_delivery_time(route, driver).total_seconds() / 60
+                if max_hours is not None and driver.shift_hours_today + potential / 60 > max_hours:
+                    continue
+                score = optimizer._score_driver(driver, potential)
+                if score < min_score:
+                    min_score, best_driver = score, driver
+        if best_driver:
+            workloads[best_driver.driver_id] += optimizer._calculate_estimated_delivery_time(route, best_driver).total_seconds() / 60
+        chosen.append(best_driver.driver_id if best_driver else None)
+    return chosen
+
+
+def test_matrix_matches_scalar_rules():
+    drivers, routes = make_fleet(1)
+    optimizer = Optimizer(db=None)
+    matrix = CostMatrix(routes, drivers)
+    for r, route in enumerate(routes):
+        assert matrix.fuel_cost[r] == optimizer._calculate_fuel_cost(route)
+        for d, driver in enumerate(drivers):
+            expected = optimizer._calculate_estimated_delivery_time(route, driver).total_seconds() / 60
+            assert matrix.eta_minutes[r, d] == expected
+
+
+@pytest.mark.parametrize("seed,max_hours", [(2, None), (3, 10.0), (4, 12.0), (5, 0.5)])
+def test_assign_greedy_matches_linear_scan(seed, max_hours):
+    drivers, routes = make_fleet(seed)
+    rng = random.Random(seed)
+    now = datetime(2025, 8, 12, 9, 0)
+    orders = sorted(
+        (
+            SimpleNamespace(
+                order_id=f"O{i}",
+                value=float(rng.randint(100, 3000)),
+                route_id=rng.choice([r.route_id for r in routes] + ["missing"]),
+                delivery_time=now + timedelta(minutes=rng.randint(0, 600)),
+            )
+            for i in range(300)
+        ),
+        key=lambda o: o.delivery_time,
+    )
+
+    optimizer = Optimizer(db=None)
+    matrix = CostMatrix(routes, drivers)
+    driver_idx = matrix.assign_greedy(matrix.route_indices([o.route_id for o in orders]), max_hours)
+    got = [matrix.driver_ids[d] if d >= 0 else None for d in driver_idx]
+    assert got == reference_assign(optimizer, orders, routes, drivers, max_hours)
+
+
+def test_evaluate_matches_order_profit():
+    drivers, routes = make_fleet(6)
+    optimizer = Optimizer(db=None)
+    matrix = CostMatrix(routes, drivers)
+    assigned_at = datetime(2025, 8, 12, 9, 0)
+    orders = [
+        SimpleNamespace(order_id="O1", value=1500.0, route_id="R0", delivery_time=assigned_at + timedelta(hours=5)),
+        SimpleNamespace(order_id="O2", value=500.0, route_id="R1", delivery_time=assigned_at),
+        SimpleNamespace(order_id="O3", value=1200.0, route_id="R2", delivery_time=assigned_at + timedelta(minutes=45)),
+    ]
+    route_idx = matrix.route_indices([o.route_id for o in orders])
+    driver_idx = np.array([0, 1, 2])
+    components = matrix.evaluate(
+        route_idx, driver_idx,
+        np.array([o.value for o in orders]),
+        np.array([o.delivery_time for o in orders], dtype="datetime64[us]"),
+        assigned_at,
+    )
+    for k, order in enumerate(orders):
+        route, driver = routes[route_idx[k]], drivers[driver_idx[k]]
+        estimated = assigned_at + optimizer._calculate_estimated_delivery_time(route, driver)
+        assert components["estimated_delivery_time"][k].item() == estimated
+        assert components["profit"][k] == optimizer._calculate_order_profit(order, route, estimated)
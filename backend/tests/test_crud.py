@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 
@@ -12,6 +12,7 @@ from app.crud import driver as crud_driver
 from app.crud import order as crud_order
 from app.crud import route as crud_route
 from app.crud import assignment as crud_assignment
+from app.crud import route_cost as crud_route_cost
 from app.schemas.driver import DriverCreate
 from app.schemas.order import OrderCreate
 from app.schemas.route import RouteCreate
@@ -110,3 +111,88 @@ def test_delete_all_assignments(db_session):
 
     crud_assignment.delete_all_assignments(db_session)
     assert len(crud_assignment.get_assignments(db_session)) == 0
+
+def test_route_costs_follow_route_crud(db_session):
+    crud_route.create_route(db_session, RouteCreate(route_id="R1", distance_km=10.0, traffic_level="Low", base_time_minutes=15))
+    cost = crud_route_cost.get_route_cost(db_session, "R1")
+    assert cost.traffic_level == "low"
+    assert cost.fuel_cost == 50.0
+    assert cost.eta_minutes == pytest.approx(36.5)
+    assert cost.fatigued_eta_minutes == pytest.approx(36.5 * 1.3)
+
+    crud_route.update_route(db_session, "R1", {"traffic_level": "HIGH"})
+    db_session.refresh(cost)
+    assert cost.traffic_level == "high"
+    assert cost.fuel_cost == 70.0
+
+    crud_route.create_or_update_route(db_session, RouteCreate(route_id="R1", distance_km=20.0, traffic_level="jam", base_time_minutes=15))
+    db_session.refresh(cost)
+    assert cost.traffic_level == "unknown"
+    assert cost.fuel_cost == 100.0
+
+    crud_route.delete_route(db_session, "R1")
+    assert crud_route_cost.get_route_cost(db_session, "R1") is None
+
+def test_rebuild_route_costs(db_session):
+    db_session.add_all([
+        Route(route_id="R1", distance_km=10.0, traffic_level="low", base_time_minutes=15),
+        Route(route_id="R2", distance_km=5.0, traffic_level="high", base_time_minutes=10),
+    ])
+    db_session.commit()
+    # Rows written behind the CRUD layer's back are still costed on read
+    assert [record.fuel_cost for record in crud_route_cost.get_route_cost_records(db_session)] == [50.0, 35.0]
+
+    assert crud_route_cost.rebuild_route_costs(db_session) == 2
+    db_session.commit()
+    assert crud_route_cost.get_route_cost(db_session, "R2").fuel_cost == 35.0
+
+def test_batch_update_drivers_is_all_or_nothing(db_session):
+    for driver_id in ("D1", "D2", "D3"):
+        crud_driver.create_driver(db_session, DriverCreate(driver_id=driver_id, name=driver_id, shift_hours_today=1.0, hours_worked_past_week=10.0))
+    items = crud_driver.batch_update_drivers(db_session, [
+        {"driver_id": "D1", "shift_hours_today": 5.0},
+        {"driver_id": "D2", "shift_hours_today": 6.0},
+        {"driver_id": "D2", "name": "Second"},
+    ], ["D3", "D9"])
+    assert [item["status"] for item in items] == ["updated", "updated", "duplicate", "deleted", "not_found"]
+    db_session.commit()
+    assert crud_driver.get_driver(db_session, "D1").shift_hours_today == 1.0
+    assert crud_driver.get_driver(db_session, "D3") is not None
+
+    items = crud_driver.batch_update_drivers(db_session, [
+        {"driver_id": "D1", "shift_hours_today": 5.0},
+        {"driver_id": "D2", "shift_hours_today": 6.0, "name": "Second"},
+    ], ["D3"])
+    db_session.commit()
+    assert [item["status"] for item in items] == ["updated", "updated", "deleted"]
+    assert [(d.driver_id, d.name, d.shift_hours_today) for d in crud_driver.get_drivers(db_session)] == [
+        ("D1", "D1", 5.0), ("D2", "Second", 6.0),
+    ]
+
+def test_batch_update_routes_is_set_based(db_session):
+    for route_id in ("R1", "R2", "R3"):
+        crud_route.create_route(db_session, RouteCreate(route_id=route_id, distance_km=10.0, traffic_level="Low", base_time_minutes=15))
+    statements = []
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        items = crud_route.batch_update_routes(db_session, [
+            {"route_id": "R1", "traffic_level": "High"},
+            {"route_id": "R2", "traffic_level": "High"},
+            {"route_id": "R3", "distance_km": 20.0},
+        ], [])
+        db_session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert [item["status"] for item in items] == ["updated"] * 3
+    # Existence check, one UPDATE per column set, cost lookup and upsert, version bump
+    assert len(statements) == 6
+    assert crud_route_cost.get_route_cost(db_session, "R2").fuel_cost == 70.0
+    assert crud_route_cost.get_route_cost(db_session, "R3").fuel_cost == 100.0
+
+    items = crud_route.batch_update_routes(db_session, [], ["R1", "R2"])
+    db_session.commit()
+    assert [item["status"] for item in items] == ["deleted", "deleted"]
+    assert [route.route_id for route in crud_route.get_routes(db_session)] == ["R3"]
+    assert crud_route_cost.get_route_cost(db_session, "R1") is None
@@ -1,13 +1,17 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 import os
 
 from app.core.database import Base
-from app.services.data_loader import load_all_data
+from app.services.data_loader import (
+    ORDER_COLUMNS, load_all_data, load_drivers_from_csv, load_orders_from_csv, load_routes_from_csv, read_csv, stream_orders_from_csv,
+)
 from app.crud import driver as crud_driver
 from app.crud import order as crud_order
 from app.crud import route as crud_route
+from app.crud import route_cost as crud_route_cost
+from app.schemas.route import RouteCreate
 
 # Use an in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -65,3 +69,125 @@ def test_load_all_data(db_session):
     os.remove(os.path.join(data_dir, "drivers.csv"))
     os.remove(os.path.join(data_dir, "orders.csv"))
     os.remove(os.path.join(data_dir, "routes.csv"))
+
+def write_csv(path, header, rows):
+    path.write_text("\n".join([header] + rows) + "\n")
+    return str(path)
+
+def test_bulk_load_reports_bad_rows_and_upserts(db_session, tmp_path):
+    drivers_csv = write_csv(tmp_path / "drivers.csv", "name,shift_hours,past_week_hours", [
+        "Amit,6,6|8|7|7|7|6|10",
+        ",5,1|2",
+        "Priya,x,1|2",
+        "Rohit,9,10|oops",
+    ])
+    report = load_drivers_from_csv(db_session, drivers_csv)
+    assert (report.rows_read, report.rows_written) == (4, 1)
+    assert [(error["row"], error["column"]) for error in report.errors] == [
+        (2, "name"), (3, "shift_hours"), (4, "past_week_hours")
+    ]
+    driver = crud_driver.get_driver(db_session, "1")
+    assert driver.hours_worked_past_week == 51.0
+
+    orders_csv = write_csv(tmp_path / "orders.csv", "order_id,value_rs,route_id,delivery_time", [
+        "1,2594,7,02:07",
+        "2,1835,6,2025-08-12 11:30:00",
+        "3,766,9,noon",
+        "2,1900,6,2025-08-12 12:00:00",
+    ])
+    report = load_orders_from_csv(db_session, orders_csv)
+    db_session.commit()
+    assert [(error["row"], error["column"]) for error in report.errors] == [(3, "delivery_time")]
+    order = crud_order.get_order(db_session, "1")
+    assert (order.delivery_time.hour, order.delivery_time.minute) == (2, 7)
+    # Duplicate ids in one file: the later row wins
+    assert crud_order.get_order(db_session, "2").value == 1900.0
+
+    # Reloading updates rows in place and leaves the current assignment alone
+    crud_order.assign_order_to_driver(db_session, "1", "1")
+    write_csv(tmp_path / "orders.csv", "order_id,value_rs,route_id,delivery_time", ["1,100,7,03:00"])
+    load_orders_from_csv(db_session, orders_csv)
+    db_session.commit()
+    db_session.expire_all()
+    order = crud_order.get_order(db_session, "1")
+    assert (order.value, order.assigned_driver_id) == (100.0, "1")
+    # Order 2 came from this file and is gone from it now
+    assert [o.order_id for o in crud_order.get_orders(db_session)] == ["1"]
+
+def test_bulk_load_routes_maintains_costs(db_session, tmp_path):
+    routes_csv = write_csv(tmp_path / "routes.csv", "route_id,distance_km,traffic_level,base_time_min", [
+        "1,25,High,125",
+        "2,-3,Low,10",
+        "3,6,Low,18.5",
+    ])
+    report = load_routes_from_csv(db_session, routes_csv)
+    db_session.commit()
+    assert [(error["row"], error["column"]) for error in report.errors] == [(2, "distance_km"), (3, "base_time_min")]
+    assert crud_route_cost.get_route_cost(db_session, "1").fuel_cost == 175.0
+
+def test_missing_columns_fail_the_file(tmp_path):
+    orders_csv = write_csv(tmp_path / "orders.csv", "order_id,route_id", ["1,7"])
+    with pytest.raises(ValueError, match="value_rs, delivery_time"):
+        read_csv(orders_csv, ORDER_COLUMNS)
+
+def test_stream_orders_commits_each_chunk(db_session, tmp_path):
+    orders_csv = write_csv(tmp_path / "orders.csv", "order_id,value_rs,route_id,delivery_time", [
+        f"{i},{100 + i},1,{'bad' if i == 3 else '10:00'}" for i in range(1, 8)
+    ])
+    commits = []
+    def count_commit(session):
+        commits.append(session)
+    seen = []
+    def progress(report, bytes_read, total_bytes):
+        seen.append((report.rows_read, report.rows_written, report.rows_rejected))
+        assert 0 < bytes_read <= total_bytes
+
+    event.listen(db_session, "after_commit", count_commit)
+    try:
+        report = stream_orders_from_csv(db_session, orders_csv, chunksize=3, progress=progress)
+    finally:
+        event.remove(db_session, "after_commit", count_commit)
+
+    assert len(commits) == 3
+    assert seen == [(3, 2, 1), (6, 5, 1), (7, 6, 1)]
+    # Row numbers stay file-global across chunks
+    assert [(error["row"], error["column"]) for error in report.errors] == [(3, "delivery_time")]
+    assert len(crud_order.get_orders(db_session)) == 6
+
+def test_stream_orders_stops_between_chunks(db_session, tmp_path):
+    orders_csv = write_csv(tmp_path / "orders.csv", "order_id,value_rs,route_id,delivery_time", [
+        f"{i},100,1,10:00" for i in range(1, 8)
+    ])
+    def stop(report, bytes_read, total_bytes):
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        stream_orders_from_csv(db_session, orders_csv, chunksize=3, progress=stop)
+    # The first chunk was committed before the import stopped
+    assert len(crud_order.get_orders(db_session)) == 3
+
+def test_manifest_applies_only_changed_rows(db_session, tmp_path):
+    header = "route_id,distance_km,traffic_level,base_time_min"
+    routes_csv = write_csv(tmp_path / "routes.csv", header, ["1,25,High,125", "2,12,High,48", "3,6,Low,18"])
+    report = load_routes_from_csv(db_session, routes_csv)
+    db_session.commit()
+    assert report.rows_written == 3
+
+    # Same bytes: skipped without parsing
+    assert load_routes_from_csv(db_session, routes_csv).unchanged
+
+    # A route created through the API is never deleted by the loader
+    crud_route.create_route(db_session, RouteCreate(route_id="API", distance_km=1.0, traffic_level="low", base_time_minutes=5))
+
+    # Reformatted row 1 parses to the same values, row 2 changes, row 3 is removed, row 4 is new
+    write_csv(tmp_path / "routes.csv", header, ["1,25.0,High,125", "2,14,High,48", "4,9,Medium,30"])
+    report = load_routes_from_csv(db_session, routes_csv)
+    db_session.commit()
+    assert (report.unchanged, report.rows_read, report.rows_written, report.rows_deleted) == (False, 3, 2, 1)
+    assert sorted(route.route_id for route in crud_route.get_routes(db_session)) == ["1", "2", "4", "API"]
+    assert crud_route_cost.get_route_cost(db_session, "3") is None
+    assert crud_route_cost.get_route_cost(db_session, "2").fuel_cost == 98.0
+
+    # force re-applies every row
+    report = load_routes_from_csv(db_session, routes_csv, force=True)
+    assert (report.unchanged, report.rows_written) == (False, 3)
@@ -0,0 +1,137 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import (
+    create_missing_indexes, effective_pragmas, make_engine, pragma_mismatches, sqlite_pragmas, upgrade_schema,
+)
+import app.models.assignment
+import app.models.simulation_run
+from app.models.simulation_run import SimulationRunArchive
+from app.crud.simulation_run_rollup import backfill_rollups
+
+# Tables as created by the first release, before columns were added to the models
+BASELINE_ASSIGNMENTS = """CREATE TABLE assignments (
+    id INTEGER NOT NULL PRIMARY KEY, order_id VARCHAR, driver_id VARCHAR,
+    estimated_delivery_time DATETIME, assigned_at DATETIME
+)"""
+BASELINE_SIMULATION_RUNS = """CREATE TABLE simulation_runs (
+    id INTEGER NOT NULL PRIMARY KEY, timestamp DATETIME, num_available_drivers INTEGER, route_start_time VARCHAR,
+    max_hours_per_driver_per_day FLOAT, total_profit FLOAT, efficiency_score FLOAT, total_deliveries INTEGER,
+    on_time_deliveries INTEGER, late_deliveries INTEGER, total_fuel_cost FLOAT, total_penalties FLOAT, total_bonuses FLOAT
+)"""
+
+
+def test_make_engine_applies_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}", journal_mode="wal", synchronous="normal",
+                         mmap_size=1048576, cache_size=-2048, busy_timeout=1234)
+    pragmas = effective_pragmas(engine)
+    assert pragmas == {
+        "journal_mode": "wal", "synchronous": "normal", "mmap_size": 1048576,
+        "cache_size": -2048, "busy_timeout": 1234, "query_only": False,
+    }
+    engine.dispose()
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    writer = make_engine(url)
+    reader = make_engine(url, read_only=True)
+    with writer.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+    assert effective_pragmas(reader)["query_only"] is True
+    with reader.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM items")).scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.execute(text("INSERT INTO items (id) VALUES (2)"))
+    writer.dispose()
+    reader.dispose()
+
+
+def test_pragma_mismatches_reports_differences():
+    pragmas = dict(sqlite_pragmas(), query_only=False)
+    assert pragma_mismatches(pragmas) == {}
+    pragmas["journal_mode"] = "memory"
+    assert pragma_mismatches(pragmas) == {"journal_mode": (sqlite_pragmas()["journal_mode"], "memory")}
+    assert pragma_mismatches(pragmas, read_only=True)["query_only"] == (True, False)
+
+
+def test_sqlite_pragmas_rejects_unknown_journal_mode():
+    with pytest.raises(ValueError):
+        sqlite_pragmas(journal_mode="wal; DROP TABLE orders")
+
+
+def test_upgrade_schema_adds_missing_columns_and_their_indexes(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(BASELINE_ASSIGNMENTS))
+        connection.execute(text("INSERT INTO assignments (id, order_id, driver_id) VALUES (1, 'O1', 'D1')"))
+
+    upgrade_schema(engine)
+    inspector = inspect(engine)
+    assert "simulation_run_id" in {column["name"] for column in inspector.get_columns("assignments")}
+    assert "ix_assignments_simulation_run_id" in {index["name"] for index in inspector.get_indexes("assignments")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT simulation_run_id FROM assignments")).all() == [(None,)]
+    upgrade_schema(engine) # Nothing left to add
+    engine.dispose()
+
+
+def test_upgrade_schema_keeps_old_simulation_history_usable(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(BASELINE_SIMULATION_RUNS))
+        connection.execute(text(
+            "INSERT INTO simulation_runs VALUES (1, '2025-01-01 09:30:00', 3, '09:00', 8, 100, 90, 10, 9, 1, 5, 0, 0)"
+        ))
+
+    upgrade_schema(engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        # The startup backfill reads every column of the old runs, strategy included
+        assert backfill_rollups(db) == 1
+        db.commit()
+        assert db.execute(text("SELECT strategy FROM simulation_runs")).all() == [(None,)]
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_upgrade_schema_never_reuses_archived_run_ids(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(BASELINE_SIMULATION_RUNS))
+        connection.execute(text(
+            "INSERT INTO simulation_runs VALUES (1, '2025-01-01 09:30:00', 3, '09:00', 8, 100, 90, 10, 9, 1, 5, 0, 0)"
+        ))
+    # Runs 2 to 5 were archived before the upgrade
+    SimulationRunArchive.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO simulation_run_archives (day, path, first_run_id, last_run_id, run_count, plan_count) "
+            "VALUES ('2025-01-01 00:00:00', 'runs.zip', 2, 5, 4, 0)"
+        ))
+
+    upgrade_schema(engine)
+    assert "ix_simulation_runs_timestamp" in {index["name"] for index in inspect(engine).get_indexes("simulation_runs")}
+    with engine.begin() as connection:
+        assert connection.execute(text("SELECT id, total_profit FROM simulation_runs")).all() == [(1, 100.0)]
+        connection.execute(text("INSERT INTO simulation_runs (timestamp) VALUES ('2025-01-02 09:30:00')"))
+        assert connection.execute(text("SELECT max(id) FROM simulation_runs")).scalar() == 6
+    upgrade_schema(engine) # Already rebuilt
+    engine.dispose()
+
+
+def test_indexes_over_missing_columns_are_skipped(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(BASELINE_ASSIGNMENTS))
+
+    create_missing_indexes(engine)
+    indexes = {index["name"] for index in inspect(engine).get_indexes("assignments")}
+    assert "ix_assignments_driver_id" in indexes
+    assert "ix_assignments_simulation_run_id" not in indexes
+    engine.dispose()
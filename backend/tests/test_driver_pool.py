@@ -0,0 +1,51 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.cost_matrix import CostMatrix
+from app.services.driver_pool import DriverPool
+from app.services.optimizer import Optimizer
+from tests.test_cost_matrix import make_fleet, reference_assign
+
+
+def make_orders(seed, routes, count):
+    rng = random.Random(seed)
+    now = datetime(2025, 8, 12, 9, 0)
+    return sorted(
+        (
+            SimpleNamespace(
+                order_id=f"O{i}",
+                value=100.0,
+                route_id=rng.choice([r.route_id for r in routes]),
+                delivery_time=now + timedelta(minutes=rng.randint(0, 600)),
+            )
+            for i in range(count)
+        ),
+        key=lambda o: o.delivery_time,
+    )
+
+
+@pytest.mark.parametrize("seed,max_hours", [(10, None), (11, 9.0), (12, 11.0), (13, 20.0)])
+def test_pool_matches_linear_scan_with_many_ties(seed, max_hours):
+    # Integer hours give lots of drivers with identical scores, which exercises the tie-breaking
+    drivers, routes = make_fleet(seed, num_drivers=120, num_routes=30)
+    orders = make_orders(seed, routes, 1500)
+    matrix = CostMatrix(routes, drivers)
+    driver_idx = matrix.assign_greedy(matrix.route_indices([o.route_id for o in orders]), max_hours)
+    got = [matrix.driver_ids[d] if d >= 0 else None for d in driver_idx]
+    assert got == reference_assign(Optimizer(db=None), orders, routes, drivers, max_hours)
+
+
+def test_pool_drops_and_revives_drivers_by_capacity():
+    drivers = [SimpleNamespace(driver_id="D1", shift_hours_today=7.0, hours_worked_past_week=35.0)]
+    routes = [SimpleNamespace(route_id="R1", distance_km=10.0, traffic_level="low", base_time_minutes=15)]
+    matrix = CostMatrix(routes, drivers)
+    pool = DriverPool(matrix, max_hours_per_driver_per_day=8.0)
+
+    assert pool.select(0) == 0
+    pool.add_workload(0, 36.5)
+    assert pool.select(0) == -1 # A second 36.5 minute route would exceed 8 hours
+    pool.add_workload(0, -36.5)
+    assert pool.select(0) == 0
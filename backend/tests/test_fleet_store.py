@@ -0,0 +1,101 @@
+import os
+import time
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+
+from app.core.database import Base
+from app.crud import driver as crud_driver
+from app.crud import fleet_version as crud_fleet_version
+from app.crud import order as crud_order
+from app.crud import route as crud_route
+from app.schemas.driver import DriverCreate
+from app.schemas.optimization import SimulationInput
+from app.schemas.order import OrderCreate
+from app.schemas.route import RouteCreate
+from app.services import fleet_store
+from app.services.fleet_store import FleetStore, query_fleet_snapshot
+from app.services.sweep import run_sweep
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="function")
+def db_session():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    crud_driver.create_driver(db, DriverCreate(driver_id="D1", name="Asha", shift_hours_today=6.0, hours_worked_past_week=40.0))
+    crud_driver.create_driver(db, DriverCreate(driver_id="D2", name="Ravi", shift_hours_today=9.0, hours_worked_past_week=70.0))
+    crud_route.create_route(db, RouteCreate(route_id="R1", distance_km=10.0, traffic_level="High", base_time_minutes=30))
+    crud_route.create_route(db, RouteCreate(route_id="R2", distance_km=4.5, traffic_level="Low", base_time_minutes=12))
+    crud_order.create_order(db, OrderCreate(order_id="O1", value=1500.0, route_id="R1", delivery_time=datetime(2025, 8, 12, 9, 30)))
+    crud_order.create_order(db, OrderCreate(order_id="O2", value=250.5, route_id="R2", delivery_time=datetime(2025, 8, 12, 8, 45, 0, 123456)))
+    crud_order.create_order(db, OrderCreate(order_id="O3", value=99.0, route_id="R9", delivery_time=datetime(2025, 8, 12, 10, 0)))
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def store(tmp_path):
+    return FleetStore(str(tmp_path))
+
+def fields(snapshot):
+    return (
+        [tuple(getattr(d, s) for s in d.__slots__) for d in snapshot.drivers],
+        [tuple(getattr(o, s) for s in o.__slots__) for o in snapshot.orders],
+        [tuple(getattr(r, s) for s in r.__slots__) for r in snapshot.routes],
+    )
+
+def test_stored_snapshot_round_trips(db_session, store):
+    fleet = store.current(db_session)
+    assert fleet.stamp == crud_fleet_version.get_fleet_stamp(db_session)
+    assert isinstance(fleet.columns["order_values"], np.memmap)
+    assert fleet.columns["driver_ids"].dtype.kind == "U"
+    # Order routes are codes into the route id dictionary; the unknown R9 is kept after the known routes
+    assert fleet.columns["route_ids"].tolist() == ["R1", "R2", "R9"]
+    assert fleet.columns["order_route_codes"].tolist() == [0, 1, 2]
+
+    expected = fields(query_fleet_snapshot(db_session))
+    assert fields(store.open(fleet.stamp).to_snapshot()) == expected
+    assert fields(store.load_snapshot(db_session)) == expected
+
+def test_crud_writes_make_the_snapshot_stale(db_session, store):
+    first = store.current(db_session)
+    crud_order.set_assigned_driver(db_session, "O1", "D1") # Not part of the snapshot
+    db_session.commit()
+    assert store.current(db_session).stamp == first.stamp
+
+    crud_driver.update_driver(db_session, "D1", {"shift_hours_today": 1.0})
+    second = store.current(db_session)
+    assert second.stamp != first.stamp
+    assert second.columns["driver_shift_hours_today"].tolist() == [1.0, 9.0]
+    # Older snapshots are pruned once unused for a while: a sweep may just have handed one to its workers
+    assert sorted(os.listdir(store.base_dir)) == sorted([os.path.basename(first.path), os.path.basename(second.path)])
+    unused = time.time() - fleet_store.PRUNE_AFTER_SECONDS - 1
+    os.utime(first.path, (unused, unused))
+    crud_driver.update_driver(db_session, "D1", {"shift_hours_today": 2.0})
+    third = store.current(db_session)
+    assert sorted(os.listdir(store.base_dir)) == sorted([os.path.basename(second.path), os.path.basename(third.path)])
+
+    crud_order.bulk_delete_orders(db_session, ["O3"])
+    db_session.commit()
+    assert store.load_snapshot(db_session).orders[-1].order_id == "O2"
+
+def test_disabled_store_queries_the_tables(db_session):
+    store = FleetStore("")
+    assert store.current(db_session) is None
+    assert fields(store.load_snapshot(db_session)) == fields(query_fleet_snapshot(db_session))
+
+def test_sweep_workers_map_the_stored_snapshot(db_session, store):
+    fleet = store.current(db_session)
+    variants = [SimulationInput(), SimulationInput(num_available_drivers=1)]
+    now = datetime(2025, 8, 12, 8, 0)
+    assert run_sweep(fleet.path, variants, max_workers=2, now=now) == run_sweep(fleet.to_snapshot(), variants, now=now)
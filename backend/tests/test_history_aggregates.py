@@ -0,0 +1,115 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import simulation_history
+from app.core.database import Base
+from app.crud import simulation_run as crud_simulation_run
+from app.crud import simulation_run_rollup as crud_simulation_run_rollup
+from app.models.simulation_run import SimulationRun, SimulationRunRollup
+from app.schemas.simulation_run import SimulationRunCreate
+from app.services.downsample import lttb
+from app.services.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+
+test_app = FastAPI()
+test_app.include_router(simulation_history.router)
+
+START = datetime(2040, 5, 1, 9, 0)
+RANGE = {"timestamp_from": START.isoformat(), "timestamp_to": (START + timedelta(days=7)).isoformat()}
+
+def run(timestamp, strategy, total_profit, efficiency_score=90.0, total_penalties=0.0):
+    return SimulationRunCreate(
+        timestamp=timestamp, strategy=strategy, total_profit=total_profit, efficiency_score=efficiency_score,
+        total_deliveries=10, on_time_deliveries=9, late_deliveries=1, total_fuel_cost=50.0,
+        total_penalties=total_penalties, total_bonuses=0.0,
+    )
+
+RUNS = [
+    run(START, "greedy", 100.0),
+    run(START + timedelta(minutes=10), "greedy", 300.0, total_penalties=50.0),
+    run(START + timedelta(minutes=20), "optimal", 500.0),
+    run(START + timedelta(days=1), "greedy", -20.0, efficiency_score=40.0),
+]
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.uniform(-500.0, 5000.0) for _ in range(2000)] + [0.0] * 50
+    sketch = QuantileSketch()
+    sketch.update(values[:1000])
+    rest = QuantileSketch()
+    rest.update(values[1000:])
+    sketch.merge(QuantileSketch.from_json(rest.to_json()))
+    assert sketch.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(sketch.quantile(q) - exact) <= 2 * RELATIVE_ACCURACY * abs(exact) + 1e-9
+
+def test_lttb_keeps_ends_and_spikes():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 100.0
+    kept = lttb(x, y, 50)
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 437 in kept
+    assert list(lttb(x[:10], y[:10], 50)) == list(range(10))
+
+def test_rebuild_matches_incremental_rollups():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        crud_simulation_run.create_simulation_run(db, RUNS[0])
+        crud_simulation_run.create_simulation_runs(db, RUNS[1:])
+        db.commit()
+        columns = ("bucket_start", "group_key", "run_count", "total_profit_sum", "total_profit_min", "total_profit_max", "total_penalties_sketch")
+        incremental = [tuple(getattr(row, name) for name in columns) for row in crud_simulation_run_rollup.get_rollups(db)]
+        assert [row[2] for row in incremental] == [2, 1, 1]
+        assert crud_simulation_run_rollup.backfill_rollups(db) == 0 # Already has rollups
+        assert crud_simulation_run_rollup.rebuild_rollups(db) == len(RUNS)
+        assert [tuple(getattr(row, name) for name in columns) for row in crud_simulation_run_rollup.get_rollups(db)] == incremental
+    finally:
+        db.close()
+        engine.dispose()
+
+@pytest.fixture
+def client(db_session_function):
+    db = db_session_function
+    crud_simulation_run.create_simulation_runs(db, RUNS)
+    db.commit()
+    yield TestClient(test_app)
+    db.query(SimulationRunRollup).filter(SimulationRunRollup.bucket_start >= START).delete(synchronize_session=False)
+    db.query(SimulationRun).filter(SimulationRun.timestamp >= START).delete(synchronize_session=False)
+    db.commit()
+
+def test_daily_aggregates(client):
+    response = client.get("/simulation_history/aggregates", params={**RANGE, "bucket": "day", "top_k": 2})
+    assert response.status_code == 200
+    body = response.json()
+    (group,) = body["groups"]
+    assert group["key"] == {}
+    assert group["run_count"] == 4
+    assert [bucket["run_count"] for bucket in group["buckets"]] == [3, 1]
+    profit = group["buckets"][0]["metrics"]["total_profit"]
+    assert (profit["mean"], profit["min"], profit["max"]) == (300.0, 100.0, 500.0)
+    assert profit["percentiles"]["p50"] == pytest.approx(300.0, rel=RELATIVE_ACCURACY)
+    assert group["metrics"]["total_profit"]["min"] == -20.0
+    assert [point["value"] for point in group["series"]["efficiency_score"]] == [90.0, 40.0]
+    assert [run["total_profit"] for run in body["top_runs"]] == [500.0, 300.0]
+
+def test_grouped_hourly_aggregates(client):
+    response = client.get("/simulation_history/aggregates", params={**RANGE, "bucket": "hour", "group_by": "strategy", "top_k": 0})
+    groups = {group["key"]["strategy"]: group for group in response.json()["groups"]}
+    assert groups["greedy"]["run_count"] == 3
+    assert groups["optimal"]["metrics"]["total_penalties"]["max"] == 0.0
+    assert groups["greedy"]["metrics"]["total_penalties"]["max"] == 50.0
+    assert len(groups["greedy"]["buckets"]) == 2
+
+def test_invalid_percentile_is_rejected(client):
+    assert client.get("/simulation_history/aggregates", params={"percentiles": 120}).status_code == 400
@@ -0,0 +1,171 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api import simulation_history
+from app.core.config import settings
+from app.core.database import Base, SessionLocal
+from app.crud import simulation_run as crud_simulation_run
+from app.crud import simulation_run_rollup as crud_simulation_run_rollup
+from app.models.simulation_run import SimulationRun, SimulationRunArchive, SimulationRunPlan, SimulationRunRollup
+from app.schemas.simulation_run import SimulationRunCreate
+from app.services import history_archive
+from app.services.history_retention import HistoryCompactor
+from app.services.plan_codec import decode_plan, plan_rows
+from app.services.solver import PlannedAssignment
+
+test_app = FastAPI()
+test_app.include_router(simulation_history.router)
+
+DAY = datetime(1990, 1, 1)
+NOW = datetime(1990, 1, 20, 12, 0) # With 7 days of retention, runs before Jan 13 are archived
+
+def run(timestamp, strategy, total_profit):
+    return SimulationRunCreate(
+        timestamp=timestamp, strategy=strategy, total_profit=total_profit, efficiency_score=80.0,
+        total_deliveries=4, on_time_deliveries=3, late_deliveries=1, total_fuel_cost=20.0,
+        total_penalties=5.0, total_bonuses=0.0,
+    )
+
+RUNS = [
+    run(DAY + timedelta(hours=9), "greedy", 100.0),
+    run(DAY + timedelta(hours=10), "greedy", 400.0),
+    run(DAY + timedelta(hours=10, minutes=30), "optimal", 200.0),
+    run(DAY + timedelta(days=1, hours=8), "greedy", 300.0),
+    run(DAY + timedelta(days=15), "greedy", 250.0), # Within retention
+]
+
+def planned(order_id, driver_id, profit):
+    return PlannedAssignment(order_id, driver_id, DAY + timedelta(hours=12), True, 0.0, 0.0, 5.0, profit)
+
+PLAN = [planned("O1", "D1", 50.0), planned("O2", "D2", 50.0)]
+NEXT_PLAN = [planned("O1", "D2", 50.0), planned("O3", "D2", 200.0)]
+
+def record(db):
+    # Ids of RUNS; the first run and the live one have plans
+    ids = [crud_simulation_run.create_simulation_run(db, simulation_run).id for simulation_run in RUNS]
+    crud_simulation_run.create_simulation_run_plan(db, ids[0], DAY, PLAN)
+    crud_simulation_run.create_simulation_run_plan(db, ids[-1], DAY, NEXT_PLAN)
+    db.commit()
+    return ids
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "history_archive_dir", str(tmp_path))
+    yield tmp_path
+    history_archive.read_runs.cache_clear()
+
+def test_compaction_archives_old_runs_and_merges_rollups(archive_dir):
+    engine = create_engine(f"sqlite:///{archive_dir}/history.db")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    db = session_factory()
+    try:
+        ids = record(db)
+        assert [run.id for run in crud_simulation_run.get_runs_to_archive(db, DAY + timedelta(days=1), 10, keep_id=ids[1])] == [ids[0], ids[2]]
+
+        compactor = HistoryCompactor(session_factory, retention_days=7, batch_size=2)
+        assert compactor.run_once(NOW) == {"archived_runs": 4, "archives": 3, "merged_rollups": 1}
+        assert compactor.run_once(NOW) == {"archived_runs": 0, "archives": 0, "merged_rollups": 0}
+
+        assert db.scalars(select(SimulationRun.id)).all() == [ids[-1]]
+        assert db.scalars(select(SimulationRunPlan.simulation_run_id)).all() == [ids[-1]]
+        archives = db.scalars(select(SimulationRunArchive).order_by(SimulationRunArchive.id)).all()
+        assert [(archive.day, archive.first_run_id, archive.last_run_id) for archive in archives] == [
+            (DAY, ids[0], ids[1]), (DAY, ids[2], ids[2]), (DAY + timedelta(days=1), ids[3], ids[3]),
+        ]
+        assert all(os.path.exists(history_archive.archive_path(archive.path)) for archive in archives)
+        assert [run.total_profit for run in history_archive.read_runs(archives[0].path)] == [100.0, 400.0]
+        assert [row["order_id"] for row in plan_rows(decode_plan(history_archive.read_plan(archives[0].path, ids[0]).data))] == ["O1", "O2"]
+        assert history_archive.read_plan(archives[0].path, ids[1]) is None
+
+        # Old days keep one daily row per group; their counts and extremes are unchanged
+        rollups = crud_simulation_run_rollup.get_rollups(db)
+        assert [(rollup.bucket_start, rollup.strategy, rollup.run_count) for rollup in rollups] == [
+            (DAY, "greedy", 2), (DAY, "optimal", 1), (DAY + timedelta(days=1), "greedy", 1), (DAY + timedelta(days=15), "greedy", 1),
+        ]
+        assert (rollups[0].total_profit_min, rollups[0].total_profit_max, rollups[0].total_profit_sum) == (100.0, 400.0, 500.0)
+
+        # A rebuild also reads the archives; the next pass merges the old days again
+        assert crud_simulation_run_rollup.rebuild_rollups(db) == len(RUNS)
+        db.commit()
+        assert compactor.run_once(NOW)["merged_rollups"] == 1
+        assert db.scalar(select(func.count(SimulationRunRollup.id))) == 4
+    finally:
+        db.close()
+        engine.dispose()
+
+def test_archiving_the_newest_runs_does_not_free_their_ids(archive_dir):
+    engine = create_engine(f"sqlite:///{archive_dir}/history.db")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    db = session_factory()
+    try:
+        ids = record(db)
+        assert HistoryCompactor(session_factory, retention_days=7).run_once(NOW + timedelta(days=30))["archived_runs"] == len(RUNS)
+        assert db.scalar(select(func.count(SimulationRun.id))) == 0
+
+        new_run = crud_simulation_run.create_simulation_run(db, run(NOW, "greedy", 50.0))
+        db.commit()
+        assert new_run.id > ids[-1]
+    finally:
+        db.close()
+        engine.dispose()
+
+@pytest.fixture
+def archived_runs(archive_dir):
+    db = SessionLocal()
+    try:
+        ids = record(db)
+        HistoryCompactor(SessionLocal, retention_days=7, batch_size=2).run_once(NOW)
+        yield ids
+        period = (DAY, DAY + timedelta(days=31))
+        db.query(SimulationRunArchive).filter(SimulationRunArchive.day.between(*period)).delete(synchronize_session=False)
+        db.query(SimulationRunRollup).filter(SimulationRunRollup.bucket_start.between(*period)).delete(synchronize_session=False)
+        db.query(SimulationRunPlan).filter(SimulationRunPlan.simulation_run_id.in_(ids)).delete(synchronize_session=False)
+        db.query(SimulationRun).filter(SimulationRun.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+RANGE = {"timestamp_from": DAY.isoformat(), "timestamp_to": (DAY + timedelta(days=31)).isoformat()}
+
+def test_history_includes_archived_runs(archived_runs):
+    client = TestClient(test_app)
+    response = client.get("/simulation_history", params=RANGE)
+    assert [run["id"] for run in response.json()] == archived_runs
+    assert response.json()[0]["timestamp"] == RUNS[0].timestamp.isoformat()
+
+    # Pages continue across archive files and the live table
+    seen, params = [], {**RANGE, "limit": 2}
+    while True:
+        response = client.get("/simulation_history", params=params)
+        seen += [run["id"] for run in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == archived_runs
+    assert [run["id"] for run in client.get("/simulation_history", params={**RANGE, "skip": 3}).json()] == archived_runs[3:]
+
+def test_archived_plans_and_aggregates(archived_runs):
+    client = TestClient(test_app)
+    plan = client.get(f"/simulation_history/{archived_runs[0]}/plan").json()
+    assert [row["order_id"] for row in plan["assignments"]] == ["O1", "O2"]
+    assert client.get(f"/simulation_history/{archived_runs[1]}/plan").status_code == 404
+
+    diff = client.get(f"/simulation_history/{archived_runs[0]}/diff/{archived_runs[-1]}").json()
+    assert diff["kpi_deltas"]["total_profit"] == 150.0
+    assert [row["order_id"] for row in diff["added"]] == ["O3"]
+
+    body = client.get("/simulation_history/aggregates", params={**RANGE, "top_k": 3}).json()
+    assert [run["total_profit"] for run in body["top_runs"]] == [400.0, 300.0, 250.0]
+    (group,) = body["groups"]
+    assert group["run_count"] == len(RUNS)
+    assert [bucket["start"] for bucket in group["buckets"]] == [
+        (DAY + timedelta(days=offset)).isoformat() for offset in (0, 1, 15)
+    ]
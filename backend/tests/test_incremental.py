@@ -0,0 +1,137 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime, timedelta
+
+from app.core.database import Base
+from app.models.simulation_run import SimulationRun
+from app.crud import assignment as crud_assignment
+from app.crud import driver as crud_driver
+from app.crud import order as crud_order
+from app.crud import route as crud_route
+from app.schemas.driver import DriverCreate
+from app.schemas.order import OrderCreate
+from app.schemas.route import RouteCreate
+from app.schemas.optimization import SimulationInput
+from app.services.incremental import incremental_planner
+from app.services.optimizer import Optimizer
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(scope="function")
+def db_session():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    incremental_planner.clear()
+    drift_threshold = incremental_planner.drift_threshold
+    try:
+        yield db
+    finally:
+        incremental_planner.drift_threshold = drift_threshold
+        incremental_planner.clear()
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def live_plan(db_session):
+    for i, shift_hours in enumerate([4.0, 6.0, 9.0]):
+        crud_driver.create_driver(db_session, DriverCreate(driver_id=f"D{i}", name=f"Driver {i}", shift_hours_today=shift_hours, hours_worked_past_week=30.0))
+    crud_route.create_route(db_session, RouteCreate(route_id="R1", distance_km=10.0, traffic_level="low", base_time_minutes=15))
+    crud_route.create_route(db_session, RouteCreate(route_id="R2", distance_km=5.0, traffic_level="high", base_time_minutes=10))
+    now = datetime.now()
+    for i in range(10):
+        crud_order.create_order(db_session, OrderCreate(order_id=f"O{i}", value=100.0 * (i + 1), route_id=f"R{i % 2 + 1}", delivery_time=now + timedelta(minutes=20 * i)))
+    result = Optimizer(db_session).assign_orders(SimulationInput(route_start_time=None))
+    incremental_planner.drift_threshold = 0.5
+    return db_session, result["kpis"]
+
+def test_no_live_plan_is_a_noop(db_session):
+    assert incremental_planner.order_changed(db_session, "O1") is None
+
+def test_insert_update_and_remove_single_orders(live_plan):
+    db_session, kpis = live_plan
+    assert incremental_planner.kpis() == kpis
+
+    crud_order.create_order(db_session, OrderCreate(order_id="NEW", value=1500.0, route_id="R1", delivery_time=datetime.now() + timedelta(hours=5)))
+    assert incremental_planner.order_changed(db_session, "NEW") == "incremental"
+    assignment = crud_assignment.get_assignment(db_session, "NEW")
+    assert assignment is not None
+    assert crud_order.get_order(db_session, "NEW").assigned_driver_id == assignment.driver_id
+    live = incremental_planner.kpis()
+    assert live["total_deliveries"] == kpis["total_deliveries"] + 1
+    assert live["total_bonuses"] == pytest.approx(kpis["total_bonuses"] + 150.0)
+
+    # Moving the deadline into the past turns the order late: bonus gone, penalty applied
+    crud_order.update_order(db_session, "NEW", {"delivery_time": datetime.now() - timedelta(hours=1)})
+    assert incremental_planner.order_changed(db_session, "NEW") == "incremental"
+    live = incremental_planner.kpis()
+    assert live["total_bonuses"] == pytest.approx(kpis["total_bonuses"])
+    assert live["total_penalties"] == pytest.approx(kpis["total_penalties"] + 50.0)
+
+    crud_order.delete_order(db_session, "NEW")
+    assert incremental_planner.order_changed(db_session, "NEW") == "incremental"
+    assert crud_assignment.get_assignment(db_session, "NEW") is None
+    assert incremental_planner.kpis() == pytest.approx(kpis)
+    assert db_session.query(SimulationRun).count() == 1
+
+def test_drift_and_invalidation_fall_back_to_full_run(live_plan):
+    db_session, _ = live_plan
+    incremental_planner.drift_threshold = 0.2 # Two incremental changes on a ten order plan
+    assert incremental_planner.order_changed(db_session, "O1") == "incremental"
+    assert incremental_planner.order_changed(db_session, "O2") == "incremental"
+    assert incremental_planner.order_changed(db_session, "O3") == "full"
+    assert db_session.query(SimulationRun).count() == 2
+    assert incremental_planner.order_changed(db_session, "O3") == "incremental"
+
+    incremental_planner.invalidate()
+    assert incremental_planner.order_changed(db_session, "O4") == "full"
+    assert db_session.query(SimulationRun).count() == 3
+
+def test_invalidate_does_not_wait_for_a_replan(live_plan):
+    import threading
+    db_session, _ = live_plan
+    held, release = threading.Event(), threading.Event()
+
+    def replanning():
+        # Stands in for order_changed holding the planner lock during a full run
+        with incremental_planner._lock:
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=replanning)
+    thread.start()
+    held.wait(5)
+    invalidating = threading.Thread(target=incremental_planner.invalidate)
+    invalidating.start()
+    invalidating.join(1)
+    assert not invalidating.is_alive()
+    release.set()
+    thread.join()
+    assert incremental_planner.order_changed(db_session, "O4") == "full"
+    assert incremental_planner.order_changed(db_session, "O5") == "incremental"
+
+def test_order_created_during_a_full_run_is_not_lost(live_plan, monkeypatch):
+    db_session, _ = live_plan
+    load_snapshot = Optimizer.load_snapshot
+
+    def order_created_after_snapshot(optimizer):
+        # The order lands while the full run is solving the snapshot read without it
+        snapshot = load_snapshot(optimizer)
+        crud_order.create_order(db_session, OrderCreate(order_id="MID", value=500.0, route_id="R1", delivery_time=datetime.now() + timedelta(hours=5)))
+        db_session.commit()
+        assert incremental_planner.order_changed(db_session, "MID") == "incremental"
+        return snapshot
+
+    monkeypatch.setattr(Optimizer, "load_snapshot", order_created_after_snapshot)
+    Optimizer(db_session).assign_orders(SimulationInput(route_start_time=None))
+    monkeypatch.undo()
+    assert "MID" not in incremental_planner.orders and incremental_planner.stale
+
+    assert incremental_planner.order_changed(db_session, "O4") == "full"
+    assert "MID" in incremental_planner.orders
+    assert crud_order.get_order(db_session, "MID").assigned_driver_id is not None
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from app.services.jobs import CANCELLED, FAILED, FINISHED_STATES, SUCCEEDED, JobManager
+
+
+def wait_for(job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in FINISHED_STATES and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_reports_progress_and_result():
+    manager = JobManager(max_workers=1)
+    seen = []
+
+    def work(job, n):
+        for i in range(n):
+            job.report_progress(i, n)
+            seen.append(job.progress)
+        return {"total": n}
+
+    job = wait_for(manager.submit("count", work, 4))
+    assert job.status == SUCCEEDED
+    assert job.result == {"total": 4}
+    assert job.progress == 100.0
+    assert seen == [0.0, 25.0, 50.0, 75.0]
+    manager.shutdown()
+
+
+def test_failed_job_keeps_error():
+    manager = JobManager(max_workers=1)
+
+    def work(job):
+        raise ValueError("boom")
+
+    job = wait_for(manager.submit("fail", work))
+    assert job.status == FAILED
+    assert job.error == "boom"
+    manager.shutdown()
+
+
+def test_cancel_running_and_queued_jobs():
+    manager = JobManager(max_workers=1)
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.report_progress(1, 2)
+            time.sleep(0.01)
+
+    running = manager.submit("loop", work)
+    queued = manager.submit("loop", work)
+    assert started.wait(5)
+    manager.cancel(queued.id)
+    assert queued.status == CANCELLED
+    manager.cancel(running.id)
+    assert wait_for(running).status == CANCELLED
+    manager.shutdown()
+
+
+def test_concurrency_limit():
+    manager = JobManager(max_workers=2)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def work(job):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    jobs = [manager.submit("sleep", work) for _ in range(6)]
+    assert all(wait_for(job).status == SUCCEEDED for job in jobs)
+    assert peak[0] == 2
+    manager.shutdown()
+
+
+def test_history_is_bounded():
+    manager = JobManager(max_workers=1, history_limit=2)
+    jobs = [wait_for(manager.submit("noop", lambda job: None)) for _ in range(4)]
+    manager.submit("noop", lambda job: None)
+    ids = [job.id for job in manager.list()]
+    assert jobs[0].id not in ids and jobs[1].id not in ids
+    assert jobs[3].id in ids
+    manager.shutdown()
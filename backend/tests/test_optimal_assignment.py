@@ -0,0 +1,75 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas.optimization import SimulationInput
+from app.services import optimal_assignment
+from app.services.solver import DriverRecord, FleetSnapshot, OrderRecord, RouteRecord, solve
+
+NOW = datetime(2025, 8, 12, 9, 0)
+
+
+def random_snapshot(seed, num_drivers=8, num_orders=60):
+    rng = random.Random(seed)
+    drivers = [DriverRecord(f"D{i}", f"Driver {i}", float(rng.randint(0, 10)), float(rng.randint(20, 70))) for i in range(num_drivers)]
+    routes = [RouteRecord(f"R{i}", float(rng.randint(2, 25)), rng.choice(["Low", "Medium", "High"]), rng.randint(10, 60)) for i in range(6)]
+    orders = [
+        OrderRecord(f"O{i}", float(rng.randint(200, 2500)), rng.choice(routes).route_id, NOW + timedelta(minutes=rng.randint(20, 200)))
+        for i in range(num_orders)
+    ]
+    return FleetSnapshot(drivers, orders, routes)
+
+
+def test_optimal_beats_greedy_when_rested_driver_matters():
+    # Greedy hands the urgent high-value order to the least-loaded driver, who is fatigued and late
+    drivers = [
+        DriverRecord("D1", "Fatigued, light shift", 0.0, 60.0),
+        DriverRecord("D2", "Rested, long shift", 8.0, 56.0),
+    ]
+    routes = [RouteRecord("R1", 10.0, "low", 15)] # 36.5 minutes rested, 47.45 fatigued
+    orders = [OrderRecord("O1", 2000.0, "R1", NOW + timedelta(minutes=40))]
+    snapshot = FleetSnapshot(drivers, orders, routes)
+
+    greedy = solve(snapshot, SimulationInput(strategy="greedy"), assigned_at=NOW)
+    optimal = solve(snapshot, SimulationInput(strategy="optimal"), assigned_at=NOW)
+
+    assert greedy.driver_assigned_orders["D1"] == ["O1"]
+    assert optimal.driver_assigned_orders["D2"] == ["O1"]
+    assert optimal.kpis["total_profit"] > greedy.kpis["total_profit"]
+    assert optimal.kpis["on_time_deliveries"] == 1
+
+
+@pytest.mark.parametrize("seed,max_hours", [(1, None), (2, 10.0), (3, 12.0)])
+def test_optimal_respects_max_hours_and_is_not_worse(seed, max_hours):
+    snapshot = random_snapshot(seed)
+    greedy = solve(snapshot, SimulationInput(strategy="greedy", max_hours_per_driver_per_day=max_hours), assigned_at=NOW)
+    optimal = solve(snapshot, SimulationInput(strategy="optimal", max_hours_per_driver_per_day=max_hours), assigned_at=NOW)
+
+    assert optimal.strategy == "optimal"
+    assert len({a.order_id for a in optimal.assignments}) == len(optimal.assignments)
+    if max_hours is None:
+        assert optimal.kpis["total_deliveries"] == len(snapshot.orders)
+        assert optimal.kpis["total_profit"] >= greedy.kpis["total_profit"]
+    else:
+        shift = {d.driver_id: d.shift_hours_today for d in snapshot.drivers}
+        workload = {}
+        for a in optimal.assignments:
+            minutes = (a.estimated_delivery_time - NOW).total_seconds() / 60
+            workload[a.driver_id] = workload.get(a.driver_id, 0.0) + minutes
+        assert all(shift[d] + w / 60 <= max_hours + 1e-9 for d, w in workload.items())
+
+
+def test_auto_picks_by_problem_size(monkeypatch):
+    snapshot = random_snapshot(4)
+    assert solve(snapshot, SimulationInput(strategy="auto"), assigned_at=NOW).strategy == "optimal"
+    monkeypatch.setattr(optimal_assignment, "AUTO_OPTIMAL_MAX_CELLS", 10)
+    assert solve(snapshot, SimulationInput(strategy="auto"), assigned_at=NOW).strategy == "greedy"
+
+
+def test_optimal_falls_back_to_greedy_above_the_hard_limit(monkeypatch):
+    snapshot = random_snapshot(5)
+    monkeypatch.setattr(optimal_assignment, "OPTIMAL_MAX_CELLS", 10)
+    plan = solve(snapshot, SimulationInput(strategy="optimal"), assigned_at=NOW)
+    assert plan.strategy == "greedy"
+    assert plan.kpis == solve(snapshot, SimulationInput(strategy="greedy"), assigned_at=NOW).kpis
@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timedelta
 
@@ -19,6 +19,7 @@ from app.schemas.order import OrderCreate
 from app.schemas.route import RouteCreate
 from app.schemas.optimization import SimulationInput
 from app.services.optimizer import Optimizer
+from app.services.incremental import incremental_planner
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
@@ -238,4 +239,60 @@ def test_get_optimized_schedule_with_kpis(setup_data):
     # Verify schedule content
     schedule = schedule_response["schedule"]
     assert len(schedule) > 0
-    assert all("order_id" in item and "driver_name" in item for item in schedule)
\ No newline at end of file
+    assert all("order_id" in item and "driver_name" in item for item in schedule)
+
+
+def test_assign_orders_persists_plan_in_one_transaction(setup_data):
+    db, *_ = setup_data
+
+    optimizer = Optimizer(db)
+    optimizer.assign_orders(SimulationInput(num_available_drivers=3))
+
+    commits = []
+    def count_commit(session):
+        commits.append(session)
+    event.listen(db, "after_commit", count_commit)
+    try:
+        plan = optimizer.assign_orders(SimulationInput(num_available_drivers=1, route_start_time="09:00"))
+    finally:
+        event.remove(db, "after_commit", count_commit)
+    # The plan swap and its simulation run record share one commit
+    assert len(commits) == 1
+
+    assignments = crud_assignment.get_assignments(db)
+    assert sorted(a.order_id for a in assignments) == sorted(plan["assignments"]["D1"])
+    assigned = {o.order_id: o.assigned_driver_id for o in db.query(Order).all()}
+    assert all(assigned[order_id] == "D1" for order_id in plan["assignments"]["D1"])
+    assert sum(1 for driver_id in assigned.values() if driver_id is not None) == len(assignments)
+
+
+def test_optimized_schedule_is_one_query_and_cached(setup_data):
+    db, *_ = setup_data
+    result = Optimizer(db).assign_orders(SimulationInput(num_available_drivers=3, route_start_time="09:00"))
+    incremental_planner.clear() # KPIs must come from the persisted simulation run
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        # A fresh Optimizer per request, as in the API
+        first = Optimizer(db).get_optimized_schedule()
+        queries = len(statements)
+        second = Optimizer(db).get_optimized_schedule()
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # Current run id, the joined schedule and the run's KPIs; a cached read only checks the run id
+    assert queries == 3
+    assert len(statements) == queries + 1
+    assert second is first
+    assert first["simulation_run_id"] == result["simulation_run_id"]
+    assert first["kpis"] == pytest.approx(result["kpis"])
+    assert len(first["schedule"]) == result["kpis"]["total_deliveries"]
+
+    # The next plan commit invalidates the cache
+    result = Optimizer(db).assign_orders(SimulationInput(num_available_drivers=1, route_start_time="09:00"))
+    third = Optimizer(db).get_optimized_schedule()
+    assert third["simulation_run_id"] == result["simulation_run_id"]
+    assert {row["driver_name"] for row in third["schedule"]} == {"Driver A"}
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import orders
+from app.core.config import settings
+from app.crud import order as crud_order
+from app.models.order import Order
+from app.services import order_ingest
+from app.services.order_ingest import iter_lines
+
+test_app = FastAPI()
+test_app.include_router(orders.router)
+
+@pytest.fixture
+def client(db_session_function):
+    yield TestClient(test_app)
+    db_session_function.query(Order).filter(Order.order_id.like("BULK%")).delete(synchronize_session=False)
+    db_session_function.commit()
+
+def post_bulk(client, body, content_type):
+    response = client.post("/orders/bulk", content=body, headers={"Content-Type": content_type})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_bulk_ndjson(client, db_session_function, monkeypatch):
+    monkeypatch.setattr(settings, "order_bulk_batch_size", 2)
+    lines = [
+        {"order_id": "BULK1", "value": 100, "route_id": "R1", "delivery_time": "2025-08-12T10:00:00"},
+        {"order_id": "BULK2", "value": 250.5, "route_id": "R2", "delivery_time": "2025-08-12T11:00:00"},
+        "not json",
+        {"order_id": "BULK3", "value": "lots", "route_id": "R1", "delivery_time": "2025-08-12T10:00:00"},
+        {"order_id": "BULK1", "value": 120, "route_id": "R1", "delivery_time": "2025-08-12T10:30:00"},
+    ]
+    # Sent as a chunked stream, split mid-line
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode()
+    chunks = (body[i:i + 7] for i in range(0, len(body), 7))
+    results = post_bulk(client, chunks, "application/x-ndjson")
+
+    assert [(r["row"], r["status"]) for r in results[:-1]] == [
+        (1, "created"), (2, "created"), (3, "rejected"), (4, "rejected"), (5, "updated"),
+    ]
+    assert results[2]["message"].startswith("Invalid JSON")
+    assert results[3]["order_id"] == "BULK3" and results[3]["message"].startswith("value:")
+    assert results[-1] == {"summary": {"created": 2, "updated": 1, "rejected": 2}}
+    assert crud_order.get_order(db_session_function, "BULK1").value == 120.0
+
+def test_bulk_csv(client, db_session_function):
+    body = (
+        "order_id,value,route_id,delivery_time\r\n"
+        'BULK4,99,"R1",2025-08-12 09:00:00\r\n'
+        "BULK5,10\r\n"
+        '"BULK,6",15,"R\n2",2025-08-12 09:30:00\r\n'
+    )
+    results = post_bulk(client, body, "text/csv; charset=utf-8")
+    assert [(r["row"], r["order_id"], r["status"]) for r in results[:-1]] == [
+        (1, "BULK4", "created"), (2, None, "rejected"), (3, "BULK,6", "created"),
+    ]
+    assert results[1]["message"] == "Expected 4 fields, got 2"
+    assert crud_order.get_order(db_session_function, "BULK,6").route_id == "R\n2"
+
+    results = post_bulk(client, "order_id,value\nBULK7,1\n", "text/csv")
+    assert results == [
+        {"error": "CSV header is missing columns: route_id, delivery_time"},
+        {"summary": {"created": 0, "updated": 0, "rejected": 0}},
+    ]
+
+def test_bulk_rejects_unknown_content_type(client):
+    assert client.post("/orders/bulk", json=[{"order_id": "BULK8"}]).status_code == 415
+
+def test_iter_lines_drops_oversized_records(monkeypatch):
+    monkeypatch.setattr(order_ingest, "MAX_RECORD_BYTES", 8)
+
+    async def collect():
+        async def chunks():
+            for chunk in (b"ab\nccccc", b"cccccc", b"cc\nd", b"e"):
+                yield chunk
+        return [line async for line in iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == [b"ab", None, b"de"]
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import drivers, orders, simulation_history
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.crud import driver as crud_driver
+from app.crud import order as crud_order
+from app.crud import route as crud_route
+from app.schemas.driver import DriverCreate
+from app.schemas.order import OrderCreate
+from app.schemas.route import RouteCreate
+
+test_app = FastAPI()
+test_app.include_router(drivers.router)
+test_app.include_router(orders.router)
+test_app.include_router(simulation_history.router)
+
+DRIVER_IDS = [f"PAGE-D{i}" for i in range(5)]
+ORDER_IDS = [f"PAGE-O{i}" for i in range(6)]
+START = datetime(2031, 1, 1, 8, 0)
+
+@pytest.fixture
+def client(db_session_function):
+    db = db_session_function
+    for driver_id in DRIVER_IDS:
+        crud_driver.create_or_update_driver(db, DriverCreate(driver_id=driver_id, name=driver_id, shift_hours_today=2.0, hours_worked_past_week=20.0))
+    for route_id in ("PAGE-R1", "PAGE-R2"):
+        crud_route.create_or_update_route(db, RouteCreate(route_id=route_id, distance_km=10.0, traffic_level="Low", base_time_minutes=15))
+    for i, order_id in enumerate(ORDER_IDS):
+        crud_order.create_or_update_order(db, OrderCreate(
+            order_id=order_id, value=100.0, route_id="PAGE-R1" if i % 2 == 0 else "PAGE-R2",
+            delivery_time=START + timedelta(hours=i),
+        ))
+    crud_order.set_assigned_driver(db, "PAGE-O0", "PAGE-D0")
+    crud_order.set_assigned_driver(db, "PAGE-O2", "PAGE-D1")
+    db.commit()
+    yield TestClient(test_app)
+    crud_order.bulk_delete_orders(db, ORDER_IDS)
+    crud_route.bulk_delete_routes(db, ["PAGE-R1", "PAGE-R2"])
+    crud_driver.bulk_delete_drivers(db, DRIVER_IDS)
+    db.commit()
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+def test_keyset_pages_cover_every_driver_once(client):
+    seen = []
+    response = client.get("/drivers", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen += [driver["driver_id"] for driver in page]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            assert "link" not in response.headers
+            break
+        assert 'rel="next"' in response.headers["link"]
+        response = client.get("/drivers", params={"limit": 2, "cursor": cursor})
+    assert len(seen) == len(set(seen))
+    assert [driver_id for driver_id in seen if driver_id in DRIVER_IDS] == DRIVER_IDS
+
+def test_order_filters(client):
+    def order_ids(**params):
+        response = client.get("/orders", params=params)
+        assert response.status_code == 200
+        return [order["order_id"] for order in response.json()]
+
+    assert order_ids(route_id="PAGE-R1") == ["PAGE-O0", "PAGE-O2", "PAGE-O4"]
+    assert order_ids(route_id="PAGE-R1", unassigned=True) == ["PAGE-O4"]
+    assert order_ids(assigned_driver_id="PAGE-D1") == ["PAGE-O2"]
+    assert order_ids(route_id="PAGE-R2", delivery_from=(START + timedelta(hours=2)).isoformat(),
+                     delivery_to=(START + timedelta(hours=5)).isoformat()) == ["PAGE-O3"]
+
+def test_filtered_order_pages(client):
+    first = client.get("/orders", params={"route_id": "PAGE-R2", "limit": 2})
+    assert [order["order_id"] for order in first.json()] == ["PAGE-O1", "PAGE-O3"]
+    second = client.get("/orders", params={"route_id": "PAGE-R2", "limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert [order["order_id"] for order in second.json()] == ["PAGE-O5"]
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+def test_simulation_history_timestamp_range(client):
+    response = client.get("/simulation_history", params={"timestamp_from": "2999-01-01T00:00:00"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/orders", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_simulation_run_timestamp_filters_use_the_index():
+    from sqlalchemy import create_engine, func, select
+    from app.core.database import Base
+    from app.crud.simulation_run import select_simulation_runs
+    from app.models.simulation_run import SimulationRun
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    queries = [
+        select_simulation_runs(timestamp_from=datetime(2025, 1, 1), timestamp_to=datetime(2025, 2, 1)),
+        # The oldest run before the retention cutoff (see get_runs_to_archive)
+        select(func.min(SimulationRun.timestamp)).where(SimulationRun.timestamp < datetime(2025, 1, 1), SimulationRun.id != 1),
+    ]
+    with engine.connect() as connection:
+        for query in queries:
+            compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+            assert "USING INDEX ix_simulation_runs_timestamp" in plan or "USING COVERING INDEX ix_simulation_runs_timestamp" in plan
+    engine.dispose()
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import simulation_history
+from app.core.database import Base
+from app.crud import assignment as crud_assignment
+from app.crud import driver as crud_driver
+from app.crud import order as crud_order
+from app.crud import route as crud_route
+from app.crud import simulation_run as crud_simulation_run
+from app.models.simulation_run import SimulationRun, SimulationRunPlan
+from app.schemas.driver import DriverCreate
+from app.schemas.optimization import SimulationInput
+from app.schemas.order import OrderCreate
+from app.schemas.route import RouteCreate
+from app.schemas.simulation_run import SimulationRunCreate
+from app.services.incremental import incremental_planner
+from app.services.optimizer import Optimizer
+from app.services.plan_codec import decode_plan, diff_plans, encode_plan, plan_rows
+from app.services.solver import PlannedAssignment
+
+test_app = FastAPI()
+test_app.include_router(simulation_history.router)
+
+ASSIGNED_AT = datetime(2031, 3, 1, 8, 0)
+
+def planned(order_id, driver_id, minutes, profit):
+    return PlannedAssignment(order_id, driver_id, ASSIGNED_AT + timedelta(minutes=minutes), True, 0.0, 0.0, 10.0, profit)
+
+BASE_PLAN = [planned("O1", "D1", 30, 90.0), planned("O2", "D2", 40, 190.0), planned("O3", "D1", 50, 290.0)]
+NEXT_PLAN = [planned("O2", "D1", 40, 190.0), planned("O3", "D1", 50, 290.0), planned("O4", "D2", 20, 390.0)]
+
+def run_kpis(total_profit):
+    return dict(
+        total_profit=total_profit, efficiency_score=100.0, total_deliveries=3, on_time_deliveries=3,
+        late_deliveries=0, total_fuel_cost=30.0, total_penalties=0.0, total_bonuses=0.0,
+    )
+
+def test_codec_round_trip():
+    columns = decode_plan(encode_plan(BASE_PLAN))
+    assert plan_rows(columns) == [
+        {slot: getattr(assignment, slot) for slot in PlannedAssignment.__slots__} for assignment in BASE_PLAN
+    ]
+    assert plan_rows(decode_plan(encode_plan([]))) == []
+
+def test_diff_plans():
+    diff = diff_plans(decode_plan(encode_plan(BASE_PLAN)), decode_plan(encode_plan(NEXT_PLAN)))
+    assert [row["order_id"] for row in diff["added"]] == ["O4"]
+    assert [row["order_id"] for row in diff["removed"]] == ["O1"]
+    assert [(change["before"]["driver_id"], change["after"]["driver_id"]) for change in diff["changed"]] == [("D2", "D1")]
+    assert diff["unchanged"] == 1
+
+@pytest.fixture
+def recorded_runs(db_session_function):
+    db = db_session_function
+    run_ids = []
+    for plan, total_profit in ((BASE_PLAN, 570.0), (NEXT_PLAN, 870.0)):
+        run_id = crud_simulation_run.create_simulation_run(db, SimulationRunCreate(timestamp=ASSIGNED_AT, **run_kpis(total_profit))).id
+        crud_simulation_run.create_simulation_run_plan(db, run_id, ASSIGNED_AT, plan)
+        run_ids.append(run_id)
+    # Sweep runs only keep KPIs
+    run_ids.append(crud_simulation_run.create_simulation_run(db, SimulationRunCreate(timestamp=ASSIGNED_AT, **run_kpis(0.0))).id)
+    db.commit()
+    yield run_ids
+    db.query(SimulationRunPlan).filter(SimulationRunPlan.simulation_run_id.in_(run_ids)).delete(synchronize_session=False)
+    db.query(SimulationRun).filter(SimulationRun.id.in_(run_ids)).delete(synchronize_session=False)
+    db.commit()
+
+def test_plan_endpoint(recorded_runs):
+    base_id, _, sweep_id = recorded_runs
+    client = TestClient(test_app)
+    response = client.get(f"/simulation_history/{base_id}/plan")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["assigned_at"] == ASSIGNED_AT.isoformat()
+    assert [(row["order_id"], row["driver_id"], row["profit"]) for row in body["assignments"]] == [
+        ("O1", "D1", 90.0), ("O2", "D2", 190.0), ("O3", "D1", 290.0),
+    ]
+    assert client.get(f"/simulation_history/{sweep_id}/plan").json()["detail"] == f"No plan stored for simulation run {sweep_id}"
+    assert client.get("/simulation_history/999999/plan").json()["detail"] == "Simulation run not found"
+
+def test_diff_endpoint(recorded_runs):
+    base_id, next_id, sweep_id = recorded_runs
+    client = TestClient(test_app)
+    response = client.get(f"/simulation_history/{base_id}/diff/{next_id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["kpi_deltas"]["total_profit"] == 300.0
+    assert [row["order_id"] for row in body["added"]] == ["O4"]
+    assert [row["order_id"] for row in body["removed"]] == ["O1"]
+    assert body["changed"][0]["after"]["driver_id"] == "D1"
+    assert body["unchanged"] == 1
+    assert client.get(f"/simulation_history/{base_id}/diff/{sweep_id}").status_code == 404
+
+def test_assign_orders_stores_the_plan():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    incremental_planner.clear()
+    try:
+        for i in range(2):
+            crud_driver.create_driver(db, DriverCreate(driver_id=f"D{i}", name=f"Driver {i}", shift_hours_today=4.0, hours_worked_past_week=30.0))
+        crud_route.create_route(db, RouteCreate(route_id="R1", distance_km=10.0, traffic_level="low", base_time_minutes=15))
+        for i in range(4):
+            crud_order.create_order(db, OrderCreate(order_id=f"O{i}", value=100.0 * (i + 1), route_id="R1", delivery_time=datetime.now() + timedelta(hours=i)))
+        result = Optimizer(db).assign_orders(SimulationInput())
+
+        stored = db.get(SimulationRunPlan, result["simulation_run_id"])
+        assert stored.num_assignments == 4
+        rows = plan_rows(decode_plan(stored.data))
+        # Same plan as the live assignments, which the next run replaces
+        live = {assignment.order_id: assignment.driver_id for assignment in crud_assignment.get_assignments(db, limit=100)}
+        assert {row["order_id"]: row["driver_id"] for row in rows} == live
+        assert sum(row["profit"] for row in rows) == pytest.approx(result["kpis"]["total_profit"])
+    finally:
+        incremental_planner.clear()
+        db.close()
+        engine.dispose()
@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api import drivers, routes
+from app.core.database import async_engine, async_read_engine
+from app.services.incremental import incremental_planner
+
+# Statements per endpoint. Writes stage changes with flush() and the request commits once, so none of
+# them pays for a refresh SELECT after the commit.
+
+test_app = FastAPI()
+test_app.include_router(drivers.router)
+test_app.include_router(routes.router)
+
+DRIVER = {"driver_id": "QC-D1", "name": "Counted", "shift_hours_today": 2.0, "hours_worked_past_week": 20.0}
+ROUTE = {"route_id": "QC-R1", "distance_km": 10.0, "traffic_level": "Low", "base_time_minutes": 15}
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (async_engine.sync_engine, async_read_engine.sync_engine)
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def client():
+    incremental_planner.clear()
+    with TestClient(test_app) as client:
+        yield client
+        client.delete(f"/drivers/{DRIVER['driver_id']}")
+        client.delete(f"/routes/{ROUTE['route_id']}")
+
+def assert_statements(statements, expected):
+    # By kind, in any order: expected is e.g. ["SELECT", "INSERT", "UPDATE"]
+    assert sorted(statement.split()[0] for statement in statements) == sorted(expected), statements
+
+def test_driver_endpoint_query_counts(client):
+    with count_statements() as statements:
+        assert client.post("/drivers", json=DRIVER).status_code == 201
+    # Existence check, INSERT, fleet version bump
+    assert_statements(statements, ["SELECT", "INSERT", "UPDATE"])
+
+    with count_statements() as statements:
+        assert client.get("/drivers/QC-D1").status_code == 200
+    assert_statements(statements, ["SELECT"])
+
+    with count_statements() as statements:
+        assert client.get("/drivers", params={"limit": 5}).status_code == 200
+    assert_statements(statements, ["SELECT"])
+
+    with count_statements() as statements:
+        response = client.put("/drivers/QC-D1", json={"shift_hours_today": 4.0})
+    assert response.json()["shift_hours_today"] == 4.0
+    assert_statements(statements, ["SELECT", "UPDATE", "UPDATE"])
+
+    with count_statements() as statements:
+        assert client.delete("/drivers/QC-D1").status_code == 204
+    assert_statements(statements, ["SELECT", "DELETE", "UPDATE"])
+
+def test_route_endpoint_query_counts(client):
+    with count_statements() as statements:
+        assert client.post("/routes", json=ROUTE).status_code == 201
+    # The route and its cost row go in together
+    assert_statements(statements, ["SELECT", "SELECT", "INSERT", "INSERT", "UPDATE"])
+
+    with count_statements() as statements:
+        assert client.get("/routes/QC-R1").status_code == 200
+    assert_statements(statements, ["SELECT"])
+
+    with count_statements() as statements:
+        assert client.delete("/routes/QC-R1").status_code == 204
+    # Lookup, its orders (the relationship detaches them), the cost row, the route, fleet version bump
+    assert_statements(statements, ["SELECT", "SELECT", "DELETE", "DELETE", "UPDATE"])
+
+def test_failed_write_is_rolled_back(client):
+    assert client.post("/drivers", json=DRIVER).status_code == 201
+    # Rejected batch: the update it staged for QC-D1 must not survive the request
+    response = client.patch("/drivers", json={"updates": [{"driver_id": "QC-D1", "shift_hours_today": 9.0},
+                                                           {"driver_id": "QC-MISSING", "shift_hours_today": 1.0}]})
+    assert response.status_code == 404
+    assert client.get("/drivers/QC-D1").json()["shift_hours_today"] == DRIVER["shift_hours_today"]
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import threading
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import health
+from app.core.readiness import FAILED, LOADING, READY, readiness, require_ready
+
+test_app = FastAPI()
+test_app.include_router(health.router)
+
+@test_app.get("/data", dependencies=[Depends(require_ready)])
+def read_data():
+    return {"ok": True}
+
+@pytest.fixture
+def client():
+    readiness.reset()
+    yield TestClient(test_app)
+    readiness.wait()
+    readiness.reset()
+
+def test_not_ready_until_load_finishes(client):
+    release = threading.Event()
+    readiness.start_loading(lambda: release.wait(5))
+    assert readiness.status == LOADING
+
+    assert client.get("/healthz").status_code == 200
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == LOADING
+    response = client.get("/data")
+    assert response.status_code == 503
+    assert "still loading" in response.json()["detail"]
+    assert response.headers["Retry-After"] == "1"
+
+    release.set()
+    assert readiness.wait(5)
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == READY
+    assert response.json()["startup_seconds"]["data_ready"] > 0
+    assert client.get("/data").json() == {"ok": True}
+
+def test_failed_load_is_reported(client):
+    def load():
+        raise RuntimeError("bad CSV")
+
+    readiness.start_loading(load)
+    assert not readiness.wait(5)
+    assert readiness.status == FAILED
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["error"] == "bad CSV"
+    response = client.get("/data")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Initial data load failed: bad CSV"
+    assert client.get("/healthz").status_code == 200
+
+def test_main_app_does_not_import_pandas():
+    # pandas is only needed by the data loader, which runs after startup
+    code = "import sys, app.main; print('pandas' in sys.modules)"
+    backend_dir = os.path.dirname(os.path.dirname(__file__))
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,14 @@
+from app.services.schedule_cache import ScheduleCache
+
+
+def test_put_after_a_concurrent_invalidation_is_dropped():
+    cache = ScheduleCache()
+    bind = object()
+    generation = cache.generation
+    cache.invalidate() # e.g. an order change committed while the response was being assembled
+    assert not cache.put(bind, 1, {"schedule": "stale"}, generation)
+    assert cache.get(bind, 1) is None
+
+    assert cache.put(bind, 1, {"schedule": "fresh"}, cache.generation)
+    assert cache.get(bind, 1) == {"schedule": "fresh"}
+    assert cache.get(bind, 2) is None
@@ -0,0 +1,56 @@
+import pickle
+from datetime import datetime, timedelta
+
+from app.schemas.optimization import SimulationInput
+from app.services.solver import DriverRecord, FleetSnapshot, OrderRecord, RouteRecord, resolve_assigned_at, solve
+
+
+def make_snapshot():
+    now = datetime(2025, 8, 12, 9, 0)
+    drivers = [
+        DriverRecord("D1", "Driver A", 4.0, 20.0),
+        DriverRecord("D2", "Driver B", 6.0, 30.0),
+        DriverRecord("D3", "Driver C (Fatigued)", 9.0, 45.0),
+    ]
+    routes = [
+        RouteRecord("R1", 10.0, "low", 15),
+        RouteRecord("R2", 20.0, "medium", 30),
+        RouteRecord("R3", 5.0, "high", 10),
+    ]
+    orders = [
+        OrderRecord("O1", 50.0, "R1", now + timedelta(minutes=40)),
+        OrderRecord("O2", 1500.0, "R2", now + timedelta(minutes=90)),
+        OrderRecord("O3", 200.0, "R3", now + timedelta(minutes=10)),
+        OrderRecord("O4", 300.0, "R9", now + timedelta(minutes=20)), # Unknown route
+    ]
+    return FleetSnapshot(drivers, orders, routes), now
+
+
+def test_solve_without_database():
+    snapshot, now = make_snapshot()
+    plan = solve(snapshot, SimulationInput(num_available_drivers=2), assigned_at=now)
+
+    assert plan.assigned_at == now
+    assert sorted(a.order_id for a in plan.assignments) == ["O1", "O2", "O3"]
+    assert set(plan.driver_assigned_orders) == {"D1", "D2"}
+    assert plan.kpis["total_deliveries"] == 3
+    assert plan.kpis["total_profit"] == sum(a.profit for a in plan.assignments)
+    # O1 on R1 by a rested driver: 36.5 minutes, on time, 50 - 50 fuel
+    o1 = next(a for a in plan.assignments if a.order_id == "O1")
+    assert o1.estimated_delivery_time == now + timedelta(minutes=36.5)
+    assert o1.on_time and o1.profit == 0.0
+
+
+def test_snapshot_and_plan_are_picklable():
+    snapshot, now = make_snapshot()
+    restored = pickle.loads(pickle.dumps(snapshot))
+    assert [d.driver_id for d in restored.drivers] == ["D1", "D2", "D3"]
+
+    plan = pickle.loads(pickle.dumps(solve(restored, SimulationInput(), assigned_at=now)))
+    assert plan.kpis == solve(snapshot, SimulationInput(), assigned_at=now).kpis
+
+
+def test_resolve_assigned_at_uses_route_start_time():
+    now = datetime(2025, 8, 12, 14, 30)
+    assert resolve_assigned_at("09:15", now) == datetime(2025, 8, 12, 9, 15)
+    assert resolve_assigned_at(None, now) == now
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from app.schemas.optimization import SweepGrid
+from app.services.solver import solve, resolve_assigned_at
+from app.services.sweep import expand_grid, pareto_front, run_sweep
+from tests.test_optimal_assignment import random_snapshot
+
+
+def test_expand_grid_is_cartesian_product():
+    variants = expand_grid(SweepGrid(num_available_drivers=[1, 2, 3], max_hours_per_driver_per_day=[8.0, None]))
+    assert len(variants) == 6
+    assert {(v.num_available_drivers, v.max_hours_per_driver_per_day) for v in variants} == {
+        (n, h) for n in (1, 2, 3) for h in (8.0, None)
+    }
+
+
+def test_pareto_front():
+    points = [(100.0, 50.0), (120.0, 40.0), (90.0, 60.0), (80.0, 55.0), (120.0, 30.0)]
+    assert pareto_front(points) == [1, 0, 2]
+
+
+def test_parallel_sweep_matches_sequential():
+    snapshot = random_snapshot(7)
+    now = datetime(2025, 8, 12, 7, 0)
+    variants = expand_grid(SweepGrid(num_available_drivers=[2, 4, 8], route_start_time=["08:00", None]))
+
+    parallel = run_sweep(snapshot, variants, max_workers=2, now=now)
+    sequential = run_sweep(snapshot, variants, max_workers=1, now=now)
+    assert parallel == sequential
+    expected = solve(snapshot, variants[0], resolve_assigned_at(variants[0].route_start_time, now))
+    assert parallel[0] == (expected.strategy, expected.kpis)
+
+
+def test_concurrent_serial_sweeps_keep_their_own_snapshot():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services import sweep
+
+    now = datetime(2025, 8, 12, 7, 0)
+    snapshots = [random_snapshot(seed) for seed in (1, 2)]
+    variants = expand_grid(SweepGrid(num_available_drivers=[2, 4, 8]))
+    expected = [run_sweep(snapshot, variants, now=now) for snapshot in snapshots]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda snapshot: run_sweep(snapshot, variants * 5, now=now), snapshots * 2))
+    assert results == [result * 5 for result in expected * 2]
+    assert sweep._worker_snapshot is None # The API process never holds a worker snapshot
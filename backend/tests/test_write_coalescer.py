@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import drivers
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import driver as crud_driver
+from app.schemas.driver import DriverCreate
+from app.services.write_coalescer import WriteCoalescer
+
+DRIVER_IDS = [f"WC-D{i}" for i in range(3)]
+
+@pytest.fixture
+def fleet(db_session_function):
+    db = db_session_function
+    for driver_id in DRIVER_IDS:
+        crud_driver.create_or_update_driver(db, DriverCreate(driver_id=driver_id, name=driver_id, shift_hours_today=1.0, hours_worked_past_week=10.0))
+    db.commit()
+    yield db
+    crud_driver.bulk_delete_drivers(db, DRIVER_IDS)
+    db.commit()
+
+def shift_hours(db, driver_id):
+    db.expire_all()
+    return crud_driver.get_driver(db, driver_id).shift_hours_today
+
+def run_batch(coalescer, *mutations):
+    # Submits the mutations concurrently; returns each result or raised exception
+    async def scenario():
+        results = await asyncio.gather(*(coalescer.apply(*mutation) for mutation in mutations), return_exceptions=True)
+        await coalescer.shutdown()
+        return results
+    return asyncio.run(scenario())
+
+def test_mutations_share_one_commit(fleet):
+    coalescer = WriteCoalescer(SessionLocal, max_batch=64, max_delay_ms=50)
+    results = run_batch(coalescer, *[(crud_driver.update_driver, driver_id, {"shift_hours_today": 5.0 + i})
+                                     for i, driver_id in enumerate(DRIVER_IDS)])
+    assert [driver.shift_hours_today for driver in results] == [5.0, 6.0, 7.0]
+    assert coalescer.batches == 1
+    assert coalescer.mutations == 3
+    assert [shift_hours(fleet, driver_id) for driver_id in DRIVER_IDS] == [5.0, 6.0, 7.0]
+
+def test_max_batch_splits_transactions(fleet):
+    coalescer = WriteCoalescer(SessionLocal, max_batch=2, max_delay_ms=50)
+    run_batch(coalescer, *[(crud_driver.update_driver, driver_id, {"shift_hours_today": 2.0}) for driver_id in DRIVER_IDS])
+    assert coalescer.batches == 2
+    assert coalescer.mutations == 3
+
+def test_failed_mutation_only_fails_its_caller(fleet):
+    def update_then_fail(db, driver_id):
+        crud_driver.update_driver(db, driver_id, {"shift_hours_today": 9.0})
+        raise ValueError("rejected")
+
+    coalescer = WriteCoalescer(SessionLocal, max_batch=64, max_delay_ms=50)
+    first, failing, missing = run_batch(
+        coalescer,
+        (crud_driver.update_driver, "WC-D0", {"shift_hours_today": 3.0}),
+        (update_then_fail, "WC-D1"),
+        (crud_driver.update_driver, "WC-MISSING", {"shift_hours_today": 3.0}),
+    )
+    assert first.shift_hours_today == 3.0
+    assert isinstance(failing, ValueError)
+    assert missing is None
+    assert coalescer.batches == 1
+    # The failed mutation was rolled back to its savepoint, the rest of the batch committed
+    assert shift_hours(fleet, "WC-D0") == 3.0
+    assert shift_hours(fleet, "WC-D1") == 1.0
+
+def test_put_driver_through_the_coalescer(fleet, monkeypatch):
+    monkeypatch.setattr(settings, "write_coalescing", True)
+    test_app = FastAPI()
+    test_app.include_router(drivers.router)
+    with TestClient(test_app) as client:
+        response = client.put("/drivers/WC-D1", json={"shift_hours_today": 6.5})
+        assert response.status_code == 200
+        assert response.json()["shift_hours_today"] == 6.5
+        assert client.put("/drivers/WC-MISSING", json={"shift_hours_today": 1.0}).status_code == 404
+    assert shift_hours(fleet, "WC-D1") == 6.5